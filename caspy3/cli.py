@@ -16,58 +16,38 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PyQt5.QtCore import QObject, QThreadPool
-from PyQt5.QtWidgets import QApplication
+import time
 
-from .qt_assets.tabs.worker import BaseWorker
+# Used by --profile-startup, recorded before anything else is imported
+STARTUP_TIME = time.perf_counter()
 
 import typing as ty
 import traceback
 import click
 import sys
 
+# Representations of the answer printed by print_output(), the LaTeX is never rendered
+CLI_REPRESENTATIONS = ("exact", "approx")
 
-class Cli(QObject):
-    def __init__(
-        self, command: str, params: list, copy: int, worker: ty.Type[BaseWorker]
-    ) -> None:
-        super(Cli, self).__init__()
 
-        self.command = command
-        self.params = params
-        self.copy = copy
-
-        self.Worker = worker
-
-        self.threadpool = QThreadPool()
-
-    def stop_thread(self) -> None:
-        pass
-
-    def call_worker(self) -> None:
-        """
-        Call worker, send command and params, and then start thread
-        """
-        worker = self.Worker(self.command, self.params, self.copy)
-        worker.signals.output.connect(self.print_output)
-        worker.signals.finished.connect(self.stop_thread)
-
-        self.threadpool.start(worker)
+def print_output(input_dict: dict) -> None:
+    """
+    Prints output then exit program
+    :param input_dict: dict
+        Dict contaning exact answer and approximate anser or error message
+    """
+    if list(input_dict.keys())[0] == "error":
+        print(list(input_dict.values())[0][0])
+    else:
+        print("Exact answer:")
+        print(list(input_dict.values())[0][0])
+        print("\nApproximate answer:")
+        print(list(input_dict.values())[0][1])
+        if "quadrature" in input_dict:
+            from .compute.quadrature import format_quadrature
 
-    def print_output(self, input_dict: dict) -> None:
-        """
-        Prints output then exit program
-        :param input_dict: dict
-            Dict contaning exact answer and approximate anser or error message
-        """
-        if list(input_dict.keys())[0] == "error":
-            print(list(input_dict.values())[0][0])
-        else:
-            print("Exact answer:")
-            print(list(input_dict.values())[0][0])
-            print("\nApproximate answer:")
-            print(list(input_dict.values())[0][1])
-        sys.exit()
+            print("\n" + format_quadrature(input_dict["quadrature"]))
+    sys.exit()
 
 
 def suppress_qt_warnings() -> None:
@@ -276,23 +256,78 @@ def add_options(options: list):
 
 
 @click.group()
-def main(**kwargs: dict) -> None:
-    pass
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Don't read or store results in the result cache.",
+)
+@click.option(
+    "--timeout",
+    "-t",
+    type=click.FloatRange(0, min_open=True),
+    default=None,
+    help="Number of seconds a calculation may run. Defaults to 'timeout' in settings.json.",
+)
+@click.option(
+    "--profile-startup",
+    is_flag=True,
+    default=False,
+    help="Print a timestamped breakdown of the startup with the peak RSS after each phase.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write the startup profile as JSON to this file instead of printing it.",
+)
+@click.pass_context
+def main(
+    ctx: click.core.Context,
+    no_cache: bool,
+    timeout: float,
+    profile_startup: bool,
+    profile_output: str,
+    **kwargs: dict,
+) -> None:
+    ctx.obj = {"timeout": timeout}
+    if profile_startup or profile_output:
+        from .startup import start_profiling
+
+        start_profiling(STARTUP_TIME, profile_output).mark("import cli and parse arguments")
+    if no_cache:
+        from os import environ
+
+        environ["CASPY_NO_CACHE"] = "1"
 
 
 @main.command()
-def start() -> None:
+@click.option(
+    "--timing",
+    is_flag=True,
+    default=False,
+    help="Print how long each phase of the startup took.",
+)
+def start(timing: bool) -> None:
     """
     Start the GUI
     """
     from .qt_gui import main
 
-    main()
+    main(timing)
 
 
 @main.command(cls=EncloseNegative)
 @add_options(DEFAULT_FLAGS)
 @add_options(DEFAULT_ARGUMENTS)
+@click.option(
+    "--points",
+    "-P",
+    default=None,
+    metavar="POINTS",
+    help="Evaluate the derivative numerically at every point of a comma separated list "
+    "instead of at AT_POINT. The values are doubles, --accuracy is capped at 17 digits.",
+)
 @click.argument("params", nargs=-1, metavar="EXPRESSION VARIABLE [ORDER] [AT_POINT]")
 def deriv(params: list, **kwargs: dict) -> None:
     """Derive a function.
@@ -301,14 +336,13 @@ def deriv(params: list, **kwargs: dict) -> None:
     Example(s):
     >>> caspy deriv x**x x
     >>> caspy deriv sin(1/x) x 3 pi
+    >>> caspy deriv sin(1/x) x 3 --points "1, 2, pi"
     """
-    from .qt_assets.tabs.derivative import DerivativeWorker
-
     default_params = ["x", "x", "1", None]
 
     validate_input_dict = validate_inputs(kwargs, default_params, params, "deriv")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -326,8 +360,16 @@ def deriv(params: list, **kwargs: dict) -> None:
 
     params_to_send = list_merge(default_params, list(params))
 
-    to_send = [prefix + "deriv", params_to_send + options, kwargs["copy"]]
-    send_to_thread(to_send, DerivativeWorker)
+    if kwargs["points"] is not None and not kwargs["preview"]:
+        params_to_send[3] = kwargs["points"]
+        to_send = [
+            "calc_deriv_points",
+            params_to_send + [kwargs["use_scientific"], kwargs["accuracy"]],
+            kwargs["copy"],
+        ]
+    else:
+        to_send = [prefix + "deriv", params_to_send + options, kwargs["copy"]]
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -345,6 +387,14 @@ def deriv(params: list, **kwargs: dict) -> None:
     default=False,
     help="Set flag to approximate integral. This overrides the normal calculation",
 )
+@click.option(
+    "--quadrature",
+    "-q",
+    type=click.Choice(["sympy", "gauss-kronrod", "tanh-sinh"]),
+    default="sympy",
+    show_default=True,
+    help="Method of --approximate-integral, 'sympy' uses N() at arbitrary precision",
+)
 def integ(params: list, **kwargs: dict) -> None:
     """Calculate definite and indefinite integrals of expressions.
 
@@ -352,14 +402,14 @@ def integ(params: list, **kwargs: dict) -> None:
     Example(s):
     >>> caspy integ 1/sqrt(1-x**2) x -1 1
     >>> caspy integ x**x x -1 1 -A
+    >>> caspy integ exp(-x**2) x -oo oo -A -q gauss-kronrod
+    >>> caspy integ 1/sqrt(x) x 0 1 -A -q tanh-sinh
     """
-    from .qt_assets.tabs.integral import IntegralWorker
-
     default_params = ["x", "x", None, None]
 
     validate_input_dict = validate_inputs(kwargs, default_params, params, "integ")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -367,8 +417,11 @@ def integ(params: list, **kwargs: dict) -> None:
         options = [kwargs["output_type"], kwargs["use_unicode"], kwargs["line_wrap"]]
     else:
         prefix = "calc_"
+        approx_integ = kwargs["approximate_integral"]
+        if approx_integ and kwargs["quadrature"] != "sympy":
+            approx_integ = kwargs["quadrature"]
         options = [
-            kwargs["approximate_integral"],
+            approx_integ,
             kwargs["output_type"],
             kwargs["use_unicode"],
             kwargs["line_wrap"],
@@ -379,7 +432,7 @@ def integ(params: list, **kwargs: dict) -> None:
     params_to_send = list_merge(default_params, list(params))
 
     to_send = [prefix + "integ", params_to_send + options, kwargs["copy"]]
-    send_to_thread(to_send, IntegralWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -394,13 +447,11 @@ def sum(params: list, **kwargs: dict) -> None:
     >>> caspy sum x**k/factorial(k) k 0 oo
     >>> caspy sum k**2 k 1 m
     """
-    from .qt_assets.tabs.summation import SummationWorker
-
     default_params = ["k", "k", 1, 2]
 
     validate_input_dict = validate_inputs(kwargs, default_params, params, "sum")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -419,7 +470,7 @@ def sum(params: list, **kwargs: dict) -> None:
     params_to_send = list_merge(default_params, list(params))
 
     to_send = [prefix + "sum", params_to_send + options, kwargs["copy"]]
-    send_to_thread(to_send, SummationWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -436,13 +487,11 @@ def limit(params: list, **kwargs: dict) -> None:
     >>> caspy limit (1+1/(a*n))**(b*n) n oo
     >>> caspy limit n!**(1/n) n 0 -
     """
-    from .qt_assets.tabs.limit import LimitWorker
-
     default_params = ["x", "x", 0, "+-"]
 
     validate_input_dict = validate_inputs(kwargs, default_params, params, "limit")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -461,7 +510,7 @@ def limit(params: list, **kwargs: dict) -> None:
     params_to_send = list_merge(default_params, list(params))
 
     to_send = [prefix + "limit", params_to_send + options, kwargs["copy"]]
-    send_to_thread(to_send, LimitWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -499,8 +548,6 @@ def eq(params: list, **kwargs: dict) -> None:
     >>> caspy eq x**x 2 x
     >>> caspy eq sin(x)=1 x -st
     """
-    from .qt_assets.tabs.equations import EquationsWorker
-
     default_params = ["x", 0, "x"]
 
     if "=" in params[0]:
@@ -511,7 +558,7 @@ def eq(params: list, **kwargs: dict) -> None:
 
     validate_input_dict = validate_inputs(kwargs, default_params, params, "eq")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -539,7 +586,76 @@ def eq(params: list, **kwargs: dict) -> None:
     params_to_send = list_merge(default_params, list(params))
 
     to_send = [prefix + "normal_eq", params_to_send + options, kwargs["copy"]]
-    send_to_thread(to_send, EquationsWorker)
+    run_command(to_send)
+
+
+@main.command(cls=EncloseNegative)
+@add_options(DEFAULT_ARGUMENTS)
+@click.argument("formula")
+@click.argument("variable")
+@click.argument("values_sub", required=False, nargs=-1)
+@click.option(
+    "--values",
+    "-V",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="CSV file with the variables in its header, the formula is evaluated at every row.",
+)
+@click.option(
+    "--out",
+    "-O",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="File to write the results to, CSV unless it ends with .npy. Defaults to stdout.",
+)
+def formula(formula: str, variable: str, values_sub: list, **kwargs: dict) -> None:
+    """Sweeps a formula over the rows of a CSV file.
+
+    The formula is solved for VARIABLE once, every solution is then evaluated at each row.
+    The other variables are read from the CSV file, variables can also be given a value
+    for every row by typing the variable followed by the value separated by a space.
+    The sweep is real-only, a solution is nan at a row where it isn't real or doesn't
+    satisfy the formula.
+
+    \b
+    Example(s):
+    >>> caspy formula "v**2-v0**2=2*a*s" v --values rows.csv
+    >>> caspy formula "s=v0*t+(a*t**2)/2" t a 9.81 -V rows.csv -O times.npy
+    """
+    if formula.count("=") != 1:
+        print("The formula must contain exactly one '='")
+        return
+    if len(values_sub) % 2 != 0:
+        print(
+            "Variable substitution must consist of an even number of arguments, see 'formula "
+            "--help' for more information"
+        )
+        return
+
+    from .compute.formulas import FormulaCompute
+
+    lines = [["var", variable]] + [
+        [value, var] for var, value in zip(values_sub[::2], values_sub[1::2])
+    ]
+    result = FormulaCompute().write_formula_sweep(
+        lines,
+        formula.split("="),
+        kwargs["values"],
+        kwargs["out"] or sys.stdout,
+        kwargs["use_scientific"],
+        kwargs["accuracy"],
+    )
+    if "error" in result:
+        print_output(result)
+    else:
+        if kwargs["out"]:
+            print(f"Wrote {result['table'][2]} rows to {kwargs['out']}")
+        if result["unsolved"]:
+            # On stderr so that the CSV written to stdout stays intact
+            print(
+                f"{result['unsolved']} of {result['table'][2]} rows have no real solution (nan)",
+                file=sys.stderr,
+            )
 
 
 @main.command(cls=EncloseNegative)
@@ -562,8 +678,6 @@ def diff_eq(params: list, **kwargs: dict) -> None:
     >>> caspy diff-eq f'(x) 1/f(x) f(x)
     >>> caspy diff-eq f''(x)+3*f'(x)=x**2 f(x)
     """
-    from .qt_assets.tabs.equations import EquationsWorker
-
     default_params = ["f(x)", "f(x)", "f(x)"]
 
     if "=" in params[0]:
@@ -574,7 +688,7 @@ def diff_eq(params: list, **kwargs: dict) -> None:
 
     validate_input_dict = validate_inputs(kwargs, default_params, params, "diff_eq")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -597,7 +711,7 @@ def diff_eq(params: list, **kwargs: dict) -> None:
 
     to_send = [prefix + "diff_eq", params_to_send + options, kwargs["copy"]]
 
-    send_to_thread(to_send, EquationsWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -622,8 +736,6 @@ def sys_eq(no_of_eq: int, **kwargs: dict) -> None:
     >>> caspy sys-eq 5
     >>> caspy sys-eq 3 -d Integers
     """
-    from .qt_assets.tabs.equations import EquationsWorker
-
     if kwargs["solve_type"]:
         solve_type = 2
     else:
@@ -666,7 +778,7 @@ def sys_eq(no_of_eq: int, **kwargs: dict) -> None:
         kwargs["copy"],
     ]
 
-    send_to_thread(to_send, EquationsWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -679,14 +791,12 @@ def simp(expression: str, **kwargs: dict) -> None:
     Example(s):
     >>> caspy simp sin(x)**2+cos(x)**2
     """
-    from .qt_assets.tabs.simplify import SimpWorker
-
     expression = tuple([expression])
 
     default_params = ["x"]
     validate_input_dict = validate_inputs(kwargs, default_params, expression, "simp")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -699,7 +809,7 @@ def simp(expression: str, **kwargs: dict) -> None:
     params_to_send = list_merge(default_params, list(expression))
     to_send = [prefix + "simp_exp", params_to_send + options, kwargs["copy"]]
 
-    send_to_thread(to_send, SimpWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -712,13 +822,11 @@ def exp(expression: str, **kwargs: dict) -> None:
     Example(s):
     >>> caspy exp (a+b-c)**3
     """
-    from .qt_assets.tabs.expand import ExpandWorker
-
     default_params = ["x"]
     expression = tuple([expression])
     validate_input_dict = validate_inputs(kwargs, default_params, expression, "exp")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
         return
 
     if kwargs["preview"]:
@@ -730,12 +838,34 @@ def exp(expression: str, **kwargs: dict) -> None:
 
     params_to_send = list_merge(default_params, list(expression))
     to_send = [prefix + "expand_exp", params_to_send + options, kwargs["copy"]]
-    send_to_thread(to_send, ExpandWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
 @add_options(DEFAULT_FLAGS)
 @add_options(DEFAULT_ARGUMENTS)
+@click.option(
+    "--grid",
+    "-g",
+    multiple=True,
+    metavar="VAR=START:STOP:NUM",
+    help="Tabulate the expression, VAR takes NUM evenly spaced values from START to STOP. "
+    "Can be given once per variable.",
+)
+@click.option(
+    "--values",
+    "-V",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Tabulate the expression at every row of a CSV file with the variables in its header.",
+)
+@click.option(
+    "--out",
+    "-O",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="File to write the table to, CSV unless it ends with .npy. Defaults to stdout.",
+)
 @click.argument("expression")
 @click.argument("vars_sub", required=False, nargs=-1)
 def eval(expression: str, vars_sub: list, **kwargs: dict) -> None:
@@ -750,18 +880,27 @@ def eval(expression: str, vars_sub: list, **kwargs: dict) -> None:
     => 3**((3)+(5))
     => 6561
 
+    With --grid or --values the expression is compiled once and evaluated at every point, the
+    table is written as CSV or .npy. The bounds of the grid must be finite and --preview
+    can't be used with a table.
+
     \b
     Example(s):
     >>> caspy eval exp(pi)+3/sin(6)
     >>> caspy eval 3**x x 3
+    >>> caspy eval "sin(x)*y" --grid x=0:10:1e6 y=-1:1:3 --out table.npy
+    >>> caspy eval "x*y" --values points.csv
     """
-    from .qt_assets.tabs.evaluate import EvaluateWorker
-
     default_params = ["1+1"]
     expression = tuple([expression])
     validate_input_dict = validate_inputs(kwargs, default_params, expression, "eval")
     if list(validate_input_dict.keys())[0] == "error":
-        send_to_thread(validate_input_dict)
+        run_command(validate_input_dict)
+        return
+
+    if kwargs["grid"] or kwargs["values"]:
+        # Every variable after --grid belongs to the grid, 'x=0:1:5 y=0:1:5'
+        eval_table(expression[0], list(kwargs["grid"]) + list(vars_sub), kwargs)
         return
 
     if len(vars_sub) % 2 != 0:
@@ -795,7 +934,43 @@ def eval(expression: str, vars_sub: list, **kwargs: dict) -> None:
         kwargs["copy"],
     ]
 
-    send_to_thread(to_send, EvaluateWorker)
+    run_command(to_send)
+
+
+def eval_table(expression: str, grid: list, kwargs: dict) -> None:
+    """
+    Tabulates expression in-process and streams the table to stdout or the file given by --out
+
+    :param expression: str
+        Expression to evaluate
+    :param grid: list
+        Variables of the grid of the type var=start:stop:num
+    :param kwargs: dict
+        Options of 'caspy eval'
+    """
+    from .compute.evaluate import EvaluateCompute
+
+    if kwargs["preview"]:
+        print_output({"error": ["--preview can't be used with --grid or --values"]})
+        return
+    if any("=" not in var for var in grid):
+        print_output(
+            {"error": ["The grid must consist of variables of the type var=start:stop:num"]}
+        )
+        return
+
+    result = EvaluateCompute().write_table(
+        expression,
+        " ".join(grid),
+        kwargs["values"] or "",
+        kwargs["out"] or sys.stdout,
+        kwargs["use_scientific"],
+        kwargs["accuracy"],
+    )
+    if "error" in result:
+        print_output(result)
+    elif kwargs["out"]:
+        print(f"Wrote {result['table'][2]} rows to {kwargs['out']}")
 
 
 @main.command(cls=EncloseNegative)
@@ -817,10 +992,8 @@ def pf(number: int, **kwargs: dict) -> None:
     Example(s):
     >>> caspy pf 372
     """
-    from .qt_assets.tabs.pf import PfWorker
-
     to_send = ["calc_pf", [number], kwargs["copy"]]
-    send_to_thread(to_send, PfWorker)
+    run_command(to_send)
 
 
 @main.command(cls=EncloseNegative)
@@ -835,16 +1008,9 @@ def web(website_index: int, list_websites: bool, **kwargs: dict) -> None:
     >>> caspy web 4
     >>> caspy web -l
     """
-    import json
-    import pkg_resources
+    from .resources import load_json
 
-    with open(
-        pkg_resources.resource_filename("caspy3", "data/websites.json"),
-        "r",
-        encoding="utf8",
-    ) as json_f:
-        json_data = json_f.read()
-        web_list = json.loads(json_data)
+    web_list = load_json("data/websites.json")
 
     if website_index:
         if website_index < 1 or website_index > len(web_list):
@@ -862,23 +1028,568 @@ def web(website_index: int, list_websites: bool, **kwargs: dict) -> None:
         webbrowser.open(url)
 
 
-def send_to_thread(input_list: list, worker: ty.Type[BaseWorker]) -> None:
+@main.command()
+@click.option(
+    "--clear", is_flag=True, default=False, help="Remove every stored result."
+)
+def cache(clear: bool) -> None:
+    """Show statistics of the result cache or clear it.
+
+    Clearing the cache removes the rendered LaTeX of the GUI as well.
+
+    \b
+    Example(s):
+    >>> caspy cache
+    >>> caspy cache --clear
+    """
+    from .compute.cache import ResultCache, latex_cache_dir
+
+    result_cache = ResultCache()
+    if clear:
+        result_cache.clear()
+        print(f"Cleared {result_cache.path}")
+        import os
+        import shutil
+
+        if os.path.isdir(latex_cache_dir()):
+            shutil.rmtree(latex_cache_dir(), ignore_errors=True)
+            print(f"Cleared {latex_cache_dir()}")
+        return
+
+    stats = result_cache.stats()
+    print(f"Path: {stats['path']}")
+    print(f"Entries: {stats['entries']}")
+    print(f"Size: {stats['size']} / {stats['max_size']} bytes")
+    print(f"Hits: {stats['hits']}")
+    print(f"Misses: {stats['misses']}")
+    print(f"Hit rate: {stats['hit_rate']:.1%}")
+    for command, count in stats["commands"].items():
+        print(f"    {command}: {count}")
+
+
+@main.command("compile-ui")
+@click.option(
+    "--benchmark",
+    "-b",
+    "repeat",
+    type=int,
+    default=None,
+    metavar="N",
+    help="Build every ui N times with loadUi and with the compiled class and compare.",
+)
+def compile_ui(repeat: int) -> None:
+    """Generate Python classes from the .ui files of the GUI.
+
+    The GUI uses the generated classes instead of parsing the .ui files with loadUi
+    at startup. A generated class older than its .ui file is ignored.
+
+    \b
+    Example(s):
+    >>> caspy compile-ui
+    >>> caspy compile-ui --benchmark 10
+    """
+    from .qt_assets.ui import benchmark, compile_all
+
+    for module_path in compile_all():
+        print(f"Generated {module_path}")
+
+    if repeat is None:
+        return
+
+    from PyQt5.QtWidgets import QApplication
+
+    suppress_qt_warnings()
+    app = QApplication(sys.argv)
+
+    results = benchmark(max(repeat, 1))
+    width = max(len(result["file"]) for result in results)
+    print(f"\n{'ui':<{width}}  {'loadUi first/mean':>20}  {'compiled first/mean':>20}")
+    totals = {"loadUi": 0.0, "compiled": 0.0}
+    for result in results:
+        if "error" in result:
+            print(f"{result['file']:<{width}}  {result['error']}")
+            continue
+        columns = []
+        for method in ("loadUi", "compiled"):
+            if result[method] is None:
+                columns.append(f"{'not compiled':>20}")
+                continue
+            first, mean = result[method]
+            totals[method] += first
+            columns.append(f"{first:7.2f} / {mean:6.2f} ms")
+        print(f"{result['file']:<{width}}  " + "  ".join(f"{c:>20}" for c in columns))
+    print(
+        f"{'total (first)':<{width}}  {totals['loadUi']:17.2f} ms  {totals['compiled']:17.2f} ms"
+    )
+    app.quit()
+
+
+@main.group()
+def daemon() -> None:
+    """Keep warm worker processes running for the other commands.
+
+    While the daemon is running, commands like 'caspy deriv' are sent to it over a
+    Unix domain socket instead of importing SymPy. Without a daemon they are
+    evaluated in-process as usual. Set CASPY_NO_DAEMON to never use the daemon.
+
+    \b
+    Example(s):
+    >>> caspy daemon start -w 2
+    >>> caspy daemon status
+    >>> caspy daemon stop
+    """
+
+
+@daemon.command("start")
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(1),
+    default=None,
+    help="Number of worker processes. Defaults to 'processes' in settings.json.",
+)
+@click.option(
+    "--foreground",
+    is_flag=True,
+    default=False,
+    help="Run the daemon in this process instead of in the background.",
+)
+def daemon_start(workers: int, foreground: bool) -> None:
+    """Start the daemon."""
+    from .daemon import DaemonServer, is_supported, request
+
+    if not is_supported():
+        print("The daemon requires Unix domain sockets, which this platform doesn't support")
+        sys.exit(1)
+
+    status = request({"op": "status"})
+    if status is not None:
+        print(f"Daemon is already running (pid {status['pid']})")
+        return
+
+    if workers is None:
+        from .resources import load_json
+
+        workers = load_json("data/settings.json").get("processes", 2)
+
+    if foreground:
+        server = DaemonServer(workers=workers)
+        print(f"Listening on {server.socket_path}")
+        server.serve_forever()
+        return
+
+    import subprocess
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "caspy3.cli", "daemon", "start", "--foreground", "-w", str(workers)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline and process.poll() is None:
+        status = request({"op": "status"})
+        if status is not None:
+            print(f"Daemon started (pid {status['pid']}) on {status['socket']}")
+            return
+        time.sleep(0.05)
+
+    print("Daemon failed to start, run 'caspy daemon start --foreground' to see why")
+    sys.exit(1)
+
+
+@daemon.command("stop")
+def daemon_stop() -> None:
+    """Stop the daemon."""
+    import os
+
+    from .daemon import default_socket_path, request
+
+    if request({"op": "stop"}) is None:
+        print("Daemon isn't running")
+        return
+
+    deadline = time.monotonic() + 10
+    while os.path.exists(default_socket_path()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    print("Daemon stopped")
+
+
+@daemon.command("status")
+def daemon_status() -> None:
+    """Show whether the daemon is running."""
+    from .daemon import request
+
+    start = time.perf_counter()
+    status = request({"op": "status"})
+    latency = (time.perf_counter() - start) * 1000
+    if status is None:
+        print("Daemon isn't running")
+        sys.exit(1)
+
+    print(f"Pid: {status['pid']}")
+    print(f"Version: {status['version']}")
+    print(f"Socket: {status['socket']}")
+    print(f"Workers: {status['workers']}")
+    print(f"Uptime: {status['uptime']:.0f} s")
+    print(f"Jobs: {status['jobs']}")
+    print(f"Round trip: {latency:.2f} ms")
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", help="Address to listen on.")
+@click.option("--port", "-p", type=click.IntRange(0, 65535), default=8765, help="Port to listen on.")
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(1),
+    default=None,
+    help="Number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--max-queue",
+    "-q",
+    type=click.IntRange(0),
+    default=None,
+    help="Number of requests that may wait for a worker, further requests are answered "
+    "with 503. Defaults to four times the number of workers.",
+)
+def serve(host: str, port: int, workers: int, max_queue: int) -> None:
+    """Serve every command as a local HTTP/JSON endpoint.
+
+    'POST /calc_deriv' with the parameters of the command as a JSON object evaluates
+    it in a pool of worker processes. 'GET /health' and 'GET /metrics' report the
+    state of the server and 'GET /commands' lists the parameters of every command.
+
+    \b
+    Example(s):
+    >>> caspy serve -p 8765 -w 4
+    >>> curl -d '{"params": ["x**x", "x", 1, "", 3, false, false, null, 10]}' localhost:8765/calc_deriv
+    """
+    import asyncio
+
+    from .server import ComputeServer
+
+    server = ComputeServer(host, port, workers, max_queue, get_timeout())
+
+    def ready(server: ComputeServer) -> None:
+        print(f"Serving on http://{server.host}:{server.port} with {server.workers} workers")
+        sys.stdout.flush()
+
+    asyncio.run(server.serve(ready))
+
+
+def get_timeout() -> ty.Union[float, None]:
+    """
+    Returns the timeout given by '--timeout' or else the one in settings.json
+
+    :return: float or None
+        Number of seconds a calculation may run, None for no limit
+    """
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None:
+        obj = ctx.find_root().obj
+        if isinstance(obj, dict) and obj.get("timeout") is not None:
+            return obj["timeout"]
+
+    from .resources import load_json
+
+    try:
+        return load_json("data/settings.json").get("timeout", None)
+    except (OSError, ValueError):
+        return None
+
+
+# Commands that can be used in 'caspy batch'
+BATCH_COMMANDS = [
+    "deriv",
+    "integ",
+    "sum",
+    "limit",
+    "eq",
+    "diff-eq",
+    "eval",
+    "simp",
+    "exp",
+    "pf",
+]
+
+
+def read_jobs(
+    stream: ty.TextIO, file_format: str
+) -> ty.Iterator[ty.Union[dict, Exception]]:
+    """
+    Reads jobs from a JSONL or CSV stream. A job is a dict such as
+    {"command": "deriv", "params": ["x**x", "x"], "options": {"accuracy": 5}, "id": "a"}.
+
+    In a CSV file the columns 'command' and 'id' are read as is, columns whose name starts with
+    'param' are the parameters in the order of the header and every other column is an option.
+
+    :param stream: TextIO
+        Stream to read from
+    :param file_format: str
+        Either 'jsonl' or 'csv'
+    :return: iterator
+        Yields the jobs lazily, an exception is yielded for every line that couldn't be read
+    """
+    import csv
+    import json
+
+    if file_format == "csv":
+        for row in csv.DictReader(stream):
+            job = {"params": [], "options": {}}
+            for column, value in row.items():
+                if column is None or value is None or value == "":
+                    continue
+                column = column.strip()
+                if column in ("command", "id"):
+                    job[column] = value
+                elif column.startswith("param"):
+                    job["params"].append(value)
+                elif value.lower() in ("true", "false"):
+                    job["options"][column] = value.lower() == "true"
+                else:
+                    job["options"][column] = value
+            yield job
+    else:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                if type(job) != dict:
+                    raise ValueError("Every line must be a JSON object")
+                yield job
+            except ValueError as e:
+                yield e
+
+
+def prepare_job(job: dict) -> ty.Union[list, dict]:
+    """
+    Turns a job into [command, params] by invoking the CLI command with the parameters and options
+    of the job, so that defaults and validation are the same as on the command line.
+
+    :param job: dict
+        Job as read by read_jobs()
+    :return: list or dict
+        [command, params] of the compute package or a dict with an error message
+    """
+    import contextlib
+    import io
+
+    name = str(job.get("command", "")).replace("_", "-")
+    if name not in BATCH_COMMANDS:
+        return {
+            "error": [
+                f"Error: unknown command '{name}', choose from {', '.join(BATCH_COMMANDS)}"
+            ]
+        }
+
+    args = [str(param) for param in job.get("params", [])]
+    for option, value in job.get("options", {}).items():
+        flag = "--" + option.replace("_", "-")
+        if option == "copy" or value is False or value is None:
+            continue
+        elif value is True:
+            args.append(flag)
+        else:
+            args += [flag, str(value)]
+
+    command = main.commands[name]
+    jobs = []
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            with command.make_context(name, args, obj={"jobs": jobs}) as ctx:
+                command.invoke(ctx)
+    except click.ClickException as e:
+        return {"error": [e.format_message()]}
+    except Exception:
+        return {"error": [f"Error: {traceback.format_exc()}"]}
+
+    if not jobs:
+        return {"error": [output.getvalue().strip() or "Error: invalid job"]}
+    if type(jobs[0]) == dict:
+        return {"error": list(jobs[0].values())}
+    return jobs[0][:2]
+
+
+def run_job(prepared: ty.Union[list, dict]) -> dict:
+    """
+    Executes a job prepared by prepare_job()
+
+    :param prepared: list or dict
+        [command, params] or an error dict
+    :return: dict
+        Dict containing exact answer and approximate answer or error message
+    """
+    if type(prepared) == dict:
+        return prepared
+
+    from .compute import run
+
+    return run(*prepared)
+
+
+@main.command()
+@click.argument("input_file", type=click.File("r", encoding="utf8"), default="-")
+@click.option(
+    "--format",
+    "-f",
+    "file_format",
+    type=click.Choice(["jsonl", "csv"]),
+    default=None,
+    help="Format of the input. Defaults to csv for files ending with .csv and jsonl otherwise.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(1),
+    default=1,
+    help="Number of processes evaluating jobs in parallel.",
+)
+@click.option(
+    "--unordered",
+    is_flag=True,
+    default=False,
+    help="Write results as soon as they are done instead of in input order.",
+)
+def batch(input_file: ty.TextIO, file_format: str, jobs: int, unordered: bool) -> None:
+    """Evaluate a stream of jobs from a JSONL or CSV file or stdin.
+
+    Every line of JSONL is a job such as
+    {"command": "deriv", "params": ["x**x", "x"], "options": {"accuracy": 5}}.
+    Options are the long names of the flags of the command and "timeout" overrides
+    '--timeout' for a single job. Results are written to stdout as one JSON object per line
+    with the index of the job.
+
+    \b
+    Example(s):
+    >>> caspy batch jobs.jsonl
+    >>> caspy batch jobs.csv -j 4 --unordered
+    """
+    import json
+
+    if file_format is None:
+        file_format = "csv" if input_file.name.lower().endswith(".csv") else "jsonl"
+
+    def prepared_jobs() -> ty.Iterator[ty.Tuple[int, dict, ty.Union[list, dict]]]:
+        for index, job in enumerate(read_jobs(input_file, file_format)):
+            if isinstance(job, Exception):
+                yield index, {}, {"error": [f"Error: invalid job: {job}"]}
+            else:
+                yield index, job, prepare_job(job)
+
+    def write(index: int, job: dict, result: dict) -> None:
+        record = {"index": index}
+        if "id" in job:
+            record["id"] = job["id"]
+        if "command" in job:
+            record["command"] = job["command"]
+        record["result"] = result
+        click.echo(json.dumps(record, default=str))
+        sys.stdout.flush()
+
+    timeout = get_timeout()
+
+    if jobs == 1 and not timeout:
+        for index, job, prepared in prepared_jobs():
+            write(index, job, run_job(prepared))
+        return
+
+    import concurrent.futures
+    from .compute.pool import ProcessExecutor
+
+    executor = ProcessExecutor(jobs, timeout)
+    try:
+        futures = {}
+        for index, job, prepared in prepared_jobs():
+            if type(prepared) == dict:
+                future = concurrent.futures.Future()
+                future.set_result(prepared)
+            else:
+                future = executor.submit(*prepared, timeout=job.get("timeout"))
+            futures[future] = (index, job)
+
+        if unordered:
+            for future in concurrent.futures.as_completed(futures):
+                write(*futures[future], future.result())
+        else:
+            for future, (index, job) in futures.items():
+                write(index, job, future.result())
+    finally:
+        executor.shutdown(wait=False)
+
+
+def run_command(input_list: ty.Union[list, dict]) -> None:
+    """
+    Executes the command synchronously and prints the output. The command is sent to the daemon
+    if one is running, otherwise it's run by the compute package in the current process.
+    No QApplication or thread is created.
+
+    :param input_list: list
+        List of [command, params, copy]. A dict means that the validation failed and contains the error
+    """
+
     def excepthook(exc_type, exc_value, exc_tb) -> None:
         tb = "".join(traceback.format_exception(exc_type, exc_value, exc_tb))
         print("error catched!:")
         print("error message:\n", tb)
 
     sys.excepthook = excepthook
-    app = QApplication(sys.argv)
 
-    try:
-        worker_thread = Cli(input_list[0], input_list[1], input_list[2], worker)
-        worker_thread.call_worker()
-    except KeyError:
-        print("Invalid number of arguments")
-        sys.exit()
+    # Inside 'caspy batch' the command is collected instead of executed
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None and isinstance(ctx.obj, dict) and "jobs" in ctx.obj:
+        ctx.obj["jobs"].append(input_list)
+        return
+
+    if type(input_list) == dict:
+        print_output({"error": list(input_list.values())})
+        return
+
+    from .daemon import run_in_daemon
+    from .startup import get_startup_timer
+
+    startup_timer = get_startup_timer()
+
+    command, params, copy_output = input_list
+    timeout = get_timeout()
+
+    # A running daemon has SymPy imported already, the compute package is only imported without it
+    result = run_in_daemon(command, params, timeout, CLI_REPRESENTATIONS)
+    if result is not None:
+        if startup_timer:
+            startup_timer.mark(f"run {command} in daemon")
+    else:
+        from .compute import run
+
+        if startup_timer:
+            startup_timer.mark("import compute package")
+
+        if timeout:
+            # The command has to run in another process so that it can be stopped
+            from .compute.pool import ProcessExecutor
+
+            executor = ProcessExecutor(1, timeout)
+            try:
+                result = executor.run(command, params, representations=CLI_REPRESENTATIONS)
+            finally:
+                executor.shutdown(wait=False)
+        else:
+            result = run(command, params, CLI_REPRESENTATIONS)
+
+        if startup_timer:
+            startup_timer.mark(f"run {command}")
+
+    if copy_output:
+        from .compute.base import BaseCompute
+
+        BaseCompute.copy_result(result, copy_output)
 
-    sys.exit(app.exec())
+    print_output(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+The symbolic engine of CASPy. Nothing in this package depends on Qt.
+
+Every command is available as a plain function returning the same dict as the worker in the GUI:
+
+    >>> from caspy3.compute import calc_deriv
+    >>> calc_deriv("x**x", "x", 1, "", 3, False, False, None, 10)
+    {'deriv': ['x**x*(log(x) + 1)', 0], 'latex': 'x^{x} \\\\left(\\\\log{\\\\left(x \\\\right)} + 1\\\\right)'}
+
+Commands can also be called by name with run(). Only the representations of the answer that are
+needed are rendered when representations is given, the CLI for example skips the LaTeX:
+
+    >>> calc_deriv("x**x", "x", 1, "", 3, False, False, None, 10, representations=["exact"])
+    {'deriv': ['x**x*(log(x) + 1)', 0]}
+"""
+
+import typing as ty
+
+from .base import BaseCompute, command_function
+from .derivative import DerivativeCompute
+from .equations import EquationsCompute
+from .evaluate import EvaluateCompute
+from .expand import ExpandCompute
+from .formulas import FormulaCompute
+from .integral import IntegralCompute
+from .limit import LimitCompute
+from .pf import PfCompute
+from .result import REPRESENTATIONS, PrintSettings, Result
+from .simplify import SimpCompute
+from .summation import SummationCompute
+
+# Every command and the class implementing it
+COMMAND_CLASSES = {
+    "prev_deriv": DerivativeCompute,
+    "calc_deriv": DerivativeCompute,
+    "calc_deriv_points": DerivativeCompute,
+    "prev_integ": IntegralCompute,
+    "calc_integ": IntegralCompute,
+    "prev_limit": LimitCompute,
+    "calc_limit": LimitCompute,
+    "prev_sum": SummationCompute,
+    "calc_sum": SummationCompute,
+    "prev_normal_eq": EquationsCompute,
+    "calc_normal_eq": EquationsCompute,
+    "prev_diff_eq": EquationsCompute,
+    "calc_diff_eq": EquationsCompute,
+    "prev_system_eq": EquationsCompute,
+    "calc_system_eq": EquationsCompute,
+    "prev_eval_exp": EvaluateCompute,
+    "eval_exp": EvaluateCompute,
+    "eval_table": EvaluateCompute,
+    "prev_simp_exp": SimpCompute,
+    "simp_exp": SimpCompute,
+    "prev_expand_exp": ExpandCompute,
+    "expand_exp": ExpandCompute,
+    "calc_pf": PfCompute,
+    "prev_formula": FormulaCompute,
+    "calc_formula": FormulaCompute,
+    "calc_formula_sweep": FormulaCompute,
+}
+
+COMMANDS: ty.Dict[str, ty.Callable[..., ty.Any]] = {
+    command: command_function(compute_class, command)
+    for command, compute_class in COMMAND_CLASSES.items()
+}
+
+prev_deriv = COMMANDS["prev_deriv"]
+calc_deriv = COMMANDS["calc_deriv"]
+calc_deriv_points = COMMANDS["calc_deriv_points"]
+prev_integ = COMMANDS["prev_integ"]
+calc_integ = COMMANDS["calc_integ"]
+prev_limit = COMMANDS["prev_limit"]
+calc_limit = COMMANDS["calc_limit"]
+prev_sum = COMMANDS["prev_sum"]
+calc_sum = COMMANDS["calc_sum"]
+prev_normal_eq = COMMANDS["prev_normal_eq"]
+calc_normal_eq = COMMANDS["calc_normal_eq"]
+prev_diff_eq = COMMANDS["prev_diff_eq"]
+calc_diff_eq = COMMANDS["calc_diff_eq"]
+prev_system_eq = COMMANDS["prev_system_eq"]
+calc_system_eq = COMMANDS["calc_system_eq"]
+prev_eval_exp = COMMANDS["prev_eval_exp"]
+eval_exp = COMMANDS["eval_exp"]
+eval_table = COMMANDS["eval_table"]
+prev_simp_exp = COMMANDS["prev_simp_exp"]
+simp_exp = COMMANDS["simp_exp"]
+prev_expand_exp = COMMANDS["prev_expand_exp"]
+expand_exp = COMMANDS["expand_exp"]
+calc_pf = COMMANDS["calc_pf"]
+prev_formula = COMMANDS["prev_formula"]
+calc_formula = COMMANDS["calc_formula"]
+calc_formula_sweep = COMMANDS["calc_formula_sweep"]
+
+
+def run(
+    command: str, params: list, representations: ty.Iterable[str] = None
+) -> ty.Dict[str, ty.Any]:
+    """
+    Runs a command by name.
+
+    :param command: str
+        Name of the command, for example 'calc_integ'
+    :param params: list
+        Parameters of the command
+    :param representations: iterable
+        Representations of the answer to render out of REPRESENTATIONS, None for all
+    :return: dict
+        Dict containing exact answer and approximate answer or error message
+    """
+    if command not in COMMANDS:
+        return {"error": [f"Error: unknown command '{command}'"]}
+    return COMMANDS[command](*params, representations=representations)
@@ -0,0 +1,509 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+from .result import REPRESENTATIONS, PrintSettings, Result
+
+import functools
+import inspect
+import typing as ty
+import traceback
+
+
+def catch_thread(func: ty.Callable[..., ty.Any]):
+    """Decorator to catch any errors of a slot. This decorator shouldn't be called under normal circumstances"""
+
+    @functools.wraps(func)
+    def wrapper(*s, **gs):
+        try:
+            result = func(*s, **gs)
+            return result
+        except Exception:
+            return {"error": [f"ERROR IN SOURCE CODE: \n\n{traceback.format_exc()}"]}
+
+    return wrapper
+
+
+class BaseCompute:
+    """
+    Base class of every command class. It holds the symbolic code shared between the commands and
+    doesn't depend on Qt, which means it can be used both by the QRunnable workers in the GUI and
+    directly by the CLI.
+    """
+
+    @staticmethod
+    def catch_error(func: ty.Callable[..., ty.Any]):
+        """Decorator for debugging. It will print params and copy result"""
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                result = func(self, *args, **kwargs)
+            except Exception:
+                return {
+                    "error": [f"ERROR IN SOURCE CODE: \n\n{traceback.format_exc()}"]
+                }
+
+            return result
+
+        return wrapper
+
+    def execute(
+        self, command: str, params: list, representations: ty.Iterable[str] = None
+    ) -> ty.Any:
+        """
+        Calls command with params synchronously and returns the result.
+        The result is looked up in the result cache first and stored in it afterwards, except for
+        the commands in cache.UNCACHED_COMMANDS.
+
+        :param command: str
+            Name of the method to call, for example 'calc_deriv'
+        :param params: list
+            Parameters passed on to the method
+        :param representations: iterable
+            Representations of the answer to render out of result.REPRESENTATIONS, None for all
+        :return: dict
+            Dict containing exact answer and approximate answer or error message
+        """
+        from .cache import UNCACHED_COMMANDS, get_cache, make_key
+
+        if representations is not None:
+            representations = tuple(name for name in REPRESENTATIONS if name in representations)
+
+        cache = get_cache() if command not in UNCACHED_COMMANDS else None
+        key = None
+        if cache is not None:
+            try:
+                key = make_key(command, params, representations)
+                cached = cache.get(key)
+            except Exception:
+                key = cached = None
+            if cached is not None:
+                return cached
+
+        try:
+            result = getattr(self, command)(*params)
+            if isinstance(result, Result):
+                result = result.to_dict(representations)
+        except Exception:
+            return {
+                "error": [
+                    f"Error calling function from worker thread: \n{traceback.format_exc()}"
+                ]
+            }
+
+        # Errors aren't stored, they might depend on something else than the parameters
+        if key is not None and type(result) == dict and "error" not in result:
+            try:
+                cache.put(key, command, result)
+            except Exception:
+                pass
+
+        return result
+
+    @staticmethod
+    def copy_result(result: ty.Dict[str, ty.List[str]], copy_output: int) -> None:
+        """
+        Copies the result to the clipboard.
+
+        :param result: dict
+            Dict returned by a command
+        :param copy_output: int
+            1 for exact_ans, 2 for approx_ans, and 3 for a list of [exact_ans, approx_ans]
+        """
+        from pyperclip import copy
+
+        output = list(result.values())[0]
+        if copy_output == 1:
+            exact_ans = output[0]
+            if type(exact_ans) == list:
+                if len(exact_ans) == 1:
+                    copy(str(exact_ans[0]))
+            else:
+                copy(str(exact_ans))
+        elif copy_output == 2:
+            approx_ans = output[1]
+            if type(approx_ans) == list:
+                if len(approx_ans) == 1:
+                    copy(str(approx_ans[0]))
+            else:
+                copy(str(approx_ans))
+        elif copy_output == 3:
+            copy(str(output))
+        else:
+            pass
+
+    def approximate(
+        self, expression: Expr, accuracy: int, use_scientific: ty.Union[int, None]
+    ) -> str:
+        """
+        Numeric value of expression as a string, in scientific notation if use_scientific is set
+
+        :param expression: Expr
+            Expression to evaluate
+        :param accuracy: int
+            Number of significant digits
+        :param use_scientific: int or None
+            Accuracy of the scientific notation, None to print the number as is
+        :return: str
+            The approximate answer
+        """
+        if use_scientific:
+            return self.to_scientific_notation(str(N(expression, accuracy)), use_scientific)
+        return str(N(expression, accuracy))
+
+    @catch_thread
+    def to_scientific_notation(self, number: str, accuracy: int = 5) -> str:
+        """
+        Converts number into the string "a*x**b" where a is a float and b is an integer unless it's not a number in the
+        complex plane, such as infinity.
+        For Complex numbers, a+b*i becomes c*10**d + e*10**f*I
+
+        :param number: str
+            number to be converted into
+        :param accuracy: int
+            accuracy of scientific notation
+        :return: str
+            scientific notation of number in string
+        """
+
+        # Is "a+b*i -> c*10**d + e*10**f*I" even a thing?
+        # Can't find anything on internet but I'm implementing it like this for now
+
+        number = str(number)
+        sym_num = sympify(number)
+
+        if not sym_num.is_complex:
+            return number
+
+        if type(accuracy) != int:
+            print("Accuracy must be an integer over 1, defaulting to 5")
+            accuracy = 5
+
+        if accuracy < 1:
+            print("Accuracy must be an integer over 1, defaulting to 5")
+            accuracy = 5
+
+        if sym_num.is_real:
+
+            if sym_num < 0:
+                negative = "-"
+                number = number[1:]
+                sym_num = sympify(number)
+            else:
+                negative = ""
+
+            int_part = number.split(".")[0]
+            no_decimal = number.replace(".", "")
+
+            # convert it into 0.number, round it then convert it back into number
+            output = str(sympify("0." + no_decimal).round(accuracy))[2:]
+            if accuracy != 1:
+                output = output[:2] + "." + output[2:]
+
+            if sym_num < 1:
+                zero_count = 0
+                while zero_count < len(no_decimal) and no_decimal[zero_count] == "0":
+                    zero_count += 1
+
+                output = no_decimal[zero_count:]
+                output = str(sympify("0." + output).round(accuracy))[2:]
+
+                if accuracy != 1:
+                    output = output[:1] + "." + output[1:]
+
+                output += f"*10**(-{zero_count})"
+                return negative + output
+            else:
+                output = str(sympify("0." + no_decimal).round(accuracy))[2:]
+                if accuracy != 1:
+                    output = output[:1] + "." + output[1:]
+
+                output += "*10**" + str(len(int_part.replace("-", "")) - 1)
+                return negative + output
+        else:
+            real = re(sym_num)
+            imag = im(sym_num)
+
+            real = self.to_scientific_notation(real, accuracy)
+            imag = self.to_scientific_notation(imag, accuracy)
+
+            output = real
+            if sympify(imag) < 0:
+                output += f" - {imag[1:]}*I"
+            else:
+                output += f" + {imag}*I"
+            return output
+
+    @catch_thread
+    def prev_normal_eq(
+        self,
+        left_expression: str,
+        right_expression: str,
+        input_variable: str,
+        domain: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+    ) -> ty.Dict[str, ty.List[str]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if "=" in left_expression:
+            if left_expression.count("=") > 1:
+                return {"error": ["Enter only one equals sign"]}
+            else:
+                eq = left_expression.split("=")
+                left_expression = eq[0]
+                right_expression = eq[1]
+        else:
+            if not left_expression or not right_expression:
+                return {"error": ["Enter an expression both in left and right side"]}
+
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+
+        try:
+            _ = parse_expr(input_variable)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        try:
+            full_equation = Eq(
+                parse_expr(left_expression), parse_expr(right_expression)
+            )
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        self.latex_answer = str(latex(full_equation))
+
+        if output_type == 1:
+            self.exact_ans = settings.pretty(full_equation)
+        elif output_type == 2:
+            self.exact_ans = self.latex_answer
+        else:
+            self.exact_ans = self.eq_to_text(full_equation)
+
+        self.exact_ans += f"\nDomain: {domain}"
+
+        return {"eq": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
+
+    @catch_thread
+    def calc_normal_eq(
+        self,
+        left_expression: str,
+        right_expression: str,
+        input_variable: str,
+        solve_type: int,
+        domain: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+        verify_domain: bool,
+        approximate: ty.Union[str, None] = None,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if approximate == "":
+            return {"error": ["Enter starting vector"]}
+
+        try:
+            domain = parse_expr(domain)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        if "=" in left_expression:
+            if left_expression.count("=") > 1:
+                return {"error": ["Enter only one equals sign"]}
+            else:
+                eq = left_expression.split("=")
+                left_expression = eq[0]
+                right_expression = eq[1]
+        else:
+            if not left_expression or not right_expression:
+                return {"error": ["Enter an expression both in left and right side"]}
+
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+
+        if use_scientific:
+            if use_scientific > accuracy:
+                accuracy = use_scientific
+
+        if approximate:
+            try:
+                _startv = parse_expr(approximate)
+                self.exact_ans = nsolve(
+                    Eq(parse_expr(left_expression), parse_expr(right_expression)),
+                    parse_expr(input_variable),
+                    _startv,
+                    prec=accuracy,
+                )
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+            self.exact_ans = str(self.exact_ans)
+            self.approx_ans = self.exact_ans
+            self.latex_answer = str(latex(self.exact_ans))
+
+            return {"eq": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
+
+        if solve_type == 1:
+            try:
+                self.exact_ans = solveset(
+                    Eq(parse_expr(left_expression), parse_expr(right_expression)),
+                    parse_expr(input_variable),
+                    domain=domain,
+                )
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        else:
+            try:
+                self.exact_ans = solve(
+                    Eq(parse_expr(left_expression), parse_expr(right_expression)),
+                    parse_expr(input_variable),
+                    domain=domain,
+                    rational=True,
+                )
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+            return self.solved_answer(
+                self.exact_ans,
+                domain,
+                output_type,
+                use_scientific,
+                accuracy,
+                verify_domain,
+                settings,
+            )
+
+        self.latex_answer = str(latex(self.exact_ans))
+        if output_type == 1:
+            self.exact_ans = settings.pretty(self.exact_ans)
+        elif output_type == 2:
+            self.exact_ans = str(latex(self.exact_ans))
+        else:
+            self.exact_ans = [str(i) for i in self.exact_ans]
+
+        return {"eq": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
+
+    def solved_answer(
+        self,
+        solutions: ty.List[Expr],
+        domain: ty.Union[Set, Interval],
+        output_type: int,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+        verify_domain: bool,
+        settings: PrintSettings = PrintSettings(),
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        """
+        Formats the solutions of solve() as the answer of calc_normal_eq
+
+        :param solutions: list
+            Solutions returned by solve()
+        :param domain: Set
+            Domain of the variable, solutions outside of it are dropped if verify_domain is True
+        :return: Result
+            The answer 'eq', a dict with the error if the domain couldn't be verified
+        """
+        self.exact_ans = solutions
+        if verify_domain:
+            self.exact_ans = self.verify_domain(self.exact_ans, domain)
+
+        if type(self.exact_ans) != list:
+            return self.exact_ans
+
+        approx_list = [str(N(i, accuracy)) for i in self.exact_ans]
+
+        if use_scientific:
+            approx_list = [
+                self.to_scientific_notation(str(i), use_scientific)
+                for i in approx_list
+            ]
+
+        self.approx_ans = approx_list[0] if len(approx_list) == 1 else approx_list
+
+        return Result("eq", self.exact_ans, self.approx_ans, output_type, settings)
+
+    @catch_thread
+    def verify_domain(
+        self, input_values: ty.List[Expr], domain: ty.Union[Set, Interval]
+    ) -> ty.List[Expr]:
+        output = []
+
+        for value in input_values:
+
+            if len(value.free_symbols) != 0:
+                output.append(value)
+            else:
+                if type(domain.contains(value)) == Contains or not domain.contains(
+                    value
+                ):
+                    pass
+                else:
+                    output.append(value)
+
+        return output
+
+    @catch_thread
+    def eq_to_text(self, equation: Eq) -> str:
+        return f"{equation.lhs} = {equation.rhs}"
+
+
+def command_function(
+    compute_class: ty.Type[BaseCompute], command: str
+) -> ty.Callable[..., ty.Any]:
+    """
+    Creates a plain function out of a command of a compute class.
+    A new instance is created for every call, which means that no state is shared between calls.
+
+    :param compute_class: BaseCompute
+        Class that implements the command
+    :param command: str
+        Name of the command, for example 'calc_deriv'
+    :return: function
+        Function taking the same parameters as the command and returning the same dict. The
+        keyword argument representations is passed on to BaseCompute.execute()
+    """
+    method = getattr(compute_class, command)
+
+    @functools.wraps(method)
+    def function(*params: ty.Any, representations: ty.Iterable[str] = None) -> ty.Any:
+        return compute_class().execute(command, params, representations)
+
+    signature = inspect.signature(method)
+    function.__signature__ = signature.replace(
+        parameters=list(signature.parameters.values())[1:]
+        + [
+            inspect.Parameter(
+                "representations", inspect.Parameter.KEYWORD_ONLY, default=None
+            )
+        ]
+    )
+    function.compute_class = compute_class
+    return function
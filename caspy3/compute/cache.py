@@ -0,0 +1,300 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Persistent result cache of the commands.
+
+Results are stored in a SQLite file in the user cache directory. The key of a result is computed
+from the name of the command and every parameter, where strings that can be parsed by SymPy are
+replaced by the srepr of the unevaluated expression so that 'x**2+1' and 'x**2 + 1' share an entry.
+The version of CASPy and SymPy is part of the key as well, upgrading either invalidates the cache.
+"""
+
+from sympy import __version__ as sympy_version, srepr
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import typing as ty
+
+from .. import __version__ as caspy_version
+from .parsing import parse_expr
+
+# Default upper bound of the size of the stored results in bytes
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# Commands whose result depends on more than their parameters, such as the content of a file
+UNCACHED_COMMANDS = {"eval_table", "calc_formula_sweep"}
+
+
+def default_cache_path() -> str:
+    """
+    Path of the cache file. CASPY_CACHE_DIR overrides the platform cache directory.
+
+    :return: str
+        Path to the SQLite file
+    """
+    cache_dir = os.environ.get("CASPY_CACHE_DIR")
+    if not cache_dir:
+        if os.name == "nt":
+            base_dir = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+        else:
+            base_dir = os.environ.get(
+                "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+            )
+        cache_dir = os.path.join(base_dir, "caspy3")
+    return os.path.join(cache_dir, "results.sqlite3")
+
+
+def latex_cache_dir() -> str:
+    """Directory of the rendered LaTeX of the GUI, next to the result cache"""
+    return os.path.join(os.path.dirname(default_cache_path()), "latex")
+
+
+def normalize_param(param: ty.Any) -> ty.Any:
+    """
+    Converts a parameter into a canonical form used in the cache key.
+
+    :param param: Any
+        Parameter passed to a command
+    :return: Any
+        srepr of the expression for parsable strings, the parameter itself otherwise
+    """
+    if isinstance(param, str):
+        try:
+            return ("expr", srepr(parse_expr(param, evaluate=False)))
+        except Exception:
+            return ("str", param)
+    if isinstance(param, (list, tuple)):
+        return tuple(normalize_param(p) for p in param)
+    if isinstance(param, dict):
+        return tuple(
+            sorted((repr(k), normalize_param(v)) for k, v in param.items())
+        )
+    return (type(param).__name__, repr(param))
+
+
+def make_key(command: str, params: list, representations: ty.Tuple[str, ...] = None) -> str:
+    """
+    Computes the cache key of a command.
+
+    :param command: str
+        Name of the command
+    :param params: list
+        Parameters of the command, including every option affecting the output
+    :param representations: tuple
+        Representations of the answer that were rendered, None for all
+    :return: str
+        Hex digest identifying the result
+    """
+    key = (caspy_version, sympy_version, command, normalize_param(list(params)))
+    if representations is not None:
+        key += (representations,)
+    key = repr(key)
+    return hashlib.sha256(key.encode("utf8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of command results backed by SQLite. It's safe to share one instance
+    between threads and to open the same file from several processes.
+    """
+
+    def __init__(self, path: str = None, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.path = path or default_cache_path()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, command TEXT, value BLOB, size INTEGER, last_access REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, count INTEGER)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> ty.Union[ty.Dict[str, ty.Any], None]:
+        """
+        Returns the stored result or None and updates the hit and miss counters.
+
+        :param key: str
+            Key computed by make_key()
+        :return: dict or None
+            The stored result if it exists
+        """
+        with self._lock:
+            conn = self.connection()
+            row = conn.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            stat = "hits" if row else "misses"
+            if row:
+                self.hits += 1
+                conn.execute(
+                    "UPDATE results SET last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            else:
+                self.misses += 1
+            conn.execute(
+                "INSERT INTO stats VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET count = count + 1",
+                (stat,),
+            )
+            conn.commit()
+
+        if row:
+            return pickle.loads(row[0])
+        return None
+
+    def put(self, key: str, command: str, result: ty.Dict[str, ty.Any]) -> None:
+        """
+        Stores a result and evicts the least recently used results if the cache is too big.
+
+        :param key: str
+            Key computed by make_key()
+        :param command: str
+            Name of the command, only stored for the statistics
+        :param result: dict
+            Result of the command
+        """
+        try:
+            value = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if len(value) > self.max_size:
+            return
+
+        with self._lock:
+            conn = self.connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, command, value, len(value), time.time()),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_size:
+                rows = conn.execute(
+                    "SELECT key, size FROM results ORDER BY last_access ASC"
+                ).fetchall()
+                evicted = []
+                for old_key, size in rows:
+                    if total <= self.max_size:
+                        break
+                    evicted.append((old_key,))
+                    total -= size
+                conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+            conn.commit()
+
+    def stats(self) -> ty.Dict[str, ty.Any]:
+        """
+        Statistics of the cache. 'hits' and 'misses' are counted since the cache file was created,
+        'session_hits' and 'session_misses' only for this instance.
+
+        :return: dict
+            Dict of statistics
+        """
+        with self._lock:
+            conn = self.connection()
+            counts = dict(conn.execute("SELECT name, count FROM stats").fetchall())
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            per_command = dict(
+                conn.execute(
+                    "SELECT command, COUNT(*) FROM results GROUP BY command ORDER BY command"
+                ).fetchall()
+            )
+
+        hits = counts.get("hits", 0)
+        misses = counts.get("misses", 0)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+            "commands": per_command,
+        }
+
+    def clear(self) -> None:
+        """Removes every result and resets the statistics"""
+        with self._lock:
+            conn = self.connection()
+            conn.execute("DELETE FROM results")
+            conn.execute("DELETE FROM stats")
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: ty.Union[ResultCache, None] = None
+_enabled = os.environ.get("CASPY_NO_CACHE", "") == ""
+
+
+def get_cache() -> ty.Union[ResultCache, None]:
+    """
+    Returns the shared cache or None if caching is disabled.
+    Setting the environment variable CASPY_NO_CACHE disables the cache by default.
+    """
+    global _cache
+    if not _enabled:
+        return None
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+
+def set_cache(cache: ty.Union[ResultCache, bool, None]) -> None:
+    """
+    Replaces the shared cache.
+
+    :param cache: ResultCache, bool or None
+        New cache to use. True uses the default cache, False or None disables caching
+    """
+    global _cache, _enabled
+    if isinstance(cache, ResultCache):
+        _cache, _enabled = cache, True
+    else:
+        _cache, _enabled = None, bool(cache)
@@ -0,0 +1,368 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Catalog of the formulas of data/formulas.json solved for each of their variables.
+
+For every formula the catalog holds the parsed equation, the names of its symbols and the
+solutions of solve() per variable. Solving a formula of the Formulas tab is then a lookup and a
+substitution of the values instead of a call to solve().
+
+setup.py compiles the whole catalog into data/formulas.catalog next to formulas.json. Formulas
+or variables missing from it are solved the first time they are used and stored in
+formulas.catalog in the user cache directory, unless CASPY_NO_CACHE is set. Both files are
+pickles with a header holding the versions of CASPy and SymPy and the SHA-256 of
+formulas.json, a file with another header is ignored.
+"""
+
+from sympy import Eq, Expr, Poly, Symbol, checksol, default_sort_key, nan, nsimplify, oo, solve, zoo
+from sympy.abc import _clash1
+from sympy import __version__ as sympy_version
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import typing as ty
+
+from .. import __version__ as caspy_version
+from ..resources import load_json, resource_path
+from .cache import default_cache_path
+from .parsing import parse_expr
+
+# Catalog shipped next to formulas.json, relative to the caspy3 package
+CATALOG_FILE = "data/formulas.catalog"
+
+
+class FormulaEntry(ty.NamedTuple):
+    """
+    A formula of the catalog
+
+    :param equation: Eq
+        The formula as parsed by the commands
+    :param symbols: list
+        Sorted names of the symbols, as listed in the Formulas tab
+    :param solutions: dict
+        Solutions per name of a variable, filled as the variables are solved
+    """
+
+    equation: Eq
+    symbols: ty.List[str]
+    solutions: ty.Dict[str, ty.Tuple[Expr, ...]]
+
+
+def parse_formula(formula: str) -> FormulaEntry:
+    """
+    Parses a formula such as 'v = s/t', no variable is solved yet
+
+    :param formula: str
+        The formula as written in formulas.json
+    :return: FormulaEntry
+        The parsed formula
+    """
+    sides = formula.replace("_i", "(sqrt(-1))").split("=")
+    if len(sides) != 2:
+        raise ValueError(f"Unable to get equation from {formula}")
+
+    equation = Eq(parse_expr(sides[0]), parse_expr(sides[1]))
+    symbols = sorted(
+        {
+            str(symbol)
+            for side in sides
+            for symbol in parse_expr(side, local_dict=dict(_clash1)).atoms(Symbol)
+        }
+    )
+    return FormulaEntry(equation, symbols, {})
+
+
+def solve_entry(entry: FormulaEntry, variable: str) -> ty.Tuple[Expr, ...]:
+    """
+    Solves a formula for a variable the same way calc_normal_eq does
+
+    :param entry: FormulaEntry
+        The formula
+    :param variable: str
+        Name of the variable
+    :return: tuple
+        Every solution
+    """
+    symbol = next(
+        (symbol for symbol in entry.equation.free_symbols if str(symbol) == variable),
+        Symbol(variable),
+    )
+    return tuple(solve(entry.equation, symbol, rational=True))
+
+
+def formulas_digest() -> str:
+    """SHA-256 of data/formulas.json"""
+    with open(resource_path("data/formulas.json"), "rb") as formulas_f:
+        return hashlib.sha256(formulas_f.read()).hexdigest()
+
+
+def user_catalog_path() -> str:
+    """Path of the catalog in the user cache directory, next to the result cache"""
+    return os.path.join(os.path.dirname(default_cache_path()), "formulas.catalog")
+
+
+def read_catalog(path: str, digest: str) -> ty.Dict[str, FormulaEntry]:
+    """
+    Reads a catalog file
+
+    :param path: str
+        Path to the file
+    :param digest: str
+        SHA-256 of formulas.json
+    :return: dict
+        The formulas, empty if the file doesn't exist or belongs to other versions
+    """
+    try:
+        with open(path, "rb") as catalog_f:
+            header = pickle.load(catalog_f)
+            if header != {"caspy": caspy_version, "sympy": sympy_version, "formulas": digest}:
+                return {}
+            return {
+                formula: FormulaEntry(*entry) for formula, entry in pickle.load(catalog_f).items()
+            }
+    except Exception:
+        return {}
+
+
+def write_catalog(path: str, entries: ty.Dict[str, FormulaEntry], digest: str) -> None:
+    """
+    Writes a catalog file. The file is replaced atomically, processes reading it at the same
+    time see either the old or the new catalog.
+
+    :param path: str
+        Path to the file
+    :param entries: dict
+        The formulas
+    :param digest: str
+        SHA-256 of formulas.json
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as catalog_f:
+            header = {"caspy": caspy_version, "sympy": sympy_version, "formulas": digest}
+            pickle.dump(header, catalog_f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(
+                {formula: tuple(entry) for formula, entry in entries.items()},
+                catalog_f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def catalog_formulas() -> ty.List[str]:
+    """Every formula of data/formulas.json"""
+    data = load_json("data/formulas.json")[1]
+    return [
+        formula
+        for branch in data
+        for sub_branch in data[branch]
+        for formula in data[branch][sub_branch]
+    ]
+
+
+def compile_catalog(path: str) -> ty.Dict[str, FormulaEntry]:
+    """
+    Solves every formula of data/formulas.json for every variable and writes the catalog,
+    used by setup.py to build data/formulas.catalog
+
+    :param path: str
+        Path to write the catalog to
+    :return: dict
+        The formulas
+    """
+    entries = {}
+    for formula in catalog_formulas():
+        entry = parse_formula(formula)
+        for variable in entry.symbols:
+            entry.solutions[variable] = solve_entry(entry, variable)
+        entries[formula] = entry
+    write_catalog(path, entries, formulas_digest())
+    return entries
+
+
+class FormulaCatalog:
+    """
+    The formulas of data/formulas.json with their solutions, loaded on first use. A formula
+    missing from the catalog files is parsed and solved when it's requested and the user
+    catalog is updated. It's safe to share one instance between threads.
+
+    :param path: str
+        Path of the user catalog, defaults to user_catalog_path(). None doesn't persist
+        formulas solved at runtime
+    """
+
+    def __init__(self, path: ty.Union[str, None] = "") -> None:
+        self.path = user_catalog_path() if path == "" else path
+        self.entries: ty.Dict[str, FormulaEntry] = {}
+        self.formulas: ty.Set[str] = set()
+        self.digest = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        if self.digest is not None:
+            return
+        self.digest = formulas_digest()
+        self.formulas = set(catalog_formulas())
+        self.entries = read_catalog(resource_path(CATALOG_FILE), self.digest)
+        if self.path:
+            self.entries.update(read_catalog(self.path, self.digest))
+
+    def entry(self, formula: str) -> ty.Union[FormulaEntry, None]:
+        """
+        The parsed formula, None if it isn't part of data/formulas.json
+
+        :param formula: str
+            The formula as written in formulas.json, for example 'v = s/t'
+        :return: FormulaEntry or None
+        """
+        with self._lock:
+            self.load()
+            if formula not in self.formulas:
+                return None
+            if formula not in self.entries:
+                self.entries[formula] = parse_formula(formula)
+            return self.entries[formula]
+
+    def symbols(self, formula: str) -> ty.Union[ty.List[str], None]:
+        """Sorted names of the symbols of a formula, None if it isn't part of formulas.json"""
+        entry = self.entry(formula)
+        return None if entry is None else list(entry.symbols)
+
+    def solutions(self, formula: str, variable: str) -> ty.Union[ty.Tuple[Expr, ...], None]:
+        """
+        Solutions of a formula for a variable, the formula is solved and the user catalog
+        updated if they aren't stored yet
+
+        :param formula: str
+            The formula as written in formulas.json, for example 'v = s/t'
+        :param variable: str
+            Name of the variable
+        :return: tuple or None
+            Every solution, None if the formula isn't part of formulas.json
+        """
+        entry = self.entry(formula)
+        if entry is None or variable not in entry.symbols:
+            return None
+        if variable not in entry.solutions:
+            solutions = solve_entry(entry, variable)
+            with self._lock:
+                entry.solutions[variable] = solutions
+                self.save()
+        return entry.solutions[variable]
+
+    def save(self) -> None:
+        """Writes the user catalog, merged with the formulas other processes have solved"""
+        if not self.path or os.environ.get("CASPY_NO_CACHE"):
+            return
+        try:
+            entries = read_catalog(self.path, self.digest)
+            for formula, entry in self.entries.items():
+                if formula in entries:
+                    entry.solutions.update(
+                        (variable, solutions)
+                        for variable, solutions in entries[formula].solutions.items()
+                        if variable not in entry.solutions
+                    )
+            write_catalog(self.path, {**entries, **self.entries}, self.digest)
+        except OSError:
+            pass
+
+
+def solve_with_values(
+    formula: str, variable: str, values: ty.List[ty.List[str]]
+) -> ty.Union[ty.List[Expr], None]:
+    """
+    Solves a formula of the catalog after substituting values, the stored solutions are
+    substituted instead of solving the formula again. Values are converted to rationals like
+    solve(rational=True) does and solutions at which the formula with the values isn't defined,
+    for example because of a zero denominator, are dropped. Like solve(), every solution is
+    checked with checksol() and they're sorted by default_sort_key.
+
+    :param formula: str
+        The formula as written in formulas.json, for example 'v = s/t'
+    :param variable: str
+        Name of the variable to solve for
+    :param values: list
+        List of [value, name of variable]
+    :return: list or None
+        The solutions, None if the formula isn't part of formulas.json or if it has to be solved
+        again, for example because a value isn't a number or a solution can't be checked
+    """
+    catalog = get_catalog()
+    solutions = catalog.solutions(formula, variable)
+    if solutions is None:
+        return None
+
+    entry = catalog.entry(formula)
+    symbols = {str(symbol): symbol for symbol in entry.equation.free_symbols}
+    substitutions = {
+        symbols[name]: nsimplify(parse_expr(value.replace("_i", "(sqrt(-1))")), rational=True)
+        for value, name in values
+        if name in symbols
+    }
+    if not substitutions:
+        return list(solutions)
+    if any(value.free_symbols for value in substitutions.values()):
+        return None
+
+    # The equation is kept as lhs - rhs, substituting into Eq compares both sides numerically
+    symbol = symbols.get(variable, Symbol(variable))
+    expression = (entry.equation.lhs - entry.equation.rhs).subs(substitutions)
+    if not expression.has(symbol):
+        return None
+    # The general roots of a cubic or higher polynomial don't simplify to the roots solve() finds
+    # for the values, these are solved again
+    numerator = expression.as_numer_denom()[0]
+    if numerator.is_polynomial(symbol) and Poly(numerator, symbol).degree() > 2:
+        return None
+
+    output = []
+    for solution in solutions:
+        solution = solution.subs(substitutions)
+        if solution in output or solution.has(nan, zoo, oo, -oo):
+            continue
+        if expression.subs(symbol, solution).has(nan, zoo, oo, -oo):
+            continue
+        # A general solution doesn't have to solve the formula for these values, for example
+        # a square root that would have to be negative. solve() checks its solutions the same way
+        valid = checksol(expression, symbol, solution)
+        if valid is None:
+            return None
+        if valid:
+            output.append(solution)
+    output.sort(key=default_sort_key)
+    return output
+
+
+_catalog: ty.Union[FormulaCatalog, None] = None
+
+
+def get_catalog() -> FormulaCatalog:
+    """Returns the shared catalog"""
+    global _catalog
+    if _catalog is None:
+        _catalog = FormulaCatalog()
+    return _catalog
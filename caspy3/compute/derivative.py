@@ -0,0 +1,261 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+
+import cmath
+import traceback
+import typing as ty
+
+from .base import BaseCompute
+from .result import PrintSettings, Result
+
+
+class DerivativeCompute(BaseCompute):
+    @BaseCompute.catch_error
+    def prev_deriv(
+        self,
+        input_expression: str,
+        input_variable: str,
+        input_order: int,
+        input_point: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if not input_expression:
+            return {"error": ["Enter an expression"]}
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+
+        try:
+            derivative = Derivative(str(input_expression), input_variable, input_order)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        if input_point:
+            self.exact_ans = f"At {input_variable} = {input_point}\n"
+
+        return Result(
+            "deriv", derivative, self.approx_ans, output_type, settings, prefix=self.exact_ans
+        )
+
+    @BaseCompute.catch_error
+    def calc_deriv(
+        self,
+        input_expression: str,
+        input_variable: str,
+        input_order: int,
+        input_point: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if use_scientific:
+            if use_scientific > accuracy:
+                accuracy = use_scientific
+
+        if not input_expression:
+            return {"error": ["Enter an expression"]}
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+
+        try:
+            self.exact_ans = diff(
+                parse_expr(input_expression), parse_expr(input_variable), input_order
+            )
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        if input_point:
+            try:
+                point = parse_expr(input_point)
+                at_point = self.exact_ans.subs(parse_expr(input_variable), point)
+                if use_scientific:
+                    self.approx_ans = self.to_scientific_notation(
+                        str(N(at_point, accuracy)), use_scientific
+                    )
+                else:
+                    self.approx_ans = str(N(at_point, accuracy))
+            except Exception:
+                return {"error": [f"Failed to parse {input_point}"]}
+
+            # Simplified once and used for every output
+            self.exact_ans = simplify(at_point)
+
+        return Result("deriv", self.exact_ans, self.approx_ans, output_type, settings)
+
+    @BaseCompute.catch_error
+    def calc_deriv_points(
+        self,
+        input_expression: str,
+        input_variable: str,
+        input_order: int,
+        input_points: ty.Union[str, ty.List[str]],
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+    ) -> ty.Dict[str, ty.List[ty.Any]]:
+        """
+        Evaluates the derivative at many points with a compiled numeric function.
+        The approximate answer is a list with the value at each point.
+
+        :param input_points: str or list
+            Points separated by commas, for example '0, pi/2, atan2(1, 2)', or a list of points
+        """
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if use_scientific:
+            if use_scientific > accuracy:
+                accuracy = use_scientific
+
+        if not input_expression:
+            return {"error": ["Enter an expression"]}
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+
+        if isinstance(input_points, str):
+            input_points = self.split_points(input_points)
+        input_points = [str(point).strip() for point in input_points if str(point).strip()]
+        if not input_points:
+            return {"error": ["Enter at least one point"]}
+
+        try:
+            variable = parse_expr(input_variable)
+            derivative = diff(parse_expr(input_expression), variable, input_order)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        other_symbols = derivative.free_symbols - {variable}
+        if other_symbols:
+            names = ", ".join(sorted(str(symbol) for symbol in other_symbols))
+            return {"error": [f"Error: the derivative depends on {names} besides {input_variable}"]}
+
+        try:
+            points = [complex(N(parse_expr(point))) for point in input_points]
+        except Exception:
+            return {"error": [f"Failed to parse {', '.join(input_points)}"]}
+
+        values = self.evaluate_points(derivative, variable, points)
+
+        self.exact_ans = str(derivative)
+        self.latex_answer = str(latex(derivative))
+        self.approx_ans = []
+        for value in values:
+            value = self.format_complex(value, accuracy)
+            if use_scientific:
+                value = self.to_scientific_notation(value, use_scientific)
+            self.approx_ans.append(value)
+
+        return {"deriv": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
+
+    @staticmethod
+    def split_points(input_points: str) -> ty.List[str]:
+        """
+        Splits points at the commas that aren't inside brackets, so 'atan2(1, 2)' is one point
+
+        :param input_points: str
+            Points separated by commas
+        :return: list
+            The points
+        """
+        points, depth, start = [], 0, 0
+        for i, char in enumerate(input_points):
+            if char in "([{":
+                depth += 1
+            elif char in ")]}":
+                depth = max(depth - 1, 0)
+            elif char == "," and depth == 0:
+                points.append(input_points[start:i])
+                start = i + 1
+        points.append(input_points[start:])
+        return points
+
+    @staticmethod
+    def format_complex(value: complex, digits: int) -> str:
+        """
+        Formats a number with N() like the value at a single point, for example '0.5000000000',
+        '1.5 - 2.0*I', 'oo' or 'nan'. The value is a double, so digits is capped at 17
+        significant digits, more would only show the binary rounding error.
+
+        :param value: complex
+            The number
+        :param digits: int
+            Number of significant digits
+        :return: str
+            The formatted number
+        """
+        value = complex(value)
+        if cmath.isnan(value):
+            return "nan"
+        if value.imag == 0:
+            number = Float(value.real)
+        else:
+            number = Float(value.real) + I * Float(value.imag)
+        return str(N(number, min(digits, 17)))
+
+    @staticmethod
+    def evaluate_points(
+        expression: Expr, variable: Symbol, points: ty.List[complex]
+    ) -> ty.List[complex]:
+        """
+        Compiles expression with lambdify and evaluates it at every point, vectorized with numpy
+        if it's installed. Points where the expression is undefined evaluate to nan.
+
+        :param expression: Expr
+            Expression depending only on variable
+        :param variable: Symbol
+            The variable
+        :param points: list
+            Points to evaluate at
+        :return: list
+            Value at each point
+        """
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        if numpy is not None:
+            function = lambdify(variable, expression, "numpy")
+            with numpy.errstate(all="ignore"):
+                values = function(numpy.array(points, dtype=complex))
+            return [complex(value) for value in numpy.broadcast_to(values, (len(points),))]
+
+        function = lambdify(variable, expression, "cmath")
+        values = []
+        for point in points:
+            try:
+                values.append(complex(function(point)))
+            except (ArithmeticError, ValueError):
+                values.append(complex("nan"))
+        return values
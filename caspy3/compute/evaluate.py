@@ -0,0 +1,357 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+
+import math
+import traceback
+import re as pyreg
+import typing as ty
+
+from .base import BaseCompute
+from .result import PrintSettings, Result
+from .tables import CHUNK_SIZE, TABLE_MAX_ROWS, first_rows, read_values, write_columns
+
+
+class EvaluateCompute(BaseCompute):
+    @BaseCompute.catch_error
+    def prev_eval_exp(
+        self,
+        expression: str,
+        var_sub: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+    ) -> ty.Dict[str, ty.List[str]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if not expression:
+            return {"error": ["Enter an expression"]}
+
+        if var_sub:
+            self.exact_ans = f"With variable substitution {var_sub}\n"
+
+        try:
+            _ = parse_expr(expression)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        self.latex_answer = str(latex(parse_expr(expression, evaluate=False)))
+        if output_type == 1:
+            try:
+                self.exact_ans += settings.pretty(parse_expr(expression, evaluate=False))
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+        elif output_type == 2:
+            try:
+                self.exact_ans += str(latex(parse_expr(expression, evaluate=False)))
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+        else:
+            self.exact_ans += str(expression)
+
+        return {"eval": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
+
+    @BaseCompute.catch_error
+    def parse_var_sub(self, var_sub: str) -> ty.Dict[str, str]:
+        """
+        Parses var_sub and returns a dictionary. Any variable followed by a ':' will be subtituted by everything
+        between the ':' and the next variable. It must be of the type var1: value1 var2: value2 or else
+        it will return an error
+
+        Examples:
+            t: 34 y: pi/3 z: 5
+            => {'t': '34', 'y': 'pi/3', 'z': '5'}
+
+        :param var_sub: string
+            String containing variables
+        :return: Dict
+            Dictionary with variable as key and subtition as value
+        """
+        match_key = pyreg.compile(r"[a-zA-Z0-9_]+:")
+        output = {}
+
+        if ":" not in var_sub:
+            return {"error": f"Colon missing"}
+
+        key_reg = match_key.finditer(var_sub)
+        keys = [i.group(0) for i in key_reg]
+
+        for key in range(len(keys) - 1):
+            start = keys[key]
+            end = keys[key + 1]
+            in_between = pyreg.compile(f"{start}(.*){end}")
+
+            result = in_between.search(var_sub).group(1).strip()
+            if not result:
+                return {"error": f"Variable '{start[0:-1]}' is missing a value"}
+
+            output[start[0:-1]] = result
+
+        last_value = var_sub.split(keys[-1])[1].strip()
+        if not last_value:
+            return {"error": f"Variable '{keys[-1][0:-1]}' is missing a value"}
+        output[keys[-1][0:-1]] = last_value
+        return output
+
+    @BaseCompute.catch_error
+    def eval_exp(
+        self,
+        expression: str,
+        var_sub: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if use_scientific:
+            if use_scientific > accuracy:
+                accuracy = use_scientific
+
+        if not expression:
+            return {"error": ["Enter an expression"]}
+
+        expression = str(expression)
+
+        if var_sub:
+            if ":" not in var_sub:
+                return {
+                    "error": [
+                        "A ':' must be present after variable to indicate end of variable"
+                    ]
+                }
+
+            var_sub = self.parse_var_sub(var_sub)
+            if "error" in list(var_sub.keys()):
+                return {"error": [var_sub["error"]]}
+
+            try:
+                expression = parse_expr(expression, evaluate=False)
+
+                for var in var_sub.keys():
+                    expression = expression.subs(parse_expr(var), f"({var_sub[var]})")
+
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+        try:
+            expression = str(expression)
+            self.exact_ans = simplify(parse_expr(expression))
+            if use_scientific:
+                self.approx_ans = self.to_scientific_notation(
+                    str(N(self.exact_ans, accuracy)), use_scientific
+                )
+            else:
+                self.approx_ans = str(N(self.exact_ans, accuracy))
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return Result("eval", self.exact_ans, self.approx_ans, output_type, settings)
+
+    @staticmethod
+    def parse_grid(grid: str) -> ty.Dict[str, ty.Tuple[float, float, int]]:
+        """
+        Parses a grid of the type var1=start:stop:num var2=start:stop:num. Every variable takes num
+        evenly spaced values from start to stop, both included. The variables are separated by
+        spaces, commas or semicolons. The bounds must be finite.
+
+        Examples:
+            x=0:10:1e6 y=-pi:pi:5
+            => {'x': (0.0, 10.0, 1000000), 'y': (-3.141592653589793, 3.141592653589793, 5)}
+
+        :param grid: str
+            String containing the grid
+        :return: Dict
+            Dictionary with variable as key and (start, stop, num) as value
+        """
+        grid = pyreg.sub(r"\s*([=:])\s*", r"\1", grid.strip())
+        output = {}
+        for spec in pyreg.split(r"[\s;,]+", grid):
+            if not spec:
+                continue
+            var, _, bounds = spec.partition("=")
+            bounds = bounds.split(":")
+            if not pyreg.fullmatch(r"[a-zA-Z_][a-zA-Z0-9_]*", var) or len(bounds) != 3:
+                raise ValueError(f"'{spec}' must be of the type var=start:stop:num")
+
+            start, stop = [float(N(parse_expr(bound))) for bound in bounds[:2]]
+            if not (math.isfinite(start) and math.isfinite(stop)):
+                raise ValueError(f"The bounds of '{var}' must be finite")
+            num = float(bounds[2])
+            if not math.isfinite(num) or num < 1 or num != int(num):
+                raise ValueError(f"The number of values of '{var}' must be a positive integer")
+            output[var] = (start, stop, int(num))
+
+        if not output:
+            raise ValueError("Enter a grid")
+        return output
+
+    @staticmethod
+    def iter_table(
+        expression: str,
+        grid: str = "",
+        values_file: str = "",
+        chunk_size: int = CHUNK_SIZE,
+    ) -> ty.Tuple[ty.List[str], int, ty.Iterator[ty.List[ty.Any]]]:
+        """
+        Compiles expression once with lambdify and evaluates it over a grid or the points of a
+        values file, chunk_size points at a time so that the memory used doesn't grow with the
+        number of points. The variables are real, points outside the domain evaluate to nan.
+
+        :param expression: str
+            Expression to evaluate
+        :param grid: str
+            Grid as accepted by parse_grid(), every combination of values is evaluated
+        :param values_file: str
+            CSV file as accepted by tables.read_values(), used instead of grid
+        :param chunk_size: int
+            Number of points evaluated at once
+        :return: tuple
+            The header, the number of points and an iterator yielding the columns per chunk,
+            the values of the variables followed by the value of the expression. If the
+            expression is one of the variables its column isn't repeated
+        """
+        import numpy
+
+        if grid and values_file:
+            raise ValueError("Use either a grid or a values file")
+
+        parsed = parse_expr(expression)
+        if values_file:
+            columns = read_values(values_file)
+            names = list(columns.keys())
+            total = len(next(iter(columns.values())))
+        else:
+            axes = {
+                var: numpy.linspace(start, stop, num)
+                for var, (start, stop, num) in EvaluateCompute.parse_grid(grid).items()
+            }
+            names = list(axes.keys())
+            shape = tuple(len(axis) for axis in axes.values())
+            total = int(numpy.prod(shape))
+
+        free_symbols = {str(symbol): symbol for symbol in parsed.free_symbols}
+        missing = sorted(set(free_symbols) - set(names))
+        if missing:
+            raise ValueError(f"Variable(s) {', '.join(missing)} must be given values")
+        if parsed.is_Symbol and str(parsed) in names:
+            # The expression is a variable, its values already are a column of the table
+            function = None
+        else:
+            function = lambdify(
+                [free_symbols.get(name, Symbol(name)) for name in names], parsed, "numpy"
+            )
+
+        def chunks() -> ty.Iterator[ty.List[ty.Any]]:
+            for start in range(0, total, chunk_size):
+                stop = min(start + chunk_size, total)
+                if values_file:
+                    inputs = [columns[name][start:stop] for name in names]
+                else:
+                    # Index of every variable, the last one changes fastest
+                    indices = numpy.unravel_index(numpy.arange(start, stop), shape)
+                    inputs = [axes[name][index] for name, index in zip(names, indices)]
+                if function is None:
+                    yield inputs
+                    continue
+                with numpy.errstate(all="ignore"):
+                    values = numpy.asarray(function(*inputs))
+                yield inputs + [numpy.broadcast_to(values, (stop - start,))]
+
+        if function is None:
+            return names, total, chunks()
+        return names + [expression], total, chunks()
+
+    @BaseCompute.catch_error
+    def eval_table(
+        self,
+        expression: str,
+        grid: str,
+        values_file: str,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+        max_rows: int = TABLE_MAX_ROWS,
+    ) -> ty.Dict[str, ty.Any]:
+        """
+        Evaluates expression over a grid or the points of a values file for the table of the
+        Evaluate tab. At most max_rows rows are returned, use write_table() for every row.
+
+        :return: dict
+            {"table": [header, rows, number of points], "latex": latex}
+        """
+        if not expression:
+            return {"error": ["Enter an expression"]}
+        if not grid and not values_file:
+            return {"error": ["Enter a grid, for example x=0:10:11"]}
+
+        try:
+            header, total, chunks = self.iter_table(
+                expression, grid, values_file, max(min(max_rows, CHUNK_SIZE), 1)
+            )
+            rows = first_rows(chunks, max_rows, use_scientific, accuracy)
+        except ValueError as e:
+            return {"error": [f"Error: {e}"]}
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return {
+            "table": [header, rows, total],
+            "latex": str(latex(parse_expr(expression, evaluate=False))),
+        }
+
+    @BaseCompute.catch_error
+    def write_table(
+        self,
+        expression: str,
+        grid: str,
+        values_file: str,
+        output: ty.Union[str, ty.TextIO],
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+    ) -> ty.Dict[str, ty.Any]:
+        """
+        Evaluates expression over a grid or the points of a values file and writes every row
+        with tables.write_columns(), as CSV or as .npy if the path ends with .npy
+
+        :param output: str or file
+            Path to write to or a text stream, for example sys.stdout
+        :return: dict
+            {"table": [header, [], number of points]}
+        """
+        if not expression:
+            return {"error": ["Enter an expression"]}
+        if not grid and not values_file:
+            return {"error": ["Enter a grid or a values file"]}
+
+        try:
+            header, total, chunks = self.iter_table(expression, grid, values_file)
+            header = write_columns(output, header, chunks, total, use_scientific, accuracy)
+        except ValueError as e:
+            return {"error": [f"Error: {e}"]}
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return {"table": [header, [], total]}
@@ -0,0 +1,74 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+
+import traceback
+import typing as ty
+
+from .base import BaseCompute
+from .result import PrintSettings, Result
+
+
+class ExpandCompute(BaseCompute):
+    @BaseCompute.catch_error
+    def prev_expand_exp(
+        self, expression: str, output_type: int, use_unicode: bool, line_wrap: bool
+    ) -> ty.Dict[str, ty.List[str]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if not expression:
+            return {"error": ["Enter an expression"]}
+
+        if output_type == 1:
+            try:
+                self.exact_ans = settings.pretty(parse_expr(expression, evaluate=False))
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+        elif output_type == 2:
+            try:
+                self.exact_ans = str(latex(parse_expr(expression, evaluate=False)))
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+        else:
+            self.exact_ans = str(expression)
+        self.latex_answer = str(latex(parse_expr(expression, evaluate=False)))
+
+        return {"exp": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
+
+    @BaseCompute.catch_error
+    def expand_exp(
+        self, expression: str, output_type: int, use_unicode: bool, line_wrap: bool
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if not expression:
+            return {"error": ["Enter an expression"]}
+
+        try:
+            self.exact_ans = expand(expression)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return Result("exp", self.exact_ans, self.approx_ans, output_type, settings)
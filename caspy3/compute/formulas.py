@@ -0,0 +1,477 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+
+from tokenize import TokenError
+import functools
+import traceback
+import typing as ty
+
+from .base import BaseCompute
+from .catalog import get_catalog, solve_with_values
+from .result import PrintSettings
+from .tables import CHUNK_SIZE, TABLE_MAX_ROWS, first_rows, read_values, write_columns
+
+
+@functools.lru_cache(maxsize=128)
+def solve_formula(left_side: str, right_side: str, variable: str) -> ty.Tuple[Expr, ...]:
+    """
+    Solves a formula for variable with solve(). The solutions are cached, a sweep solves its
+    formula once no matter how many rows it has. Formulas of formulas.json are taken from the
+    catalog.
+
+    :param left_side: str
+        Left side of the formula
+    :param right_side: str
+        Right side of the formula
+    :param variable: str
+        Variable to solve for
+    :return: tuple
+        Every solution
+    """
+    solutions = get_catalog().solutions(f"{left_side}={right_side}", variable)
+    if solutions is not None:
+        return solutions
+
+    left_side = parse_expr(left_side.replace("_i", "(sqrt(-1))"))
+    right_side = parse_expr(right_side.replace("_i", "(sqrt(-1))"))
+    return tuple(solve(Eq(left_side, right_side), parse_expr(variable)))
+
+
+# Relative difference of the sides of a formula up to which a value of a sweep solves it
+SWEEP_TOLERANCE = 1e-9
+
+
+class FormulaCompute(BaseCompute):
+    @staticmethod
+    def line_text(line: ty.Any) -> str:
+        """
+        Each line is either the value typed by the user or an object with a text() method,
+        such as a QLineEdit.
+
+        :param line: str or QLineEdit
+            Value of the variable
+        :return: str
+            The value as a string
+        """
+        if isinstance(line, str):
+            return line
+        return line.text()
+
+    @BaseCompute.catch_error
+    def prev_formula(
+        self,
+        lines: ty.List[list],
+        value_string: ty.List[str],
+        domain: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+    ) -> ty.Dict[str, ty.List[str]]:
+        empty_var_list, var_list, values = [], [], []
+        self.exact_ans = ""
+        self.approx_ans = 0
+        self.latex_answer = ""
+
+        if not lines:
+            return {"error": ["Error: select a formula"]}
+
+        if type(value_string) == list:
+            if len(value_string) != 2:
+                return {"error": [f"Error: Unable to get equation from {value_string}"]}
+        else:
+            return {"error": [f"Error: Unable to get equation from {value_string}"]}
+
+        for line in lines:
+            text = self.line_text(line[0])
+            if text == "":
+                empty_var_list.append(line[1])
+            elif text == "var":
+                var_list.append(line[1])
+            else:
+                values.append([text, line[1]])
+
+        if len(var_list) > 1:
+            return {
+                "error": [
+                    "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
+                ]
+            }
+
+        if len(empty_var_list) > 1:
+            if len(var_list) != 1:
+                return {
+                    "error": [
+                        "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
+                    ]
+                }
+
+        if len(var_list) == 1:
+            final_var = var_list[0]
+        else:
+            final_var = empty_var_list[0]
+
+        left_side = value_string[0]
+        right_side = value_string[1]
+
+        result = self.prev_normal_eq(
+            left_side,
+            right_side,
+            final_var,
+            domain,
+            output_type,
+            use_unicode,
+            line_wrap,
+        )
+        return result
+
+    @BaseCompute.catch_error
+    def calc_formula(
+        self,
+        lines: ty.List[list],
+        value_string: ty.List[str],
+        solve_type: int,
+        domain: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+        verify_domain: bool,
+        approximate: ty.Union[str, None] = None,
+    ) -> ty.Dict[str, ty.List[str]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        empty_var_list, var_list, values = [], [], []
+        self.exact_ans = ""
+        self.approx_ans = 0
+        self.latex_answer = "\\text{LaTeX support not yet implemented for formula}"
+
+        if use_scientific:
+            if use_scientific > accuracy:
+                accuracy = use_scientific
+
+        if not lines:
+            return {"error": ["Error: select a formula"]}
+
+        if type(value_string) == list:
+            if len(value_string) != 2:
+                return {"error": [f"Error: Unable to get equation from {value_string}"]}
+        else:
+            return {"error": [f"Error: Unable to get equation from {value_string}"]}
+
+        for line in lines:
+            text = self.line_text(line[0])
+            if text == "":
+                empty_var_list.append(line[1])
+            elif text == "var":
+                var_list.append(line[1])
+            else:
+                values.append([text, line[1]])
+
+        if len(var_list) > 1:
+            return {
+                "error": [
+                    "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
+                ]
+            }
+
+        if len(empty_var_list) > 1:
+            if len(var_list) != 1:
+                return {
+                    "error": [
+                        "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
+                    ]
+                }
+
+        if len(var_list) == 1:
+            final_var = var_list[0]
+        else:
+            final_var = empty_var_list[0]
+
+        # Formulas of formulas.json are looked up in the catalog instead of being solved again
+        if solve_type == 2 and not approximate:
+            try:
+                solutions = solve_with_values("=".join(value_string), final_var, values)
+                if solutions is not None:
+                    return self.solved_answer(
+                        solutions,
+                        parse_expr(domain),
+                        output_type,
+                        use_scientific,
+                        accuracy,
+                        verify_domain,
+                        settings,
+                    )
+            except (SympifyError, SyntaxError, TokenError, TypeError, ValueError):
+                # Values that can't be parsed are reported by the solve() path below, other
+                # errors of the catalog aren't hidden
+                pass
+
+        left_side = parse_expr(value_string[0])
+        right_side = parse_expr(value_string[1])
+
+        for i in values:
+            left_side = left_side.subs(parse_expr(i[1]), i[0])
+            right_side = right_side.subs(parse_expr(i[1]), i[0])
+
+        left_side = str(left_side).replace("_i", "(sqrt(-1))")
+        right_side = str(right_side).replace("_i", "(sqrt(-1))")
+
+        result = self.calc_normal_eq(
+            left_side,
+            right_side,
+            final_var,
+            solve_type,
+            domain,
+            output_type,
+            use_unicode,
+            line_wrap,
+            use_scientific,
+            accuracy,
+            verify_domain,
+            approximate,
+        )
+        return result
+
+    @staticmethod
+    def iter_sweep(
+        value_string: ty.List[str],
+        variable: str,
+        values_file: str,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> ty.Tuple[ty.List[str], int, ty.Iterator[ty.List[ty.Any]], ty.Tuple[Expr, ...]]:
+        """
+        Solves the formula for variable once and evaluates every solution at each row of a CSV
+        file, the solutions are compiled with lambdify and evaluated chunk_size rows at a time.
+
+        The sweep is real-only. A solution is nan at a row where it isn't real or where it
+        doesn't satisfy the formula, a general solution such as y = x**2 of x = sqrt(y) doesn't
+        for x = -1. Every value is checked by evaluating lhs - rhs of the formula at the row.
+
+        :param value_string: list
+            The formula as [left side, right side]
+        :param variable: str
+            Variable to solve for
+        :param values_file: str
+            CSV file with a column per variable of the formula except the one solved for
+        :param chunk_size: int
+            Number of rows evaluated at once
+        :return: tuple
+            The header, the number of rows, an iterator yielding the columns per chunk and the
+            solutions. The columns are the values of the file followed by one column per solution
+        """
+        import numpy
+
+        solutions = solve_formula(value_string[0], value_string[1], variable)
+        if not solutions:
+            raise ValueError(f"Unable to solve the formula for {variable}")
+
+        columns = read_values(values_file)
+        names = list(columns.keys())
+        if variable in names:
+            raise ValueError(f"{values_file} mustn't have a column for {variable}")
+        total = len(next(iter(columns.values())))
+
+        free_symbols = {}
+        for solution in solutions:
+            free_symbols.update({str(symbol): symbol for symbol in solution.free_symbols})
+        missing = sorted(set(free_symbols) - set(names))
+        if missing:
+            raise ValueError(f"{values_file} is missing a column for {', '.join(missing)}")
+
+        arguments = [free_symbols.get(name, Symbol(name)) for name in names]
+        functions = [lambdify(arguments, solution, "numpy") for solution in solutions]
+
+        # Both sides of the formula at a row and a value of the variable
+        left_side = parse_expr(value_string[0].replace("_i", "(sqrt(-1))"))
+        right_side = parse_expr(value_string[1].replace("_i", "(sqrt(-1))"))
+        symbols = {str(symbol): symbol for symbol in (left_side - right_side).free_symbols}
+        sides = lambdify(
+            [symbols.get(name, Symbol(name)) for name in names + [variable]],
+            [left_side, right_side],
+            "numpy",
+        )
+        if len(solutions) == 1:
+            results = [variable]
+        else:
+            results = [f"{variable}_{i + 1}" for i in range(len(solutions))]
+
+        def chunks() -> ty.Iterator[ty.List[ty.Any]]:
+            for start in range(0, total, chunk_size):
+                stop = min(start + chunk_size, total)
+                inputs = [columns[name][start:stop] for name in names]
+                with numpy.errstate(all="ignore"):
+                    values = [
+                        FormulaCompute.check_sweep(
+                            sides,
+                            inputs,
+                            numpy.broadcast_to(numpy.asarray(function(*inputs)), (stop - start,)),
+                        )
+                        for function in functions
+                    ]
+                yield inputs + values
+
+        return names + results, total, chunks(), solutions
+
+    @staticmethod
+    def check_sweep(
+        sides: ty.Callable[..., ty.Any], inputs: ty.List[ty.Any], values: ty.Any
+    ) -> ty.Any:
+        """
+        Replaces the values of a solution that aren't real or don't satisfy the formula by nan
+
+        :param sides: callable
+            Returns both sides of the formula for the inputs and the values
+        :param inputs: list
+            Columns of the values of the other variables
+        :param values: ndarray
+            Values of the solution at every row
+        :return: ndarray
+            Real values of the solution
+        """
+        import numpy
+
+        values = numpy.asarray(values)
+        if numpy.iscomplexobj(values):
+            real = numpy.abs(values.imag) <= SWEEP_TOLERANCE * numpy.abs(values.real)
+            values = numpy.where(real, values.real, numpy.nan)
+        values = values.astype(float)
+
+        left, right = (
+            numpy.broadcast_to(numpy.asarray(side), values.shape)
+            for side in sides(*inputs, values)
+        )
+        scale = numpy.maximum(numpy.abs(left), numpy.abs(right))
+        valid = numpy.abs(left - right) <= SWEEP_TOLERANCE * scale
+        return numpy.where(valid, values, numpy.nan)
+
+    def sweep_formula(
+        self, lines: ty.List[list], value_string: ty.List[str]
+    ) -> ty.Tuple[ty.List[str], str]:
+        """
+        Reads the lines of a sweep. The variable to solve for is the line with the text 'var',
+        the lines with a value are substituted into the formula and the empty lines are read
+        from the CSV file.
+
+        :param lines: list
+            List of [value, variable], the value is a string or a QLineEdit
+        :param value_string: list
+            The formula as [left side, right side]
+        :return: tuple
+            The formula with the values substituted and the variable to solve for
+        """
+        if type(value_string) != list or len(value_string) != 2:
+            raise ValueError(f"Unable to get equation from {value_string}")
+
+        var_list = [line[1] for line in lines if self.line_text(line[0]) == "var"]
+        if len(var_list) != 1:
+            raise ValueError("Type 'var' in the line of the variable to solve for")
+
+        left_side, right_side = value_string
+        values = [
+            [self.line_text(line[0]), line[1]]
+            for line in lines
+            if self.line_text(line[0]) not in ("", "var")
+        ]
+        if values:
+            left_side, right_side = parse_expr(left_side), parse_expr(right_side)
+            for i in values:
+                left_side = left_side.subs(parse_expr(i[1]), i[0])
+                right_side = right_side.subs(parse_expr(i[1]), i[0])
+            left_side, right_side = str(left_side), str(right_side)
+        return [left_side, right_side], var_list[0]
+
+    @BaseCompute.catch_error
+    def calc_formula_sweep(
+        self,
+        lines: ty.List[list],
+        value_string: ty.List[str],
+        values_file: str,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+        max_rows: int = TABLE_MAX_ROWS,
+    ) -> ty.Dict[str, ty.Any]:
+        """
+        Solves a formula once and evaluates it at every row of a CSV file, see sweep_formula()
+        for the lines. At most max_rows rows are returned, use write_formula_sweep() for every
+        row.
+
+        :return: dict
+            {"table": [header, rows, number of rows], "latex": latex}
+        """
+        if not lines:
+            return {"error": ["Error: select a formula"]}
+        if not values_file:
+            return {"error": ["Select a CSV file with the values"]}
+
+        try:
+            value_string, variable = self.sweep_formula(lines, value_string)
+            header, total, chunks, solutions = self.iter_sweep(
+                value_string, variable, values_file, max(min(max_rows, CHUNK_SIZE), 1)
+            )
+            rows = first_rows(chunks, max_rows, use_scientific, accuracy)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        solved = [latex(Eq(parse_expr(variable), solution)) for solution in solutions]
+        return {"table": [header, rows, total], "latex": ", \\quad ".join(solved)}
+
+    @BaseCompute.catch_error
+    def write_formula_sweep(
+        self,
+        lines: ty.List[list],
+        value_string: ty.List[str],
+        values_file: str,
+        output: ty.Union[str, ty.TextIO],
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+    ) -> ty.Dict[str, ty.Any]:
+        """
+        Solves a formula once, evaluates it at every row of a CSV file and writes every row with
+        tables.write_columns(), as CSV or as .npy if the path ends with .npy
+
+        :param output: str or file
+            Path to write to or a text stream, for example sys.stdout
+        :return: dict
+            {"table": [header, [], number of rows], "unsolved": number of rows without a real
+            solution}
+        """
+        import numpy
+
+        unsolved = 0
+
+        def count_unsolved(chunks: ty.Iterator[ty.List[ty.Any]]) -> ty.Iterator[ty.List[ty.Any]]:
+            nonlocal unsolved
+            for columns in chunks:
+                solved = ~numpy.isnan(numpy.column_stack(columns[-len(solutions) :]))
+                unsolved += int((~solved.any(axis=1)).sum())
+                yield columns
+
+        try:
+            value_string, variable = self.sweep_formula(lines, value_string)
+            header, total, chunks, solutions = self.iter_sweep(
+                value_string, variable, values_file
+            )
+            header = write_columns(
+                output, header, count_unsolved(chunks), total, use_scientific, accuracy
+            )
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return {"table": [header, [], total], "unsolved": unsolved}
@@ -0,0 +1,179 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+
+import traceback
+import typing as ty
+
+from .base import BaseCompute
+from .quadrature import QUADRATURE_METHODS, integrate as integrate_numeric
+from .result import PrintSettings, Result
+
+
+class IntegralCompute(BaseCompute):
+    @BaseCompute.catch_error
+    def prev_integ(
+        self,
+        input_expression: str,
+        input_variable: str,
+        input_lower: str,
+        input_upper: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if not input_expression:
+            return {"error": ["Enter an expression"]}
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+        if (input_lower and not input_upper) or (not input_lower and input_upper):
+            return {"error": ["Enter both upper and lower bound"]}
+
+        if input_lower:
+            try:
+                self.exact_ans = Integral(
+                    parse_expr(input_expression),
+                    (parse_expr(input_variable), input_lower, input_upper),
+                )
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+        else:
+            try:
+                self.exact_ans = Integral(
+                    parse_expr(input_expression), parse_expr(input_variable)
+                )
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return Result("integ", self.exact_ans, self.approx_ans, output_type, settings)
+
+    @BaseCompute.catch_error
+    def calc_integ(
+        self,
+        input_expression: str,
+        input_variable: str,
+        input_lower: str,
+        input_upper: str,
+        approx_integ: ty.Union[bool, str],
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if use_scientific:
+            if use_scientific > accuracy:
+                accuracy = use_scientific
+
+        if not input_expression:
+            return {"error": ["Enter an expression"]}
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+        if (input_lower and not input_upper) or (not input_lower and input_upper):
+            return {"error": ["Enter both upper and lower bound"]}
+
+        if input_lower:
+            try:
+                self.exact_ans = Integral(
+                    parse_expr(input_expression),
+                    (parse_expr(input_variable), input_lower, input_upper),
+                )
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+            if approx_integ in QUADRATURE_METHODS:
+                try:
+                    quadrature = integrate_numeric(
+                        parse_expr(input_expression),
+                        parse_expr(input_variable),
+                        parse_expr(input_lower),
+                        parse_expr(input_upper),
+                        approx_integ,
+                        accuracy,
+                    )
+                except Exception:
+                    return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+                # The value is already a number with accuracy digits, N() isn't needed
+                self.exact_ans = quadrature.to_sympy(accuracy)
+                if use_scientific:
+                    self.approx_ans = self.to_scientific_notation(
+                        str(self.exact_ans), use_scientific
+                    )
+                else:
+                    self.approx_ans = str(self.exact_ans)
+                return Result(
+                    "integ",
+                    self.exact_ans,
+                    self.approx_ans,
+                    output_type,
+                    settings,
+                    extra={"quadrature": quadrature.to_dict()},
+                )
+            elif approx_integ:
+                self.exact_ans = N(self.exact_ans, accuracy)
+            else:
+                try:
+                    self.exact_ans = self.exact_ans.doit()
+                except Exception:
+                    return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+            try:
+                if use_scientific:
+                    self.approx_ans = self.to_scientific_notation(
+                        str(N(self.exact_ans, accuracy)), use_scientific
+                    )
+                else:
+                    self.approx_ans = str(simplify(N(self.exact_ans, accuracy)))
+            except Exception:
+                self.approx_ans = 0
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+            else:
+                if use_scientific:
+                    self.approx_ans = self.to_scientific_notation(
+                        str(N(self.exact_ans, accuracy)), use_scientific
+                    )
+                else:
+                    self.approx_ans = str(N(self.exact_ans, accuracy))
+
+        else:
+            try:
+                self.exact_ans = integrate(
+                    parse_expr(input_expression), parse_expr(input_variable)
+                )
+            except Exception:
+                return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        prefix = ""
+        if issubclass(type(self.exact_ans), Integral):
+            prefix = "Unable to evaluate integral:\n"
+
+        return Result(
+            "integ", self.exact_ans, self.approx_ans, output_type, settings, prefix=prefix
+        )
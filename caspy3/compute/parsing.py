@@ -0,0 +1,99 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Memoized drop-in replacement of sympy.parsing.sympy_parser.parse_expr used by every command.
+
+SymPy's parse_expr executes 'from sympy import *' into a new namespace on every call without a
+global_dict. Here the namespace is built once per process and the parsed expressions are kept in
+a bounded LRU cache keyed by the string, the evaluate flag and the transformations. Parsing only
+reads the namespace and SymPy expressions are immutable, so both are shared between callers.
+"""
+
+from sympy import Max, Min
+from sympy.parsing.sympy_parser import parse_expr as sympy_parse_expr, standard_transformations
+
+import builtins
+import functools
+import types
+import typing as ty
+
+# Number of parsed expressions kept per process
+PARSE_CACHE_SIZE = 1024
+
+
+def _build_global_dict() -> ty.Dict[str, ty.Any]:
+    """The namespace SymPy's parse_expr builds when it isn't given a global_dict"""
+    global_dict = {}
+    exec("from sympy import *", global_dict)
+    for name, obj in vars(builtins).items():
+        if isinstance(obj, types.BuiltinFunctionType):
+            global_dict[name] = obj
+    global_dict["max"] = Max
+    global_dict["min"] = Min
+    return global_dict
+
+
+GLOBAL_DICT = _build_global_dict()
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(s: str, evaluate: bool, transformations: tuple) -> ty.Any:
+    return sympy_parse_expr(
+        s,
+        global_dict=GLOBAL_DICT,
+        transformations=transformations,
+        evaluate=evaluate,
+    )
+
+
+def parse_expr(
+    s: str,
+    local_dict: ty.Dict[str, ty.Any] = None,
+    transformations: ty.Union[tuple, str] = standard_transformations,
+    global_dict: ty.Dict[str, ty.Any] = None,
+    evaluate: bool = True,
+) -> ty.Any:
+    """
+    Same as sympy.parsing.sympy_parser.parse_expr. Calls without local_dict and global_dict are
+    answered from the cache.
+
+    :param s: str
+        The string to parse
+    :param evaluate: bool
+        Evaluate the expression, False keeps the expression as it was typed
+    :return: Any
+        The parsed expression
+    """
+    if local_dict is not None or global_dict is not None or isinstance(transformations, str):
+        return sympy_parse_expr(
+            s,
+            local_dict=local_dict,
+            transformations=transformations,
+            global_dict=global_dict if global_dict is not None else GLOBAL_DICT,
+            evaluate=evaluate,
+        )
+    return _parse_cached(s, bool(evaluate), tuple(transformations))
+
+
+def parse_cache_info() -> "functools._CacheInfo":
+    """Hits, misses and size of the parse cache"""
+    return _parse_cached.cache_info()
+
+
+def clear_parse_cache() -> None:
+    _parse_cached.cache_clear()
@@ -0,0 +1,58 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+
+import traceback
+import typing as ty
+
+from .base import BaseCompute
+
+
+class PfCompute(BaseCompute):
+    @BaseCompute.catch_error
+    def calc_pf(self, input_number: int) -> ty.Dict[str, ty.List[str]]:
+        self.approx_ans = ""
+        self.latex_answer = ""
+
+        try:
+            input_number = int(input_number)
+        except:
+            return {"error": [f"Error: {input_number} is not an integer."]}
+
+        if input_number < 2:
+            return {
+                "error": [
+                    f"Error: {input_number} is lower than 2, only number 2 and above is accepted."
+                ]
+            }
+
+        try:
+            self.exact_ans = factorint(input_number)
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        for base in self.exact_ans:
+            self.latex_answer += f"({base}**{self.exact_ans[base]})*"
+            self.approx_ans += f"({base}**{self.exact_ans[base]})*"
+
+        self.latex_answer = latex(parse_expr(self.latex_answer[0:-1], evaluate=False))
+        return {
+            "pf": [self.exact_ans, self.approx_ans[0:-1]],
+            "latex": self.latex_answer,
+        }
@@ -0,0 +1,366 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Executes commands in a pool of worker processes.
+
+SymPy holds the GIL, so threads can't evaluate two expressions at the same time. Every worker
+process imports the compute package once when it starts and then evaluates commands sent to it.
+Unlike concurrent.futures.ProcessPoolExecutor a single job can be timed out or cancelled, the
+worker process evaluating it is killed and replaced by a new one.
+"""
+
+from concurrent.futures import CancelledError, Future
+
+import collections
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+import typing as ty
+
+
+def _worker_main(conn: multiprocessing.connection.Connection) -> None:
+    """
+    Main loop of a worker process. Receives (job_id, command, params, representations) and sends
+    (job_id, result) back until None is received.
+    """
+    from . import run
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+
+        job_id, command, params, representations = job
+        result = run(command, params, representations)
+        try:
+            conn.send((job_id, result))
+        except Exception as e:
+            conn.send((job_id, {"error": [f"Error: result couldn't be sent: {e}"]}))
+
+
+class _Worker:
+    def __init__(self, context: multiprocessing.context.BaseContext) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        # (job_id, future, deadline, timeout) of the current job
+        self.job = None
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessExecutor:
+    """
+    Pool of worker processes evaluating commands of the compute package.
+
+    :param max_workers: int
+        Number of worker processes, defaults to the number of CPUs
+    :param timeout: float
+        Default number of seconds a job may run, None for no limit
+    """
+
+    def __init__(self, max_workers: int = None, timeout: float = None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+
+        self._context = multiprocessing.get_context("spawn")
+        self._workers = [_Worker(self._context) for _ in range(self.max_workers)]
+        self._pending = collections.deque()
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._shutdown = False
+        self._kill_running = False
+        self._wakeup_reader, self._wakeup_writer = multiprocessing.Pipe(duplex=False)
+
+        self._thread = threading.Thread(target=self._manage, daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        command: str,
+        params: list,
+        timeout: float = None,
+        representations: ty.Iterable[str] = None,
+    ) -> Future:
+        """
+        Schedules a command.
+
+        :param command: str
+            Name of the command, for example 'calc_integ'
+        :param params: list
+            Parameters of the command
+        :param timeout: float
+            Number of seconds the job may run, defaults to the timeout of the executor
+        :param representations: iterable
+            Representations of the answer to render, None for all
+        :return: Future
+            Future that resolves to the dict returned by the command
+        """
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit a job after shutdown")
+            job_timeout = self.timeout if timeout is None else timeout
+            if representations is not None:
+                representations = tuple(representations)
+            self._pending.append(
+                (next(self._ids), future, command, params, job_timeout, representations)
+            )
+        self._wakeup()
+        return future
+
+    def run(
+        self,
+        command: str,
+        params: list,
+        timeout: float = None,
+        representations: ty.Iterable[str] = None,
+    ) -> ty.Dict[str, ty.Any]:
+        """
+        Runs a command in a worker process and waits for the result, see submit()
+
+        :return: dict
+            Dict containing exact answer and approximate answer or error message
+        """
+        return self.result(self.submit(command, params, timeout, representations))
+
+    @staticmethod
+    def result(future: Future) -> ty.Dict[str, ty.Any]:
+        """
+        Waits for the result of a job, a cancelled job resolves to an error
+
+        :param future: Future
+            Future returned by submit()
+        :return: dict
+            Dict containing exact answer and approximate answer or error message
+        """
+        try:
+            return future.result()
+        except CancelledError:
+            return {"error": ["Error: the calculation was cancelled"]}
+
+    def map(
+        self, jobs: ty.Iterable[ty.Tuple[str, list]], timeout: float = None
+    ) -> ty.Iterator[ty.Dict[str, ty.Any]]:
+        """
+        Submits every (command, params) and yields the results in the same order
+        """
+        futures = [self.submit(command, params, timeout) for command, params in jobs]
+        for future in futures:
+            yield self.result(future)
+
+    def cancel(self, future: Future) -> bool:
+        """
+        Cancels a job. A job that hasn't started is simply removed, a running job is stopped by
+        killing its worker process and resolves to an error.
+
+        :param future: Future
+            Future returned by submit()
+        :return: bool
+            False if the job had already finished
+        """
+        if future.done():
+            return False
+        if future.cancel():
+            # Lets the manager drop the job and hand the next one to an idle worker
+            self._wakeup()
+            return True
+        with self._lock:
+            self._cancelled.add(future)
+        self._wakeup()
+        return True
+
+    def cancel_all(self) -> int:
+        """
+        Cancels every pending and running job.
+
+        :return: int
+            Number of cancelled jobs
+        """
+        with self._lock:
+            # The manager thread clears the job of a worker without the lock, it's read once
+            running = [worker.job for worker in self._workers]
+            futures = [job[1] for job in self._pending] + [
+                job[1] for job in running if job is not None
+            ]
+        return len([future for future in futures if self.cancel(future)])
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the pool. Pending jobs are cancelled.
+
+        :param wait: bool
+            Wait for running jobs to finish, if False they're killed
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._kill_running = not wait
+        self._wakeup()
+        self._thread.join()
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_writer.send_bytes(b"")
+        except OSError:
+            pass
+
+    def _respawn(self, worker: _Worker) -> None:
+        worker.kill()
+        if self._shutdown:
+            return
+        # The new process is started before taking the lock, cancel_all() reads the workers
+        new_worker = _Worker(self._context)
+        with self._lock:
+            self._workers[self._workers.index(worker)] = new_worker
+
+    def _finish(self, worker: _Worker, result: ty.Dict[str, ty.Any]) -> None:
+        future = worker.job[1]
+        worker.job = None
+        if not future.done():
+            future.set_result(result)
+
+    def _manage(self) -> None:
+        """Thread assigning jobs to idle workers and collecting results"""
+        while True:
+            with self._lock:
+                shutdown = self._shutdown
+                cancelled, self._cancelled = self._cancelled, set()
+
+                if shutdown:
+                    while self._pending:
+                        self._pending.popleft()[1].cancel()
+
+                for worker in self._workers:
+                    # Cancelled jobs are skipped until a live one is found for the idle worker
+                    while worker.job is None and self._pending and not shutdown:
+                        (
+                            job_id,
+                            future,
+                            command,
+                            params,
+                            timeout,
+                            representations,
+                        ) = self._pending.popleft()
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        deadline = time.monotonic() + timeout if timeout else None
+                        worker.job = (job_id, future, deadline, timeout)
+                        try:
+                            worker.conn.send((job_id, command, params, representations))
+                        except Exception as e:
+                            self._finish(
+                                worker, {"error": [f"Error: job couldn't be sent: {e}"]}
+                            )
+
+            busy = [worker for worker in self._workers if worker.job is not None]
+
+            killed = False
+            for worker in busy:
+                if worker.job[1] in cancelled or (shutdown and self._kill_running):
+                    self._finish(worker, {"error": ["Error: the calculation was cancelled"]})
+                    self._respawn(worker)
+                    killed = True
+            if killed:
+                # The new workers are idle, pending jobs are assigned to them first
+                continue
+
+            busy = [worker for worker in self._workers if worker.job is not None]
+            if shutdown and not busy:
+                break
+
+            deadlines = [worker.job[2] for worker in busy if worker.job[2] is not None]
+            wait_time = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+            ready = multiprocessing.connection.wait(
+                [worker.conn for worker in busy] + [self._wakeup_reader], wait_time
+            )
+
+            for conn in ready:
+                if conn is self._wakeup_reader:
+                    while self._wakeup_reader.poll():
+                        self._wakeup_reader.recv_bytes()
+                    continue
+
+                worker = next(worker for worker in busy if worker.conn is conn)
+                try:
+                    job_id, result = conn.recv()
+                except (EOFError, OSError):
+                    self._finish(
+                        worker,
+                        {"error": ["Error: the worker process evaluating the job died"]},
+                    )
+                    self._respawn(worker)
+                    continue
+                if job_id == worker.job[0]:
+                    self._finish(worker, result)
+
+            now = time.monotonic()
+            for worker in busy:
+                if worker.job is not None and worker.job[2] is not None and worker.job[2] <= now:
+                    timeout = worker.job[3]
+                    self._finish(
+                        worker,
+                        {"error": [f"Error: the calculation timed out after {timeout} seconds"]},
+                    )
+                    self._respawn(worker)
+
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+            worker.process.join(1)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+
+
+_executor: ty.Union[ProcessExecutor, None] = None
+
+
+def get_executor() -> ty.Union[ProcessExecutor, None]:
+    """Returns the executor used by the GUI workers, None means that commands run in-process"""
+    return _executor
+
+
+def set_executor(executor: ty.Union[ProcessExecutor, None]) -> None:
+    """
+    Sets the executor used by the GUI workers
+
+    :param executor: ProcessExecutor or None
+        The executor, None to evaluate commands in the thread of the worker
+    """
+    global _executor
+    _executor = executor
@@ -0,0 +1,471 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Numeric integration used by calc_integ when a quadrature method is selected.
+
+The integrand is compiled once with lambdify and evaluated on numpy arrays, many nodes per call.
+Two methods are available:
+
+    gauss-kronrod   Adaptive 7-15 point Gauss-Kronrod, the intervals with the largest error
+                    estimate are bisected until the requested accuracy is reached
+    tanh-sinh       Double exponential quadrature, the step is halved until two levels agree.
+                    Converges fast for integrands with singularities at the bounds
+
+Infinite bounds are mapped onto a finite interval before integrating. Both methods work in double
+precision, more than 15 digits are computed by mpmath.quad at the requested precision instead.
+Every result carries an error estimate and the number of evaluations of the integrand.
+
+numpy is imported by the functions that integrate, importing the module doesn't import it.
+"""
+
+from sympy import Expr, Float, I, Symbol, lambdify, N, oo, zoo
+
+import functools
+import math
+import sys
+import typing as ty
+
+QUADRATURE_METHODS = ["gauss-kronrod", "tanh-sinh"]
+
+# Largest number of intervals of gauss-kronrod
+MAX_INTERVALS = 2000
+
+# Largest level of tanh-sinh, the step at level k is 2**-k
+MAX_LEVEL = 12
+
+# Digits that can be computed in double precision
+DOUBLE_DIGITS = 15
+
+# Relative error, compared to the integral of the absolute value, that is limited by rounding
+ROUNDOFF = 100 * sys.float_info.epsilon
+
+# Nodes and weights of the 15 point Kronrod rule on [-1, 1], every other node belongs to the
+# 7 point Gauss rule. From QUADPACK's qk15.
+_XGK = (
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.000000000000000000000000000000000,
+)
+_WGK = (
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+)
+_WG = (
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _kronrod_rule() -> ty.Tuple["numpy.ndarray", "numpy.ndarray", "numpy.ndarray"]:
+    """Nodes, Kronrod weights and Gauss weights of the 15 point rule as numpy arrays"""
+    import numpy
+
+    xgk, wgk, wg = numpy.array(_XGK), numpy.array(_WGK), numpy.array(_WG)
+    nodes = numpy.concatenate([-xgk[:-1], xgk[::-1]])
+    kronrod_weights = numpy.concatenate([wgk[:-1], wgk[::-1]])
+    gauss_weights = numpy.zeros(15)
+    gauss_weights[[1, 3, 5, 7, 9, 11, 13]] = numpy.concatenate([wg[:-1], wg[::-1]])
+    return nodes, kronrod_weights, gauss_weights
+
+
+class QuadratureResult(ty.NamedTuple):
+    value: ty.Any
+    error: float
+    evaluations: int
+    method: str
+    converged: bool
+
+    def to_sympy(self, digits: int) -> Expr:
+        """The value as a SymPy number with digits significant digits"""
+        real, imag = self.value.real, self.value.imag
+        if abs(imag) <= self.error or imag == 0:
+            return N(Float(real, digits), digits)
+        return N(Float(real, digits) + Float(imag, digits) * I, digits)
+
+    def to_dict(self) -> ty.Dict[str, ty.Any]:
+        """Returned under the key 'quadrature' by calc_integ, see format_quadrature()"""
+        return {
+            "method": self.method,
+            "error": self.error,
+            "evaluations": self.evaluations,
+            "converged": self.converged,
+        }
+
+
+def format_quadrature(quadrature: ty.Dict[str, ty.Any]) -> str:
+    """
+    Text shown below the approximate answer by the CLI and the GUI
+
+    :param quadrature: dict
+        Returned by QuadratureResult.to_dict()
+    :return: str
+        The error estimate and the number of evaluations
+    """
+    text = (
+        f"Error estimate: {quadrature['error']:.2e}"
+        f"\nEvaluations: {quadrature['evaluations']} ({quadrature['method']})"
+    )
+    if not quadrature["converged"]:
+        text += "\nThe requested accuracy wasn't reached"
+    return text
+
+
+class Integrand:
+    """
+    Compiled integrand evaluating arrays of points. It's evaluated with real numbers until a point
+    gives nan, from then on with complex numbers, which gives SymPy's principal values for
+    example for x**x with x < 0.
+
+    :param expression: Expr
+        The integrand
+    :param variable: Symbol
+        Variable of integration
+    """
+
+    def __init__(self, expression: Expr, variable: Symbol) -> None:
+        self.expression = expression
+        self.variable = variable
+        self.function = lambdify(variable, expression, "numpy")
+        self.is_complex = False
+        self.evaluations = 0
+
+    def __call__(self, x: "numpy.ndarray") -> "numpy.ndarray":
+        import numpy
+
+        self.evaluations += x.size
+        with numpy.errstate(all="ignore"):
+            if not self.is_complex:
+                try:
+                    values = numpy.broadcast_to(self.function(x), x.shape)
+                except TypeError:
+                    values = None
+                if values is not None and not numpy.isnan(values).any():
+                    return values
+                self.is_complex = True
+            return numpy.broadcast_to(self.function(x.astype(complex)), x.shape)
+
+
+def _transform(
+    f: ty.Callable[["numpy.ndarray"], "numpy.ndarray"], a: float, b: float
+) -> ty.Tuple[ty.Callable[["numpy.ndarray"], "numpy.ndarray"], float, float]:
+    """
+    Maps an integral with infinite bounds onto a finite interval
+
+    :return: tuple
+        The integrand and the bounds of the new integral
+    """
+    if math.isinf(a) and math.isinf(b):
+        return lambda t: f(t / (1 - t * t)) * (1 + t * t) / (1 - t * t) ** 2, -1.0, 1.0
+    if math.isinf(b):
+        return lambda t: f(a + t / (1 - t)) / (1 - t) ** 2, 0.0, 1.0
+    if math.isinf(a):
+        return lambda t: f(b - (1 - t) / t) / (t * t), 0.0, 1.0
+    return f, a, b
+
+
+def _kronrod(
+    f: ty.Callable[["numpy.ndarray"], "numpy.ndarray"],
+    lower: "numpy.ndarray",
+    upper: "numpy.ndarray",
+) -> ty.Tuple["numpy.ndarray", "numpy.ndarray", "numpy.ndarray"]:
+    """
+    Applies the 15 point Kronrod rule to every interval at once
+
+    :return: tuple
+        Integral, QUADPACK's error estimate and integral of the absolute value per interval
+    """
+    import numpy
+
+    nodes, kronrod_weights, gauss_weights = _kronrod_rule()
+    center = (lower + upper) / 2
+    half = (upper - lower) / 2
+    values = f(center[:, None] + half[:, None] * nodes)
+    if not numpy.isfinite(values).all():
+        raise ValueError("The integrand isn't finite inside the interval of integration")
+
+    kronrod = half * (values @ kronrod_weights)
+    gauss = half * (values @ gauss_weights)
+    mean = kronrod / (2 * half)
+    resabs = half * (numpy.abs(values) @ kronrod_weights)
+    resasc = half * (numpy.abs(values - mean[:, None]) @ kronrod_weights)
+
+    error = numpy.abs(kronrod - gauss)
+    scale = numpy.where(resasc != 0, (200 * error / numpy.where(resasc != 0, resasc, 1)) ** 1.5, 1)
+    error = numpy.where((resasc != 0) & (error != 0), resasc * numpy.minimum(1, scale), error)
+    error = numpy.maximum(error, 50 * numpy.finfo(float).eps * resabs)
+    return kronrod, error, resabs
+
+
+def gauss_kronrod(
+    f: ty.Callable[["numpy.ndarray"], "numpy.ndarray"],
+    a: float,
+    b: float,
+    rel_tol: float,
+    abs_tol: float = 0.0,
+    max_intervals: int = MAX_INTERVALS,
+) -> ty.Tuple[ty.Any, float, bool]:
+    """
+    Adaptive Gauss-Kronrod quadrature. Every round bisects the intervals with the largest error
+    estimates, all new intervals are evaluated by a single call of f.
+
+    :param f: callable
+        Vectorized integrand
+    :param a: float
+        Lower bound, may be infinite
+    :param b: float
+        Upper bound, may be infinite
+    :param rel_tol: float
+        Requested relative error
+    :param abs_tol: float
+        Requested absolute error
+    :param max_intervals: int
+        Largest number of intervals
+    :return: tuple
+        Value, error estimate and if the requested error was reached
+    """
+    import numpy
+
+    f, a, b = _transform(f, a, b)
+    lower, upper = numpy.array([a]), numpy.array([b])
+    values, errors, absolutes = _kronrod(f, lower, upper)
+
+    while True:
+        total = values.sum()
+        error = errors.sum()
+        # Integrals close to 0 can only be computed to the rounding error of the integrand
+        tolerance = max(abs_tol, rel_tol * abs(total), ROUNDOFF * absolutes.sum())
+        if error <= tolerance:
+            return total, error, True
+        if len(values) >= max_intervals:
+            return total, error, False
+
+        # Bisects the largest errors until the others sum up to less than half the tolerance
+        order = numpy.argsort(errors)[::-1]
+        remaining = error - numpy.cumsum(errors[order])
+        count = int(numpy.searchsorted(-remaining, -tolerance / 2)) + 1
+        split = order[: min(count, max_intervals - len(values))]
+        middle = (lower[split] + upper[split]) / 2
+        # Intervals too narrow to be bisected in double precision
+        split = split[(middle > lower[split]) & (middle < upper[split])]
+        if not len(split):
+            return total, error, False
+        middle = (lower[split] + upper[split]) / 2
+
+        new_lower = numpy.concatenate([lower[split], middle])
+        new_upper = numpy.concatenate([middle, upper[split]])
+        new_values, new_errors, new_absolutes = _kronrod(f, new_lower, new_upper)
+
+        keep = numpy.ones(len(values), dtype=bool)
+        keep[split] = False
+        lower = numpy.concatenate([lower[keep], new_lower])
+        upper = numpy.concatenate([upper[keep], new_upper])
+        values = numpy.concatenate([values[keep], new_values])
+        errors = numpy.concatenate([errors[keep], new_errors])
+        absolutes = numpy.concatenate([absolutes[keep], new_absolutes])
+
+
+def tanh_sinh(
+    f: ty.Callable[["numpy.ndarray"], "numpy.ndarray"],
+    a: float,
+    b: float,
+    rel_tol: float,
+    abs_tol: float = 0.0,
+    max_level: int = MAX_LEVEL,
+) -> ty.Tuple[ty.Any, float, bool]:
+    """
+    Tanh-sinh quadrature. The nodes cluster doubly exponentially at the bounds, the distance of
+    a node to the nearest bound is computed directly so that no precision is lost. Nodes that
+    round onto a bound are skipped.
+
+    :param f: callable
+        Vectorized integrand
+    :param a: float
+        Lower bound, may be infinite
+    :param b: float
+        Upper bound, may be infinite
+    :param rel_tol: float
+        Requested relative error
+    :param abs_tol: float
+        Requested absolute error
+    :param max_level: int
+        Largest level, the step at level k is 2**-k
+    :return: tuple
+        Value, error estimate and if the requested error was reached
+    """
+    import numpy
+
+    # Nodes further out than this are closer than 1e-270 to the bounds. Mapped infinite bounds
+    # divide by the square of the distance, which mustn't underflow
+    u_max = 6.0 if math.isfinite(a) and math.isfinite(b) else 5.3
+    f, a, b = _transform(f, a, b)
+    half = (b - a) / 2
+
+    def level_sum(u: "numpy.ndarray") -> ty.Tuple[ty.Any, float]:
+        s = math.pi / 2 * numpy.sinh(u)
+        # 1 - tanh(s) without cancellation
+        distance = 1 / (numpy.exp(s) * numpy.cosh(s))
+        weights = math.pi / 2 * numpy.cosh(u) / numpy.cosh(s) ** 2
+        left = a + half * distance
+        right = b - half * distance
+        nodes = numpy.concatenate([left, right])
+        weights = numpy.concatenate([weights, weights])
+        inside = (nodes > a) & (nodes < b)
+        values = f(nodes[inside])
+        if not numpy.isfinite(values).all():
+            raise ValueError("The integrand isn't finite inside the interval of integration")
+        return half * (values @ weights[inside]), half * (numpy.abs(values) @ weights[inside])
+
+    # Sums of weight * value and weight * |value| of every node, the integral at step h is
+    # h * node_sum
+    h = 1.0
+    node_sum = half * math.pi / 2 * f(numpy.array([(a + b) / 2]))[0]
+    if not numpy.isfinite(node_sum):
+        raise ValueError("The integrand isn't finite inside the interval of integration")
+    abs_sum = abs(node_sum)
+    new_sum, new_abs_sum = level_sum(numpy.arange(1, int(u_max / h) + 1) * h)
+    node_sum, abs_sum = node_sum + new_sum, abs_sum + new_abs_sum
+    total = h * node_sum
+    error = math.inf
+    for level in range(1, max_level + 1):
+        h /= 2
+        new_sum, new_abs_sum = level_sum(numpy.arange(1, int(u_max / h) + 1, 2) * h)
+        node_sum, abs_sum = node_sum + new_sum, abs_sum + new_abs_sum
+        total, previous = h * node_sum, total
+        error = abs(total - previous)
+        tolerance = max(abs_tol, rel_tol * abs(total), ROUNDOFF * h * abs_sum)
+        if level > 2 and error <= tolerance:
+            return total, error, True
+    return total, error, False
+
+
+def _bound(bound: Expr) -> float:
+    """A bound as a float for the engines of numpy, oo and -oo become inf and -inf"""
+    bound = N(bound)
+    if bound in (oo, -oo):
+        return math.inf if bound == oo else -math.inf
+    if bound == zoo or not bound.is_number or not bound.is_extended_real:
+        raise ValueError(f"The bound '{bound}' must be a real number or oo")
+    return float(bound)
+
+
+def integrate(
+    expression: Expr,
+    variable: Symbol,
+    lower: Expr,
+    upper: Expr,
+    method: str = "gauss-kronrod",
+    digits: int = 10,
+) -> QuadratureResult:
+    """
+    Integrates expression numerically from lower to upper
+
+    :param expression: Expr
+        The integrand, it may only depend on variable
+    :param variable: Symbol
+        Variable of integration
+    :param lower: Expr
+        Lower bound, a real number, oo or -oo
+    :param upper: Expr
+        Upper bound, a real number, oo or -oo
+    :param method: str
+        One of QUADRATURE_METHODS
+    :param digits: int
+        Number of correct significant digits requested
+    :return: QuadratureResult
+        Value, error estimate, number of evaluations of the integrand and if the requested
+        error was reached
+    """
+    if method not in QUADRATURE_METHODS:
+        raise ValueError(f"Unknown quadrature method '{method}'")
+    other_symbols = expression.free_symbols - {variable}
+    if other_symbols:
+        names = ", ".join(sorted(str(symbol) for symbol in other_symbols))
+        raise ValueError(f"The integrand may only depend on {variable}, not on {names}")
+
+    a, b = _bound(lower), _bound(upper)
+    # Bounds closer than double precision are only equal if they're equal at full precision
+    if a == b and (math.isinf(a) or N(lower - upper, digits + 5) == 0):
+        return QuadratureResult(0.0, 0.0, 0, method, True)
+    sign = 1
+    if a > b:
+        a, b, sign = b, a, -1
+        lower, upper = upper, lower
+
+    if digits > DOUBLE_DIGITS:
+        return _integrate_mpmath(expression, variable, lower, upper, method, digits, sign)
+
+    f = Integrand(expression, variable)
+    rel_tol = 10.0 ** -(digits + 1)
+    if method == "tanh-sinh":
+        value, error, converged = tanh_sinh(f, a, b, rel_tol)
+    else:
+        value, error, converged = gauss_kronrod(f, a, b, rel_tol)
+    return QuadratureResult(sign * complex(value), float(error), f.evaluations, method, converged)
+
+
+def _integrate_mpmath(
+    expression: Expr,
+    variable: Symbol,
+    lower: Expr,
+    upper: Expr,
+    method: str,
+    digits: int,
+    sign: int,
+) -> QuadratureResult:
+    """
+    Integrates with mpmath.quad at digits + 5 digits of working precision. The bounds are
+    evaluated at the working precision as well, a float bound would only be correct to 16 digits.
+    """
+    import mpmath
+
+    def mp_bound(bound: Expr) -> ty.Any:
+        if bound in (oo, -oo):
+            return mpmath.inf if bound == oo else -mpmath.inf
+        return mpmath.mpf(str(N(bound, digits + 5)))
+
+    function = lambdify(variable, expression, "mpmath")
+    evaluations = 0
+
+    def f(x: ty.Any) -> ty.Any:
+        nonlocal evaluations
+        evaluations += 1
+        return function(x)
+
+    # mpmath has no Gauss-Kronrod, Gauss-Legendre is its closest equivalent
+    mp_method = "tanh-sinh" if method == "tanh-sinh" else "gauss-legendre"
+    with mpmath.workdps(digits + 5):
+        bounds = [mp_bound(lower), mp_bound(upper)]
+        value, error = mpmath.quad(f, bounds, method=mp_method, error=True)
+        converged = error <= abs(value) * mpmath.mpf(10) ** -(digits + 1)
+        # Arithmetic outside of workdps() would round value to double precision
+        value = sign * value
+    return QuadratureResult(value, float(error), evaluations, method, bool(converged))
@@ -0,0 +1,160 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Answers of the commands, formatted on demand.
+
+A command returns a Result holding the SymPy expression instead of the formatted dict. Printing
+a large expression often takes longer than computing it, so every representation is only
+rendered the first time it's accessed. BaseCompute.execute() turns the Result into the usual
+dict with the representations the caller asked for, the CLI for example never needs the LaTeX.
+Commands whose answers are cheap to print, such as calc_pf, still return the dict itself.
+
+The options of the printers are held by a PrintSettings of each job and passed to pretty()
+directly. init_printing() isn't used, it changes the printing of the whole process and jobs
+running at the same time with other options would print each other's way.
+"""
+
+from sympy import latex, pretty
+
+import functools
+import typing as ty
+
+# Representations of an answer, in the order of the dict returned by the commands
+REPRESENTATIONS = ("exact", "approx", "latex")
+
+
+class PrintSettings(ty.NamedTuple):
+    """
+    Options of the pretty printer for one job
+
+    :param use_unicode: bool
+        Use unicode characters
+    :param wrap_line: bool
+        Wrap lines longer than the width of the terminal
+    """
+
+    use_unicode: bool = False
+    wrap_line: bool = True
+
+    def pretty(self, expression: ty.Any) -> str:
+        return str(pretty(expression, use_unicode=self.use_unicode, wrap_line=self.wrap_line))
+
+
+class Result:
+    """
+    Answer of a command. The representations are rendered on first access and memoized.
+
+    :param name: str
+        Key of the answer in the dict, for example 'deriv'
+    :param exact: Expr or list
+        The exact answer
+    :param approx: str, list or callable
+        The approximate answer, a callable is called on first access. 0 if there is none
+    :param output_type: int
+        1 for pretty, 2 for latex and 3 for normal, selects the exact representation
+    :param settings: PrintSettings
+        Options of the pretty representation
+    :param latex_expression: Expr
+        Expression rendered as LaTeX, defaults to exact
+    :param prefix: str
+        Text put in front of the exact representation
+    :param suffix: str
+        Text appended to the exact representation
+    :param extra: dict
+        Further entries of the dict, they're always present
+    """
+
+    def __init__(
+        self,
+        name: str,
+        exact: ty.Any,
+        approx: ty.Union[str, ty.List[str], ty.Callable[[], ty.Any]] = 0,
+        output_type: int = 3,
+        settings: PrintSettings = PrintSettings(),
+        latex_expression: ty.Any = None,
+        prefix: str = "",
+        suffix: str = "",
+        extra: ty.Dict[str, ty.Any] = None,
+    ) -> None:
+        self.name = name
+        self.expression = exact
+        self.output_type = output_type
+        self.settings = settings
+        self.latex_expression = exact if latex_expression is None else latex_expression
+        self.prefix = prefix
+        self.suffix = suffix
+        self.extra = extra or {}
+        self._approx = approx
+
+    @functools.cached_property
+    def pretty(self) -> str:
+        return self.settings.pretty(self.expression)
+
+    @functools.cached_property
+    def latex(self) -> str:
+        return str(latex(self.latex_expression))
+
+    @functools.cached_property
+    def plain(self) -> ty.Union[str, ty.List[str]]:
+        """str() of the expression, a list of solutions is kept as a list of str"""
+        if type(self.expression) == list:
+            return [str(i) for i in self.expression]
+        return str(self.expression)
+
+    @functools.cached_property
+    def approx(self) -> ty.Any:
+        return self._approx() if callable(self._approx) else self._approx
+
+    @property
+    def exact(self) -> ty.Union[str, ty.List[str]]:
+        """The exact answer in the representation selected by output_type"""
+        if self.output_type == 1:
+            exact = self.pretty
+        elif self.output_type == 2:
+            if self.latex_expression is self.expression:
+                exact = self.latex
+            else:
+                exact = str(latex(self.expression))
+        else:
+            exact = self.plain
+        if self.prefix or self.suffix:
+            return self.prefix + exact + self.suffix
+        return exact
+
+    def to_dict(self, representations: ty.Iterable[str] = None) -> ty.Dict[str, ty.Any]:
+        """
+        Formats the answer like the commands used to
+
+        :param representations: iterable
+            Names out of REPRESENTATIONS to render, None renders every one. The exact answer
+            is replaced by '' and the approximate answer by 0 if they're left out, 'latex' is
+            only present if it's asked for
+        :return: dict
+            {name: [exact answer, approximate answer], "latex": latex}
+        """
+        representations = REPRESENTATIONS if representations is None else representations
+        answer = {
+            self.name: [
+                self.exact if "exact" in representations else "",
+                self.approx if "approx" in representations else 0,
+            ]
+        }
+        if "latex" in representations:
+            answer["latex"] = self.latex
+        answer.update(self.extra)
+        return answer
@@ -0,0 +1,110 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from sympy import *
+from .parsing import parse_expr
+
+import traceback
+import typing as ty
+
+from .base import BaseCompute
+from .result import PrintSettings, Result
+
+
+class SummationCompute(BaseCompute):
+    @BaseCompute.catch_error
+    def prev_sum(
+        self,
+        input_expression: str,
+        input_variable: str,
+        sum_start: str,
+        sum_end: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if not input_expression:
+            return {"error": ["Enter an expression"]}
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+        if (sum_start and not sum_end) or (not sum_start and sum_end):
+            return {"error": ["Enter both start and end"]}
+
+        try:
+            self.exact_ans = Sum(
+                parse_expr(input_expression),
+                (parse_expr(input_variable), sum_start, sum_end),
+            )
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return Result("sum", self.exact_ans, self.approx_ans, output_type, settings)
+
+    @BaseCompute.catch_error
+    def calc_sum(
+        self,
+        input_expression: str,
+        input_variable: str,
+        sum_start: str,
+        sum_end: str,
+        output_type: int,
+        use_unicode: bool,
+        line_wrap: bool,
+        use_scientific: ty.Union[int, None],
+        accuracy: int,
+    ) -> ty.Union[Result, ty.Dict[str, ty.List[str]]]:
+        settings = PrintSettings(use_unicode, line_wrap)
+        self.approx_ans = 0
+        self.exact_ans = ""
+        self.latex_answer = ""
+
+        if use_scientific:
+            if use_scientific > accuracy:
+                accuracy = use_scientific
+
+        if not input_expression:
+            return {"error": ["Enter an expression"]}
+        if not input_variable:
+            return {"error": ["Enter a variable"]}
+        if (sum_start and not sum_end) or (not sum_start and sum_end):
+            return {"error": ["Enter both start and end"]}
+
+        try:
+            self.exact_ans = Sum(
+                parse_expr(input_expression),
+                (parse_expr(input_variable), sum_start, sum_end),
+            ).doit()
+        except Exception:
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        try:
+            if use_scientific:
+                self.approx_ans = self.to_scientific_notation(
+                    str(N(self.exact_ans, accuracy)), use_scientific
+                )
+            else:
+                self.approx_ans = str(simplify(N(self.exact_ans, accuracy)))
+        except Exception:
+            self.approx_ans = 0
+            return {"error": [f"Error: \n{traceback.format_exc()}"]}
+
+        return Result("sum", self.exact_ans, self.approx_ans, output_type, settings)
@@ -0,0 +1,174 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Tables of numeric values shared by 'caspy eval --grid' and the formula sweeps.
+
+A table is produced by an iterator yielding chunks, a chunk is a list with one numpy array per
+column. Tables are read from and written to CSV files with a header naming the columns, or to
+.npy files. numpy is imported when a table is used.
+"""
+
+import csv
+import itertools
+import typing as ty
+
+# Number of rows evaluated at once
+CHUNK_SIZE = 1 << 16
+
+# Number of rows shown in the GUI
+TABLE_MAX_ROWS = 10000
+
+
+def read_values(values_file: str) -> ty.Dict[str, ty.Any]:
+    """
+    Reads a CSV file with the variables in the header and one point per row
+
+    :param values_file: str
+        Path to the CSV file
+    :return: Dict
+        Dictionary with variable as key and a numpy array of its values as value
+    """
+    import numpy
+
+    with open(values_file, "r", encoding="utf8", newline="") as values_f:
+        header = [name.strip() for name in next(csv.reader(values_f), [])]
+        if not header:
+            raise ValueError(f"{values_file} is empty")
+        values = numpy.loadtxt(values_f, delimiter=",", dtype=float, ndmin=2)
+
+    if values.size and values.shape[1] != len(header):
+        raise ValueError(f"Expected {len(header)} values per row in {values_file}")
+    values = values.reshape(-1, len(header))
+    return {name: values[:, i] for i, name in enumerate(header)}
+
+
+def format_value(value: ty.Any, use_scientific: ty.Union[int, None], accuracy: int) -> str:
+    """Formats a value of a table with accuracy significant digits, -0 is written as 0"""
+    # Adding 0 turns -0.0 into 0.0
+    value = value + 0.0
+    if use_scientific:
+        digits = max(use_scientific - 1, 0)
+        if isinstance(value, complex):
+            return f"{value.real:.{digits}e} + {value.imag:.{digits}e}*I"
+        return f"{float(value):.{digits}e}"
+    digits = min(max(accuracy, 1), 17)
+    if isinstance(value, complex):
+        return f"{value.real:.{digits}g} + {value.imag:.{digits}g}*I"
+    return f"{float(value):.{digits}g}"
+
+
+def first_rows(
+    chunks: ty.Iterable[ty.List[ty.Any]],
+    max_rows: int,
+    use_scientific: ty.Union[int, None],
+    accuracy: int,
+) -> ty.List[ty.List[str]]:
+    """
+    Formats the first max_rows rows of a table
+
+    :return: list
+        One list of strings per row
+    """
+    rows = []
+    for columns in chunks:
+        for row in zip(*columns):
+            if len(rows) >= max_rows:
+                return rows
+            rows.append([format_value(value, use_scientific, accuracy) for value in row])
+    return rows
+
+
+def write_columns(
+    output: ty.Union[str, ty.TextIO],
+    header: ty.List[str],
+    chunks: ty.Iterable[ty.List[ty.Any]],
+    total: int,
+    use_scientific: ty.Union[int, None],
+    accuracy: int,
+) -> ty.List[str]:
+    """
+    Writes every row of a table chunk by chunk. A path ending with .npy is written as a memory
+    mapped .npy file with the dtype of the first chunk, anything else as CSV. Complex columns
+    take two columns in CSV, re(name) and im(name), and -0 is written as 0.
+
+    :param output: str or file
+        Path to write to or a text stream, for example sys.stdout
+    :param header: list
+        Name of every column
+    :param chunks: iterable
+        Chunks of the table
+    :param total: int
+        Number of rows of the table
+    :return: list
+        The header that was written
+    """
+    import numpy
+
+    if isinstance(output, str) and output.endswith(".npy"):
+        from numpy.lib.format import open_memmap
+
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            dtype, chunks = float, iter([])
+        else:
+            dtype, chunks = numpy.result_type(*first), itertools.chain([first], chunks)
+
+        table = open_memmap(output, mode="w+", dtype=dtype, shape=(total, len(header)))
+        try:
+            start = 0
+            for columns in chunks:
+                stop = start + len(columns[0])
+                table[start:stop] = numpy.column_stack(columns)
+                start = stop
+            table.flush()
+        finally:
+            del table
+        return header
+
+    if use_scientific:
+        value_format = f"%.{max(use_scientific - 1, 0)}e"
+    else:
+        value_format = f"%.{min(max(accuracy, 1), 17)}g"
+
+    stream = open(output, "w", encoding="utf8") if isinstance(output, str) else output
+    written = None
+    try:
+        for columns in chunks:
+            split_columns, names = [], []
+            for name, column in zip(header, columns):
+                if numpy.iscomplexobj(column):
+                    split_columns += [column.real, column.imag]
+                    names += [f"re({name})", f"im({name})"]
+                else:
+                    split_columns.append(column)
+                    names.append(name)
+            if written is None:
+                written = names
+                stream.write(",".join(f'"{n}"' if "," in n else n for n in names) + "\n")
+            # A single % formats the whole chunk, numpy.savetxt() formats one row at a time
+            row_format = ",".join([value_format] * len(split_columns)) + "\n"
+            table = numpy.column_stack(split_columns).astype(float) + 0.0
+            stream.write((row_format * len(table)) % tuple(table.ravel()))
+        if written is None:
+            written = header
+            stream.write(",".join(f'"{n}"' if "," in n else n for n in header) + "\n")
+    finally:
+        if stream is not output:
+            stream.close()
+    return written
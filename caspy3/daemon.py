@@ -0,0 +1,281 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Daemon keeping warm worker processes resident for the CLI.
+
+'caspy daemon start' runs a DaemonServer listening on a Unix domain socket. The commands of the
+CLI send their validated parameters to it with run_in_daemon() and evaluate them in-process when
+no daemon is running. The daemon evaluates the jobs in a ProcessExecutor, every worker has SymPy
+imported and keeps its caches between jobs.
+
+This module is imported by every CLI command and must not import SymPy or the compute package
+at module level. Messages are pickled and prefixed by their length, multiprocessing.connection
+isn't used since importing it takes longer than a request.
+"""
+
+import os
+import pickle
+import signal
+import socket
+import struct
+import threading
+import time
+import typing as ty
+
+from . import __version__
+
+
+def is_supported() -> bool:
+    """Returns True if Unix domain sockets are available on this platform"""
+    return hasattr(socket, "AF_UNIX") and os.name != "nt"
+
+
+def default_socket_path() -> str:
+    """
+    Path of the socket of the daemon. CASPY_DAEMON_SOCKET overrides the default, which is in
+    a directory only accessible by the current user.
+
+    :return: str
+        Path to the socket
+    """
+    socket_path = os.environ.get("CASPY_DAEMON_SOCKET")
+    if socket_path:
+        return socket_path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        import tempfile
+
+        runtime_dir = tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"caspy3-{os.getuid()}", "daemon.sock")
+
+
+def _send_message(sock: socket.socket, message: ty.Any) -> None:
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(struct.pack("!Q", len(data)) + data)
+
+
+def _recv_message(sock: socket.socket) -> ty.Any:
+    def recv_exactly(size: int) -> bytes:
+        chunks = []
+        while size:
+            chunk = sock.recv(min(size, 1 << 20))
+            if not chunk:
+                raise EOFError("Connection closed")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    (size,) = struct.unpack("!Q", recv_exactly(8))
+    return pickle.loads(recv_exactly(size))
+
+
+def _connect(socket_path: str) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def request(message: ty.Dict[str, ty.Any], socket_path: str = None) -> ty.Any:
+    """
+    Sends a request to the daemon and returns the answer.
+
+    :param message: dict
+        Request with the key 'op', one of 'run', 'status' and 'stop'
+    :param socket_path: str
+        Path to the socket, defaults to default_socket_path()
+    :return: Any
+        The answer or None if no daemon is running
+    """
+    if not is_supported():
+        return None
+
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    try:
+        sock = _connect(socket_path)
+    except OSError:
+        return None
+
+    with sock:
+        try:
+            _send_message(sock, message)
+            return _recv_message(sock)
+        except (EOFError, OSError):
+            return None
+
+
+def run_in_daemon(
+    command: str, params: list, timeout: float = None, representations: ty.Iterable[str] = None
+) -> ty.Union[ty.Dict[str, ty.Any], None]:
+    """
+    Runs a command in the daemon. Setting the environment variable CASPY_NO_DAEMON or
+    CASPY_NO_CACHE always evaluates in-process, the daemon has a cache of its own.
+
+    :param command: str
+        Name of the command, for example 'calc_integ'
+    :param params: list
+        Parameters of the command
+    :param timeout: float
+        Number of seconds the command may run, None for no limit
+    :param representations: iterable
+        Representations of the answer to render, None for all
+    :return: dict or None
+        Dict returned by the command, None if no daemon of the same version is running
+    """
+    if os.environ.get("CASPY_NO_DAEMON") or os.environ.get("CASPY_NO_CACHE"):
+        return None
+
+    return request(
+        {
+            "op": "run",
+            "version": __version__,
+            "command": command,
+            "params": list(params),
+            "timeout": timeout,
+            "representations": None if representations is None else list(representations),
+        }
+    )
+
+
+class DaemonServer:
+    """
+    Accepts requests on a Unix domain socket and evaluates the commands in worker processes.
+
+    :param socket_path: str
+        Path to the socket, defaults to default_socket_path()
+    :param workers: int
+        Number of worker processes
+    """
+
+    def __init__(self, socket_path: str = None, workers: int = 1) -> None:
+        self.socket_path = socket_path or default_socket_path()
+        self.workers = workers
+        self.executor = None
+        self.listener = None
+        self.started = None
+        self.jobs = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def prepare_socket_dir(self) -> None:
+        """Creates the directory of the socket and removes a socket left behind by a dead daemon"""
+        socket_dir = os.path.dirname(os.path.abspath(self.socket_path))
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+        if os.stat(socket_dir).st_uid != os.getuid():
+            raise RuntimeError(f"{socket_dir} is owned by another user")
+
+        if os.path.exists(self.socket_path):
+            if request({"op": "status"}, self.socket_path) is not None:
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+
+    def serve_forever(self) -> None:
+        """Starts the worker processes and handles requests until stop() is called"""
+        from .compute.pool import ProcessExecutor
+
+        self.prepare_socket_dir()
+        self.executor = ProcessExecutor(self.workers)
+        # One job per worker, the socket is only opened once every worker has SymPy imported
+        warm_up = ("prev_deriv", ["x", "x", 1, "", 1, False, False])
+        list(self.executor.map([warm_up] * self.workers))
+
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.listener.listen()
+        self.started = time.time()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self.listener.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+        finally:
+            self.listener.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            self.executor.shutdown(wait=False)
+
+    def handle(self, conn: socket.socket) -> None:
+        """Answers a single request"""
+        with conn:
+            try:
+                message = _recv_message(conn)
+            except (EOFError, OSError, struct.error, pickle.UnpicklingError):
+                return
+
+            op = message.get("op")
+            if op == "run":
+                if message.get("version") != __version__:
+                    # The client evaluates the command itself
+                    answer = None
+                else:
+                    with self._lock:
+                        self.jobs += 1
+                    answer = self.executor.run(
+                        message["command"],
+                        message["params"],
+                        message.get("timeout"),
+                        message.get("representations"),
+                    )
+            elif op == "status":
+                answer = self.status()
+            elif op == "stop":
+                answer = {"stopped": True}
+            else:
+                answer = {"error": [f"Error: unknown request '{op}'"]}
+
+            try:
+                _send_message(conn, answer)
+            except OSError:
+                pass
+
+        if op == "stop":
+            self.stop()
+
+    def status(self) -> ty.Dict[str, ty.Any]:
+        return {
+            "pid": os.getpid(),
+            "version": __version__,
+            "socket": self.socket_path,
+            "workers": self.workers,
+            "uptime": time.time() - self.started,
+            "jobs": self.jobs,
+        }
+
+    def stop(self) -> None:
+        """Stops accepting requests, serve_forever() returns"""
+        self._stop.set()
+        # Wakes up accept()
+        try:
+            _connect(self.socket_path).close()
+        except OSError:
+            pass
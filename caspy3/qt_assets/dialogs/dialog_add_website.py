@@ -16,10 +16,10 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-import json
-
 from PyQt5.QtWidgets import QDialog
-from PyQt5.uic import loadUi
+from ..ui import load_ui
+
+from ...resources import save_json
 
 
 class AddWebsite(QDialog):
@@ -29,7 +29,7 @@ class AddWebsite(QDialog):
         self.web_list = self.main_window.websites_data
         self.web_tab = web_tab
 
-        loadUi(self.main_window.get_resource_path("qt_assets/dialogs/web_add.ui"), self)
+        load_ui(self.main_window.get_resource_path("qt_assets/dialogs/web_add.ui"), self)
 
         self.add_button_box.accepted.connect(self.add_website)
         self.add_button_box.rejected.connect(self.close)
@@ -41,18 +41,7 @@ class AddWebsite(QDialog):
             {self.display_line.text(): self.url_line.text()}
         )
 
-        with open(
-            self.main_window.get_resource_path("data/websites.json"),
-            "w",
-            encoding="utf-8",
-        ) as json_f:
-            json.dump(
-                self.main_window.websites_data,
-                json_f,
-                ensure_ascii=False,
-                indent=4,
-                sort_keys=False,
-            )
+        save_json("data/websites.json", self.main_window.websites_data)
 
         # Reload json file reading
         self.main_window.load_websites()
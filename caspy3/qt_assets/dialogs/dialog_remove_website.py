@@ -16,10 +16,10 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-import json
-
 from PyQt5.QtWidgets import QDialog
-from PyQt5.uic import loadUi
+from ..ui import load_ui
+
+from ...resources import save_json
 
 
 class RemoveWebsite(QDialog):
@@ -29,7 +29,7 @@ class RemoveWebsite(QDialog):
         self.web_list = self.main_window.websites_data
         self.web_tab = web_tab
 
-        loadUi(
+        load_ui(
             self.main_window.get_resource_path("qt_assets/dialogs/web_remove.ui"), self
         )
         for i in self.web_list:
@@ -46,18 +46,7 @@ class RemoveWebsite(QDialog):
         """
         selected_key = self.web_list[self.remove_combo.currentIndex()]
         self.main_window.websites_data.remove(selected_key)
-        with open(
-            self.main_window.get_resource_path("data/websites.json"),
-            "w",
-            encoding="utf-8",
-        ) as json_f:
-            json.dump(
-                self.main_window.websites_data,
-                json_f,
-                ensure_ascii=False,
-                indent=4,
-                sort_keys=True,
-            )
+        save_json("data/websites.json", self.main_window.websites_data, sort_keys=True)
 
         # Reload json file
         self.main_window.load_websites()
@@ -16,12 +16,14 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-import json, sys
+import sys
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QAbstractItemView, QListWidget, QListWidgetItem
 from PyQt5.QtGui import QIcon
 
+from ...resources import load_json, save_json
+
 
 class TabList(QListWidget):
     def __init__(self, main_window: "CASpyGUI") -> None:
@@ -37,14 +39,8 @@ class TabList(QListWidget):
         self.setDragDropMode(QAbstractItemView.InternalMove)
         self.setDragDropOverwriteMode(False)
 
-        with open(
-            self.main_window.get_resource_path("data/settings.json"),
-            "r",
-            encoding="utf8",
-        ) as json_f:
-            tab_file = json_f.read()
-            self.settings_json = json.loads(tab_file)
-            self.tab_data = self.settings_json["tabs"]
+        self.settings_json = load_json("data/settings.json")
+        self.tab_data = self.settings_json["tabs"]
 
         self.setFixedHeight(int(18.2 * len(self.tab_data.keys())))
 
@@ -78,18 +74,7 @@ class TabList(QListWidget):
 
         self.settings_json.update({"tabs": new_tab_list})
 
-        with open(
-            self.main_window.get_resource_path("data/settings.json"),
-            "w",
-            encoding="utf-8",
-        ) as json_f:
-            json.dump(
-                self.settings_json,
-                json_f,
-                ensure_ascii=False,
-                indent=4,
-                sort_keys=False,
-            )
+        save_json("data/settings.json", self.settings_json)
 
         self.main_window.load_settings()
 
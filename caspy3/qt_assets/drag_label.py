@@ -8,17 +8,17 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import QMimeData, Qt, QTemporaryDir, QUrl
 from PyQt5.QtGui import QDrag, QPalette, QPixmapCache
-from PyQt5.uic import loadUi
+from .ui import load_ui
 
 from sympy.parsing import parse_expr
 from sympy import Eq, latex
 from pathlib import Path
 import typing as ty
-import pkg_resources
 import string
 import random
 
-from .latex import mathTex_to_QPixmap
+from .latex import render_latex
+from ..resources import resource_path
 
 
 class SaveDialog(QDialog):
@@ -26,12 +26,7 @@ class SaveDialog(QDialog):
         super(SaveDialog, self).__init__(parent=parent)
         self.drag_label = drag_label
 
-        loadUi(
-            pkg_resources.resource_filename(
-                "caspy3", "qt_assets/dialogs/save_dialog.ui"
-            ),
-            self,
-        )
+        load_ui(resource_path("qt_assets/dialogs/save_dialog.ui"), self)
         self.fs_spinbox.setValue(self.drag_label.parent.main_window.latex_fs)
 
         self.color_hex = "#000000"
@@ -128,7 +123,7 @@ class DragLabel(QLabel):
         if not fs:
             fs = self.parent.main_window.latex_fs
 
-        pixmap = mathTex_to_QPixmap(
+        pixmap = render_latex(
             f"${latex(Eq(left, right))}$", fs, fig=self.parent.fig, color=color
         )
         return pixmap
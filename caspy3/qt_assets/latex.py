@@ -3,10 +3,35 @@ from PyQt5.QtGui import QImage, QPixmap
 
 # For LaTeX
 import matplotlib
-from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+import typing as ty
+
+from ..render import render_figure
 
 matplotlib.rcParams["mathtext.fontset"] = "cm"
 
+# Upper bound of the size of the images kept in memory in bytes
+LATEX_MEMORY_SIZE = 32 * 1024 * 1024
+
+
+def rgba_to_QImage(buf: bytes, width: int, height: int) -> QImage:
+    # rgbSwapped() copies the image, buf can be released afterwards
+    return QImage.rgbSwapped(QImage(buf, width, height, QImage.Format_ARGB32))
+
+
+def mathTex_to_QImage(
+    mathTex: str,
+    fs: int,
+    fig: "matplotlib.pyplot.figure.Figure",
+    color: str = "#000000",
+) -> QImage:
+    return rgba_to_QImage(*render_figure(fig, mathTex, fs, color))
+
 
 def mathTex_to_QPixmap(
     mathTex: str,
@@ -14,28 +39,140 @@ def mathTex_to_QPixmap(
     fig: "matplotlib.pyplot.figure.Figure",
     color: str = "#000000",
 ) -> QPixmap:
-    fig.clf()
-    fig.patch.set_facecolor("none")
-    fig.set_canvas(FigureCanvasAgg(fig))
-    renderer = fig.canvas.get_renderer()
+    return QPixmap(mathTex_to_QImage(mathTex, fs, fig, color))
+
+
+class LaTeXCache:
+    """
+    Cache of rendered LaTeX. Images are stored as PNG files named by the SHA-256 of the LaTeX,
+    the font size, the color and the DPI of the figure, and the most recently used images are
+    kept in memory as well. It's safe to share one instance between threads.
+
+    :param directory: str
+        Directory of the PNG files, None keeps the images in memory only
+    :param max_size: int
+        Upper bound of the size of the images kept in memory in bytes
+    """
+
+    def __init__(self, directory: ty.Union[str, None], max_size: int = LATEX_MEMORY_SIZE) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._images: "collections.OrderedDict[str, QImage]" = collections.OrderedDict()
+        self._lock = threading.Lock()
 
-    ax = fig.add_axes([0, 0, 1, 1])
-    ax.axis("off")
-    ax.patch.set_facecolor("none")
-    t = ax.text(0, 0, mathTex, ha="left", va="bottom", fontsize=fs, color=color)
+    @staticmethod
+    def make_key(mathTex: str, fs: int, color: str, dpi: float) -> str:
+        key = repr((matplotlib.__version__, mathTex, fs, color, dpi))
+        return hashlib.sha256(key.encode("utf8")).hexdigest()
 
-    fwidth, fheight = fig.get_size_inches()
-    fig_bbox = fig.get_window_extent(renderer)
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.png")
 
-    text_bbox = t.get_window_extent(renderer)
+    def get(self, key: str) -> ty.Union[QImage, None]:
+        """Returns the image from memory or from disk, None if it isn't cached"""
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
 
-    tight_fwidth = text_bbox.width * fwidth / fig_bbox.width
-    tight_fheight = text_bbox.height * fheight / fig_bbox.height
+        image = None
+        if self.directory:
+            path = self.path(key)
+            if os.path.exists(path):
+                image = QImage(path)
+                if image.isNull():
+                    image = None
 
-    fig.set_size_inches(tight_fwidth, tight_fheight)
+        if image is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, image)
+        return image
+
+    def put(self, key: str, image: QImage) -> None:
+        """Stores an image in memory and on disk"""
+        self._remember(key, image)
+        if not self.directory:
+            return
+
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".png")
+            os.close(fd)
+            if image.save(temp_path, "PNG"):
+                os.replace(temp_path, path)
+            else:
+                os.unlink(temp_path)
+        except OSError:
+            pass
+
+    def _remember(self, key: str, image: QImage) -> None:
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return
+            self._images[key] = image
+            self.size += image.sizeInBytes()
+            while self.size > self.max_size and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= evicted.sizeInBytes()
+
+    def clear(self) -> None:
+        """Removes the images kept in memory, the PNG files are kept"""
+        with self._lock:
+            self._images.clear()
+            self.size = 0
+
+
+_latex_cache: ty.Union[LaTeXCache, None] = None
+
+
+def get_latex_cache() -> LaTeXCache:
+    """
+    Returns the shared cache. The PNG files are stored in the directory 'latex' of the user
+    cache directory, setting CASPY_NO_CACHE keeps them in memory only.
+    """
+    global _latex_cache
+    if _latex_cache is None:
+        from ..compute.cache import latex_cache_dir
+
+        directory = None if os.environ.get("CASPY_NO_CACHE") else latex_cache_dir()
+        _latex_cache = LaTeXCache(directory)
+    return _latex_cache
+
+
+def render_latex(
+    mathTex: str,
+    fs: int,
+    fig: "matplotlib.pyplot.figure.Figure",
+    color: ty.Union[str, None] = "#000000",
+) -> QPixmap:
+    """
+    Same as mathTex_to_QPixmap, the image is only rendered if it isn't in the LaTeX cache
 
-    buf, size = fig.canvas.print_to_buffer()
-    qimage = QImage.rgbSwapped(QImage(buf, size[0], size[1], QImage.Format_ARGB32))
-    qpixmap = QPixmap(qimage)
+    :param mathTex: str
+        LaTeX surrounded by $
+    :param fs: int
+        Font size
+    :param fig: Figure
+        Figure used to render the LaTeX
+    :param color: str
+        Color of the text, None is black
+    :return: QPixmap
+        The rendered LaTeX
+    """
+    color = color or "#000000"
+    cache = get_latex_cache()
+    key = cache.make_key(mathTex, fs, color, fig.dpi)
 
-    return qpixmap
+    image = cache.get(key)
+    if image is None:
+        image = mathTex_to_QImage(mathTex, fs, fig, color)
+        cache.put(key, image)
+    return QPixmap.fromImage(image)
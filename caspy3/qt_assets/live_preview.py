@@ -0,0 +1,159 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Live preview of the tabs, enabled with Settings -> Live Preview.
+
+A tab previews its input once it hasn't changed for LIVE_PREVIEW_DELAY ms. Fast typing only
+restarts the timer and a preview that is still queued is replaced by the newer one in the
+scheduler. The answer of a preview whose input has changed since it was started is dropped, and
+the scheduler keeps the answers of previews so that going back to an earlier input isn't
+computed again. The input is usually incomplete while typing, errors of live previews are shown
+in the status bar instead of a message box.
+"""
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtGui import QCursor
+from PyQt5.QtWidgets import (
+    QAbstractButton,
+    QComboBox,
+    QLineEdit,
+    QPlainTextEdit,
+    QSpinBox,
+    QStackedWidget,
+    QTextEdit,
+    QWidget,
+)
+
+import typing as ty
+
+# Time in ms without changes to the input before previewing it
+LIVE_PREVIEW_DELAY = 300
+
+# How long an error of a live preview is shown in the status bar in ms
+LIVE_PREVIEW_ERROR_TIMEOUT = 5000
+
+
+class LivePreview(QObject):
+    """
+    Calls the preview function of a tab when its input stops changing
+
+    :param main_window: CASpyGUI
+        The main window, main_window.live_preview enables the live preview
+    :param preview: callable
+        Preview function of the tab, for example DerivativeTab.prev_deriv
+    :param inputs: list
+        Widgets of the input, see watch()
+    :param outputs: list
+        QTextBrowsers of the answer, their cursor is reset if an answer is dropped
+    :param delay: int
+        Time in ms without changes before previewing
+    """
+
+    def __init__(
+        self,
+        main_window: "CASpyGUI",
+        preview: ty.Callable[[], None],
+        inputs: ty.List[QWidget],
+        outputs: ty.List[QWidget],
+        delay: int = LIVE_PREVIEW_DELAY,
+    ) -> None:
+        super(LivePreview, self).__init__(main_window)
+        self.main_window = main_window
+        self.preview = preview
+        self.outputs = outputs
+
+        # Incremented on every change of the input, answers of older previews are stale
+        self.generation = 0
+        self._running = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.run)
+
+        self.watch(inputs)
+
+    def watch(self, widgets: ty.List[QWidget]) -> None:
+        """
+        Schedules a preview whenever one of the widgets changes
+
+        :param widgets: list
+            Text edits, line edits, spin boxes, combo boxes, buttons and stacked widgets
+        """
+        for widget in widgets:
+            if isinstance(widget, (QPlainTextEdit, QTextEdit, QLineEdit)):
+                widget.textChanged.connect(self.schedule)
+            elif isinstance(widget, QSpinBox):
+                widget.valueChanged.connect(self.schedule)
+            elif isinstance(widget, QComboBox):
+                widget.currentTextChanged.connect(self.schedule)
+            elif isinstance(widget, QAbstractButton):
+                widget.toggled.connect(self.schedule)
+            elif isinstance(widget, QStackedWidget):
+                widget.currentChanged.connect(self.schedule)
+            else:
+                raise TypeError(f"Can't watch {type(widget).__name__}")
+
+    def schedule(self) -> None:
+        self.generation += 1
+        if self.main_window.live_preview:
+            self.timer.start()
+
+    def run(self) -> None:
+        self._running = True
+        try:
+            self.preview()
+        finally:
+            self._running = False
+
+    def output(
+        self, update_ui: ty.Callable[[dict], None]
+    ) -> ty.Callable[[dict], None]:
+        """
+        Slot of the answer of a preview, update_ui itself unless the preview was started by
+        the timer
+
+        :param update_ui: callable
+            update_ui() of the tab
+        :return: callable
+            Calls update_ui with the answer if it's neither stale nor an error
+        """
+        if not self._running:
+            return update_ui
+
+        generation = self.generation
+
+        def update(answer: dict) -> None:
+            if generation != self.generation:
+                self.reset_cursor()
+                return
+            if "error" in answer:
+                self.reset_cursor()
+                message = str(answer["error"][0]).strip().splitlines()
+                self.main_window.statusBar().showMessage(
+                    message[-1] if message else "Error", LIVE_PREVIEW_ERROR_TIMEOUT
+                )
+                return
+            self.main_window.statusBar().clearMessage()
+            update_ui(answer)
+
+        return update
+
+    def reset_cursor(self) -> None:
+        for output in self.outputs:
+            output.viewport().setProperty("cursor", QCursor(Qt.ArrowCursor))
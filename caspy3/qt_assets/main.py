@@ -17,16 +17,27 @@
 #
 
 from pyperclip import copy
-import json
+import contextlib
 import os
-import pkg_resources
 
 import typing as ty
 
+from ..compute.pool import ProcessExecutor, set_executor
+from ..render import shutdown_render_pool
+from ..resources import load_json, resource_path, save_json
 from .dialogs.tab_list import TabList
+from .scheduler import (
+    LANE_CALC,
+    LANE_LATEX,
+    LANE_PREVIEW,
+    LANE_SHELL,
+    Scheduler,
+    format_depth,
+)
 
-from .tabs import TABS
-from PyQt5.QtCore import QCoreApplication, QThreadPool, pyqtSlot
+from ..startup import StartupTimer
+from .tabs import TABS, display_name, load_tab
+from PyQt5.QtCore import QCoreApplication, Qt, QTimer, pyqtSlot
 from PyQt5.QtGui import QKeySequence
 
 from PyQt5.QtWidgets import (
@@ -34,30 +45,53 @@ from PyQt5.QtWidgets import (
     QActionGroup,
     QApplication,
     QInputDialog,
+    QLabel,
     QMainWindow,
     QMessageBox,
+    QPushButton,
     QShortcut,
     QTabWidget,
     QWidget,
 )
 
 from PyQt5.QtGui import QCloseEvent
-from PyQt5.uic import loadUi
+from .ui import load_ui
+
+
+class TabPlaceholder(QWidget):
+    def __init__(self, classname: str) -> None:
+        """
+        Empty widget standing in for a tab until the tab is shown for the first time.
+
+        :param classname: str
+            Name of the tab class it stands in for
+        """
+        super().__init__()
+        self.classname = classname
+        self.setObjectName(f"{classname}Placeholder")
+        self.eout = None
+        self.aout = None
 
 
 class CASpyGUI(QMainWindow):
-    def __init__(self) -> None:
+    def __init__(self, startup_timer: StartupTimer = None) -> None:
         """
         The main window.
 
-        formulas.json is loaded and every variable + the threadpool is initialized.
-        self.TABS includes every tab to be loaded from qt_assets. This list is later iterated through and each tab is added to the tab manager
+        formulas.json is loaded and every variable + the scheduler is initialized.
+        self.TABS includes the name of every tab to be loaded from qt_assets. This list is later iterated through and
+        a placeholder for each tab is added to the tab manager, a tab is built when it's shown for the first time.
         Every QAction gets the corresponding function assigned when triggered.
+
+        :param startup_timer: StartupTimer
+            Records the duration of each phase of the startup if given
         """
         super().__init__()
+        self.startup_timer = startup_timer
 
         # Load json file, call individual function(s) to reload data
         self.load_jsons()
+        self.mark_startup("load json files")
 
         # Initialize variables
         self.exact_ans = ""
@@ -72,22 +106,55 @@ class CASpyGUI(QMainWindow):
         self.accuracy = self.settings_data["accuracy"]
         self.use_latex = self.settings_data["use_latex"]
         self.latex_fs = self.settings_data["latex_fs"]
+        self.live_preview = self.settings_data.get("live_preview", False)
+        self.timeout = self.settings_data.get("timeout", None)
         self.save_settings_data = {}
 
-        # Start threadppol
-        self.threadpool = QThreadPool()
-        self.threadpool.setMaxThreadCount(1)
+        # Start worker processes. At least one is started, timeouts and cancelling a calculation
+        # kill the worker process evaluating it
+        self.processes = self.settings_data.get("processes", 2)
+        self.executor = ProcessExecutor(max(self.processes, 1), self.timeout)
+        set_executor(self.executor)
+
+        # Workers are started in lanes, a thread of the calculation lane waits for each worker
+        # process and previews, LaTeX and the shell don't queue behind calculations
+        self.scheduler = Scheduler(
+            {
+                LANE_PREVIEW: 1,
+                LANE_LATEX: 1,
+                LANE_CALC: max(self.processes, 1),
+                LANE_SHELL: 1,
+            },
+            self,
+        )
+
+        self.mark_startup("start worker processes")
 
         # Define tabs used
-        self.TABS: ty.List[QWidget] = TABS
+        self.TABS: ty.List[str] = TABS
 
         # Initialize ui
         self.init_ui()
         self.init_shortcuts()
 
+    def mark_startup(self, phase: str) -> None:
+        if self.startup_timer:
+            self.startup_timer.mark(phase)
+
+    def profile(self, phase: str) -> ty.ContextManager[None]:
+        """
+        Measures the body of a with statement if the startup is profiled
+
+        :param phase: str
+            Name of the phase
+        """
+        if self.startup_timer:
+            return self.startup_timer.measure(phase)
+        return contextlib.nullcontext()
+
     @staticmethod
     def get_resource_path(relative_path: str) -> str:
-        return pkg_resources.resource_filename("caspy3", relative_path)
+        return resource_path(relative_path)
 
     def load_jsons(self) -> None:
         # Load each json_file
@@ -96,29 +163,18 @@ class CASpyGUI(QMainWindow):
         self.load_formulas()
 
     def load_settings(self) -> None:
-        with open(
-            self.get_resource_path("data/settings.json"), "r", encoding="utf8"
-        ) as json_f:
-            _settings_file = json_f.read()
-            self.settings_data = json.loads(_settings_file)
+        self.settings_data = load_json("data/settings.json")
 
     def load_websites(self) -> None:
-        with open(
-            self.get_resource_path("data/websites.json"), "r", encoding="utf8"
-        ) as json_f:
-            _websites_file = json_f.read()
-            self.websites_data = json.loads(_websites_file)
+        self.websites_data = load_json("data/websites.json")
 
     def load_formulas(self) -> None:
-        with open(
-            self.get_resource_path("data/formulas.json"), "r", encoding="utf8"
-        ) as json_f:
-            _formulas_file = json_f.read()
-            self.formulas_data = json.loads(_formulas_file)
+        self.formulas_data = load_json("data/formulas.json")
 
     def init_ui(self) -> None:
         """Load ui file, then initialize menu, and then initalize all tabs"""
-        loadUi(self.get_resource_path("qt_assets/main.ui"), self)
+        load_ui(self.get_resource_path("qt_assets/main.ui"), self)
+        self.mark_startup("load main.ui")
 
         # For displaying icon in taskbar
         try:
@@ -131,8 +187,10 @@ class CASpyGUI(QMainWindow):
             pass
 
         self.init_menu()
+        self.mark_startup("init menu")
         self.init_tabs()
         self.show()
+        self.mark_startup("show window")
 
     def init_menu(self) -> None:
         """For the QActionGroup Output Type -> Pretty - Latex - Normal.
@@ -157,12 +215,16 @@ class CASpyGUI(QMainWindow):
             "actionPrevious_Tab": self.previous_tab,
             "actionLatexFs": self.change_latex_fs,
             "actionUseLatex": self.toggle_use_latex,
+            "actionTimeout": self.change_timeout,
+            "actionCancel_Calculation": self.cancel_calculation,
+            "actionLivePreview": self.toggle_live_preview,
         }
 
         checkable_actions = {
             "actionUseLatex": self.use_latex,
             "actionUnicode": self.use_unicode,
             "actionLinewrap": self.line_wrap,
+            "actionLivePreview": self.live_preview,
         }
 
         # Assign function to QAction when triggered
@@ -170,6 +232,7 @@ class CASpyGUI(QMainWindow):
             self.menuSettings.actions()
             + self.menuCopy.actions()
             + self.menuTab.actions()
+            + self.menuCalculation.actions()
         ):
             object_name = action.objectName()
 
@@ -192,6 +255,20 @@ class CASpyGUI(QMainWindow):
         self.actionLatexFs.setText(
             _translate("MainWindow", f"LaTeX font-size - {self.latex_fs}")
         )
+        self.set_timeout_text()
+
+        # Button in the corner of the tab bar to stop every running calculation
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setToolTip(
+            f"Cancel Calculation ({self.actionCancel_Calculation.shortcut().toString()})"
+        )
+        self.cancel_button.clicked.connect(self.cancel_calculation)
+        self.tab_manager.setCornerWidget(self.cancel_button, Qt.TopRightCorner)
+
+        # Running and queued workers of each lane
+        self.queue_label = QLabel()
+        self.statusBar().addPermanentWidget(self.queue_label)
+        self.scheduler.depth_changed.connect(self.update_queue_depth)
 
         if self.output_type == 1:
             self.actionPretty.setChecked(True)
@@ -202,13 +279,38 @@ class CASpyGUI(QMainWindow):
 
     def init_tabs(self) -> None:
         """
-        Iterate through self.TABS and add the tab to tab_manager and pass self as main_window
+        Iterate through self.TABS and add a placeholder of each tab to tab_manager.
+        Only the current tab is built, the others are built when they're shown the first time.
         """
         self.tab_manager: QTabWidget
         self.tab_manager.clear()
         for tab in self.TABS:
-            tab: "sip.wrappertype"
-            self.tab_manager.addTab(tab(main_window=self), tab.display_name)
+            self.tab_manager.addTab(TabPlaceholder(tab), display_name(tab))
+
+        self.tab_manager.currentChanged.connect(self.build_tab)
+        self.build_tab(self.tab_manager.currentIndex())
+
+    def build_tab(self, index: int) -> None:
+        """
+        Replaces the placeholder at index with the tab, importing the module of the tab if needed.
+        Main window is passed to the tab as main_window
+
+        :param index: int
+            Index of the tab in tab_manager
+        """
+        placeholder = self.tab_manager.widget(index)
+        if not isinstance(placeholder, TabPlaceholder):
+            return
+
+        with self.profile(f"build {placeholder.classname}"):
+            tab = load_tab(placeholder.classname)(main_window=self)
+
+        self.tab_manager.blockSignals(True)
+        self.tab_manager.removeTab(index)
+        self.tab_manager.insertTab(index, tab, display_name(placeholder.classname))
+        self.tab_manager.setCurrentIndex(index)
+        self.tab_manager.blockSignals(False)
+        placeholder.deleteLater()
 
     @staticmethod
     def show_error_box(message: str) -> None:
@@ -305,6 +407,12 @@ class CASpyGUI(QMainWindow):
         else:
             self.use_latex = False
 
+    def toggle_live_preview(self, state: bool) -> None:
+        if state:
+            self.live_preview = True
+        else:
+            self.live_preview = False
+
     def get_latex_fs(self) -> None:
         # Get LaTeX resolution with QInputDialog
         number, confirmed = QInputDialog.getInt(
@@ -334,6 +442,47 @@ class CASpyGUI(QMainWindow):
             _translate("MainWindow", f"Accuracy - {self.accuracy}")
         )
 
+    def get_timeout(self) -> None:
+        # Get timeout with QInputDialog, 0 means no timeout
+        number, confirmed = QInputDialog.getInt(
+            self,
+            "Get Timeout",
+            "Enter the number of seconds a calculation may run, 0 for no limit",
+            self.timeout or 0,
+            0,
+            999999,
+            1,
+        )
+        if confirmed:
+            self.timeout = number or None
+
+    def set_timeout_text(self) -> None:
+        _translate = QCoreApplication.translate
+        if self.timeout:
+            self.actionTimeout.setText(
+                _translate("MainWindow", f"Timeout - {self.timeout}s")
+            )
+        else:
+            self.actionTimeout.setText(_translate("MainWindow", "Timeout - None"))
+
+    def change_timeout(self) -> None:
+        # Changes the timeout of every calculation started afterwards
+        self.get_timeout()
+        self.set_timeout_text()
+        self.executor.timeout = self.timeout
+
+    @pyqtSlot(dict)
+    def update_queue_depth(self, depth: ty.Dict[str, ty.Tuple[int, int]]) -> None:
+        self.queue_label.setText(format_depth(depth))
+
+    def cancel_calculation(self) -> None:
+        # Every tab cancels its calculations, running ones are stopped by killing the worker
+        # processes evaluating them
+        for i in range(self.tab_manager.count()):
+            tab: QWidget = self.tab_manager.widget(i)
+            if hasattr(tab, "stop_thread"):
+                tab.stop_thread()
+
     def copy_exact_ans(self) -> None:
         # Copies self.exact_ans to clipboard.
         if type(self.exact_ans) == list:
@@ -428,6 +577,9 @@ class CASpyGUI(QMainWindow):
             "accuracy": self.accuracy,
             "use_latex": self.use_latex,
             "latex_fs": self.latex_fs,
+            "processes": self.processes,
+            "timeout": self.timeout,
+            "live_preview": self.live_preview,
         }
 
         # Going through each tab
@@ -437,23 +589,41 @@ class CASpyGUI(QMainWindow):
                 tab.jupyter_widget.kernel_client.stop_channels()
                 tab.jupyter_widget.kernel_manager.shutdown_kernel()
 
+        set_executor(None)
+        self.executor.shutdown(wait=False)
+        shutdown_render_pool()
+
+        # Keep the settings of tabs that were never built
+        for key in self.settings_data:
+            if key not in settings_json:
+                settings_json[key] = self.settings_data[key]
+
         # add data called from add_to_save_settings()
         for key in list(self.save_settings_data.keys()):
             settings_json[key] = self.save_settings_data[key]
 
-        with open(
-            self.get_resource_path("data/settings.json"), "w", encoding="utf-8"
-        ) as json_f:
-            json.dump(
-                settings_json, json_f, ensure_ascii=False, indent=4, sort_keys=False
-            )
+        save_json("data/settings.json", settings_json)
 
         event.accept()
 
 
-def launch_app() -> None:
+def launch_app(startup_timer: StartupTimer = None) -> None:
+    """
+    Starts the GUI
+
+    :param startup_timer: StartupTimer
+        Prints a startup timing report once the window is painted if given
+    """
     import sys
 
     app = QApplication(sys.argv)
-    caspy = CASpyGUI()
+    if startup_timer:
+        startup_timer.mark("create QApplication")
+
+    caspy = CASpyGUI(startup_timer)
+
+    if startup_timer:
+        # The single shot fires once the event loop has painted the window
+        QTimer.singleShot(0, lambda: startup_timer.finish("first paint"))
+
     sys.exit(app.exec_())
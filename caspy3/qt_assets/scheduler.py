@@ -0,0 +1,244 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Scheduler of the workers of the GUI.
+
+Every worker is started in a lane and every lane has a QThreadPool with a number of threads of
+its own. A long calculation only occupies a thread of the calculation lane, previews, the LaTeX
+of the Formulas tab and the shell keep running in theirs.
+
+Workers with the methods job_key() and job_source(), such as BaseWorker, are coalesced and
+superseded. A worker with the key of a queued or running worker isn't run, it's given the result
+of the other one once it's done. A worker replaces the queued worker with the same source, so
+submitting a calculation again only keeps the latest input in the queue. The answers of workers
+whose job_memoize() returns True, the previews, are kept by key and given to later workers with
+the same key right away.
+"""
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import collections
+import threading
+import typing as ty
+
+# Lanes
+LANE_PREVIEW = "preview"
+LANE_LATEX = "latex"
+LANE_CALC = "calc"
+LANE_SHELL = "shell"
+
+# Names of the lanes shown in the status bar
+LANE_NAMES = {
+    LANE_PREVIEW: "Previews",
+    LANE_LATEX: "LaTeX",
+    LANE_CALC: "Calculations",
+    LANE_SHELL: "Shell",
+}
+
+# Number of answers of memoized workers that are kept
+MEMO_SIZE = 256
+
+
+class LaneRunnable(QRunnable):
+    """
+    Runs a worker and reports back to the scheduler
+
+    :param worker: QRunnable
+        The worker
+    :param lane: str
+        Lane of the worker
+    :param scheduler: Scheduler
+        The scheduler that started the worker
+    """
+
+    def __init__(self, worker: QRunnable, lane: str, scheduler: "Scheduler") -> None:
+        super(LaneRunnable, self).__init__()
+        self.worker = worker
+        self.lane = lane
+        self.scheduler = scheduler
+        self.key = worker.job_key() if hasattr(worker, "job_key") else None
+        self.source = worker.job_source() if hasattr(worker, "job_source") else None
+        self.memoize = (
+            self.key is not None and hasattr(worker, "job_memoize") and worker.job_memoize()
+        )
+        self.started = False
+
+        # Workers with the same key waiting for the result of worker
+        self.followers: ty.List[QRunnable] = []
+
+    def run(self) -> None:
+        self.scheduler._started(self)
+        try:
+            self.worker.run()
+        finally:
+            self.scheduler._finished(self)
+
+
+class Scheduler(QObject):
+    """
+    Starts workers in lanes with a limited number of threads each. It's safe to start workers from
+    any thread.
+
+    :param limits: dict
+        Number of threads per lane
+    :param parent: QObject
+        Parent of the scheduler and its thread pools
+    """
+
+    # {lane: (running, queued)} of every lane, emitted whenever a worker is started or finished
+    depth_changed = pyqtSignal(dict)
+
+    def __init__(self, limits: ty.Dict[str, int], parent: QObject = None) -> None:
+        super(Scheduler, self).__init__(parent)
+        self.limits = dict(limits)
+        self.pools: ty.Dict[str, QThreadPool] = {}
+        for lane, limit in self.limits.items():
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(limit)
+            self.pools[lane] = pool
+
+        # Number of workers that were given the result of another one, that were replaced and
+        # that were given a memoized answer
+        self.coalesced = 0
+        self.superseded = 0
+        self.memo_hits = 0
+
+        # Workers of each lane that are running or waiting for a thread
+        self._pending = {lane: 0 for lane in self.limits}
+        # Queued and running workers by key, queued workers by source
+        self._keys: ty.Dict[ty.Hashable, LaneRunnable] = {}
+        self._sources: ty.Dict[ty.Hashable, LaneRunnable] = {}
+        # Answers of memoized workers by key, least recently used first
+        self._memo: "collections.OrderedDict[ty.Hashable, ty.Any]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, worker: QRunnable, lane: str) -> None:
+        """
+        Starts worker as soon as a thread of lane is free. If a worker with the same key is
+        queued or running, worker is given its result instead. A queued worker with the same
+        source is removed. Memoized answers are emitted by worker before returning.
+
+        :param worker: QRunnable
+            The worker
+        :param lane: str
+            One of the lanes, for example LANE_CALC
+        """
+        runnable = LaneRunnable(worker, lane, self)
+        with self._lock:
+            answer = self._memo.get(runnable.key) if runnable.memoize else None
+            if answer is not None:
+                self._memo.move_to_end(runnable.key)
+                self._supersede(runnable.source)
+                self.memo_hits += 1
+
+        if answer is not None:
+            worker.emit_result(answer)
+            self.depth_changed.emit(self.depth())
+            return
+
+        with self._lock:
+            leader = self._keys.get(runnable.key) if runnable.key is not None else None
+            if leader is not None:
+                leader.followers.append(worker)
+                self.coalesced += 1
+                return
+
+            self._supersede(runnable.source)
+            self._pending[lane] += 1
+            if runnable.key is not None:
+                self._keys[runnable.key] = runnable
+            if runnable.source is not None:
+                self._sources[runnable.source] = runnable
+
+        self.pools[lane].start(runnable)
+        self.depth_changed.emit(self.depth())
+
+    def _supersede(self, source: ty.Hashable) -> None:
+        """Removes the queued worker of source from its pool, the lock is held"""
+        previous = self._sources.get(source)
+        if (
+            previous is not None
+            and not previous.started
+            and self.pools[previous.lane].tryTake(previous)
+        ):
+            self._forget(previous)
+            self.superseded += 1 + len(previous.followers)
+
+    def _forget(self, runnable: LaneRunnable) -> None:
+        """Removes a worker that has finished or was taken out of its pool, the lock is held"""
+        self._pending[runnable.lane] -= 1
+        if self._keys.get(runnable.key) is runnable:
+            del self._keys[runnable.key]
+        if self._sources.get(runnable.source) is runnable:
+            del self._sources[runnable.source]
+
+    def _started(self, runnable: LaneRunnable) -> None:
+        # A running worker can't be replaced anymore
+        with self._lock:
+            runnable.started = True
+            if self._sources.get(runnable.source) is runnable:
+                del self._sources[runnable.source]
+
+    def _finished(self, runnable: LaneRunnable) -> None:
+        with self._lock:
+            self._forget(runnable)
+            followers = runnable.followers
+
+            answer = getattr(runnable.worker, "answer", None)
+            if runnable.memoize and answer is not None:
+                self._memo[runnable.key] = answer
+                self._memo.move_to_end(runnable.key)
+                while len(self._memo) > MEMO_SIZE:
+                    self._memo.popitem(last=False)
+
+        for follower in followers:
+            if answer is None:
+                answer = {"error": ["Error: the calculation didn't return a result"]}
+            follower.emit_result(answer)
+        self.depth_changed.emit(self.depth())
+
+    def depth(self) -> ty.Dict[str, ty.Tuple[int, int]]:
+        """
+        :return: dict
+            Number of running and of queued workers per lane
+        """
+        with self._lock:
+            return {
+                lane: (min(pending, self.limits[lane]), max(0, pending - self.limits[lane]))
+                for lane, pending in self._pending.items()
+            }
+
+
+def format_depth(depth: ty.Dict[str, ty.Tuple[int, int]]) -> str:
+    """
+    Text of the status bar, lanes without any worker are left out
+
+    :param depth: dict
+        Returned by Scheduler.depth()
+    :return: str
+        For example 'Calculations: 1 running, 2 queued | Shell: 1 running'
+    """
+    lanes = []
+    for lane, (running, queued) in depth.items():
+        if not running and not queued:
+            continue
+        text = f"{LANE_NAMES.get(lane, lane)}: {running} running"
+        if queued:
+            text += f", {queued} queued"
+        lanes.append(text)
+    return " | ".join(lanes)
@@ -16,36 +16,51 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-import json
-import sys
-import pkg_resources
+import importlib
 
-# Import each Tab
-from .derivative import DerivativeTab
-from .equations import EquationsTab
-from .evaluate import EvaluateTab
-from .expand import ExpandTab
-from .formulas import FormulaTab
-from .integral import IntegralTab
-from .limit import LimitTab
-from .pf import PfTab
-from .shell.shell import ShellTab
-from .simplify import SimplifyTab
-from .summation import SummationTab
-from .web import WebTab
+import typing as ty
 
-TABS = []
+from ...resources import load_json
 
+# Module and display name of each tab. The module of a tab is only imported when the tab is shown
+# for the first time, which keeps PyQtWebEngine, qtconsole and matplotlib out of the startup.
+TAB_MODULES: ty.Dict[str, ty.Tuple[str, str]] = {
+    "DerivativeTab": (".derivative", "Derivative"),
+    "IntegralTab": (".integral", "Integral"),
+    "LimitTab": (".limit", "Limit"),
+    "SummationTab": (".summation", "Summation"),
+    "EquationsTab": (".equations", "Equation Solver"),
+    "SimplifyTab": (".simplify", "Simplify"),
+    "ExpandTab": (".expand", "Expand"),
+    "EvaluateTab": (".evaluate", "Evaluate"),
+    "PfTab": (".pf", "Prime Factors"),
+    "WebTab": (".web", "Web"),
+    "FormulaTab": (".formulas", "Formulas"),
+    "ShellTab": (".shell.shell", "Shell"),
+}
 
-def str_to_class(classname: str) -> "sip.wrappertype":
-    return getattr(sys.modules[__name__], classname)
+TABS: ty.List[str] = []
 
 
-settings_json = pkg_resources.resource_filename("caspy3", "data/settings.json")
-with open(settings_json, "r", encoding="utf8") as json_f:
-    tab_file = json_f.read()
-    tab_data = json.loads(tab_file)["tabs"]
+def load_tab(classname: str) -> "sip.wrappertype":
+    """
+    Imports the module of a tab and returns the class
+
+    :param classname: str
+        Name of the tab class, for example 'DerivativeTab'
+    :return: sip.wrappertype
+        The tab class
+    """
+    module = importlib.import_module(TAB_MODULES[classname][0], __name__)
+    return getattr(module, classname)
+
+
+def display_name(classname: str) -> str:
+    return TAB_MODULES[classname][1]
+
+
+tab_data = load_json("data/settings.json")["tabs"]
 
 for tab in list(tab_data.keys()):
-    if tab_data[tab]:
-        TABS.append(str_to_class(tab))
+    if tab_data[tab] and tab in TAB_MODULES:
+        TABS.append(tab)
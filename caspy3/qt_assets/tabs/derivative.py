@@ -16,136 +16,23 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PyQt5.QtCore import pyqtSlot, Qt
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QShortcut, QTextBrowser, QWidget
 from PyQt5.QtGui import QCursor, QKeySequence
-from PyQt5.uic import loadUi
+from ..ui import load_ui
 
-from sympy import *
-from sympy.parsing.sympy_parser import parse_expr
-
-import traceback
 import typing as ty
 
-from .worker import BaseWorker
+from .worker import BaseWorker, TabWorkers
+from ..live_preview import LivePreview
+from ..scheduler import LANE_CALC, LANE_PREVIEW
+from ...compute.derivative import DerivativeCompute
 
 
-class DerivativeWorker(BaseWorker):
+class DerivativeWorker(BaseWorker, DerivativeCompute):
     def __init__(self, command: str, params: list, copy: int = None) -> None:
         super().__init__(command, params, copy)
 
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def prev_deriv(
-        self,
-        input_expression: str,
-        input_variable: str,
-        input_order: int,
-        input_point: str,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if not input_expression:
-            return {"error": ["Enter an expression"]}
-        if not input_variable:
-            return {"error": ["Enter a variable"]}
-
-        try:
-            derivative = Derivative(str(input_expression), input_variable, input_order)
-        except Exception:
-            return {"error": [f"Error: \n{traceback.format_exc()}"]}
-        self.latex_answer = str(latex(derivative))
-
-        if input_point:
-            self.exact_ans = f"At {input_variable} = {input_point}\n"
-
-        if output_type == 1:
-            self.exact_ans += str(pretty(derivative))
-        elif output_type == 2:
-            self.exact_ans += str(latex(derivative))
-        else:
-            self.exact_ans += str(derivative)
-
-        return {"deriv": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def calc_deriv(
-        self,
-        input_expression: str,
-        input_variable: str,
-        input_order: int,
-        input_point: str,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-        use_scientific: ty.Union[int, None],
-        accuracy: int,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if use_scientific:
-            if use_scientific > accuracy:
-                accuracy = use_scientific
-
-        if not input_expression:
-            return {"error": ["Enter an expression"]}
-        if not input_variable:
-            return {"error": ["Enter a variable"]}
-
-        try:
-            self.exact_ans = diff(
-                parse_expr(input_expression), parse_expr(input_variable), input_order
-            )
-        except Exception:
-            return {"error": [f"Error: \n{traceback.format_exc()}"]}
-        self.latex_answer = str(latex(self.exact_ans))
-
-        if input_point:
-            calc_deriv_point = str(self.exact_ans).replace(
-                input_variable, f"({input_point})"
-            )
-
-            if use_scientific:
-                try:
-                    self.approx_ans = self.to_scientific_notation(
-                        str(N(calc_deriv_point, accuracy)), use_scientific
-                    )
-                except Exception:
-                    return {"error": [f"Failed to parse {input_point}"]}
-            else:
-                try:
-                    self.approx_ans = str(N(calc_deriv_point, accuracy))
-                except Exception:
-                    return {"error": [f"Failed to parse {input_point}"]}
-
-            self.latex_answer = str(latex(simplify(calc_deriv_point)))
-            if output_type == 1:
-                self.exact_ans = str(pretty(simplify(calc_deriv_point)))
-            elif output_type == 2:
-                self.exact_ans = str(latex(simplify(calc_deriv_point)))
-            else:
-                self.exact_ans = str(simplify(calc_deriv_point))
-        else:
-            if output_type == 1:
-                self.exact_ans = str(pretty(self.exact_ans))
-            elif output_type == 2:
-                self.exact_ans = str(latex(self.exact_ans))
-            else:
-                self.exact_ans = str(self.exact_ans)
-
-        return {"deriv": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
 
 class DerivativeTab(QWidget):
 
@@ -165,7 +52,8 @@ class DerivativeTab(QWidget):
 
         super().__init__()
         self.main_window = main_window
-        loadUi(self.main_window.get_resource_path("qt_assets/tabs/derivative.ui"), self)
+        self.workers = TabWorkers()
+        load_ui(self.main_window.get_resource_path("qt_assets/tabs/derivative.ui"), self)
         self.eout: QTextBrowser = self.DerivOut
         self.aout: QTextBrowser = self.DerivApprox
 
@@ -176,6 +64,14 @@ class DerivativeTab(QWidget):
         pshortcut.activated.connect(self.prev_deriv)
         self.init_bindings()
 
+        # Preview while typing, see Settings -> Live Preview
+        self.live_preview = LivePreview(
+            self.main_window,
+            self.prev_deriv,
+            [self.DerivExp, self.DerivVar, self.DerivOrder, self.DerivPoint],
+            [self.DerivOut, self.DerivApprox],
+        )
+
     def init_bindings(self) -> None:
         self.DerivPrev.clicked.connect(self.prev_deriv)
         self.DerivCalc.clicked.connect(self.calc_deriv)
@@ -191,7 +87,8 @@ class DerivativeTab(QWidget):
         textbrowser.setTextCursor(cursor)
 
     def stop_thread(self) -> None:
-        pass
+        # Cancels the calculations of the tab
+        self.workers.cancel()
 
     def update_ui(self, input_dict: ty.Dict[str, ty.List[str]]) -> None:
         self.DerivOut.viewport().setProperty("cursor", QCursor(Qt.ArrowCursor))
@@ -225,10 +122,10 @@ class DerivativeTab(QWidget):
                 self.main_window.line_wrap,
             ],
         )
-        worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        worker.signals.output.connect(self.live_preview.output(self.update_ui))
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_PREVIEW)
 
     def calc_deriv(self) -> None:
         self.DerivOut.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
@@ -249,6 +146,6 @@ class DerivativeTab(QWidget):
             ],
         )
         worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_CALC)
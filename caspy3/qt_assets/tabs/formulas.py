@@ -27,247 +27,146 @@ from PyQt5.QtCore import (
 )
 from PyQt5.QtWidgets import (
     QAction,
+    QFileDialog,
     QGridLayout,
     QLabel,
     QLineEdit,
     QShortcut,
+    QTableWidgetItem,
     QTreeWidgetItem,
     QWidget,
 )
 from PyQt5.QtGui import (
     QCursor,
     QFont,
+    QImage,
     QKeySequence,
+    QPixmap,
     QPixmapCache,
 )
-from PyQt5.uic import loadUi
+from ..ui import load_ui
 
 # Misc
+from concurrent.futures import as_completed
 import typing as ty
 import re as pyreg
 
 # SymPy
-from sympy import *
-from sympy.parsing.sympy_parser import parse_expr
+from sympy import Eq, latex
 
 # matplotlib
 import matplotlib.pyplot as mpl
 
 # Relative
-from .worker import BaseWorker
+from .worker import BaseWorker, TabWorkers
+from ..scheduler import LANE_CALC, LANE_LATEX, LANE_PREVIEW
+from ...compute.catalog import get_catalog
+from ...compute.formulas import FormulaCompute
+from ...compute.parsing import parse_expr
 from ..drag_label import DragLabel
-from ..latex import mathTex_to_QPixmap
+from ..latex import get_latex_cache, mathTex_to_QImage, rgba_to_QImage
+from ...render import get_render_pool
 
 
 class LaTeXSignals(QObject):
     finished = pyqtSignal()
     current = pyqtSignal(int)
-    output = pyqtSignal(list)
+    image = pyqtSignal(int, QImage)
 
 
 class LaTeXWorker(QRunnable):
-    def __init__(self, latex_list: ty.List[str], fig: "matplotlib.pyplot.figure.Figure") -> None:
+    """
+    Renders the formulas of a sub-branch. Formulas that aren't in the LaTeX cache are rendered
+    in the worker processes of render.get_render_pool() and every image is emitted as soon as
+    it's done, the images of the cache first. If the pool can't be used the formulas are
+    rendered in this thread with fig.
+    """
+
+    def __init__(
+        self, latex_list: ty.List[str], fig: "matplotlib.pyplot.figure.Figure", fs: int = 15
+    ) -> None:
         super(LaTeXWorker, self).__init__()
 
         self.latex_list = latex_list
         self.fig = fig
+        self.fs = fs
 
         self.signals = LaTeXSignals()
 
     @pyqtSlot()
     def run(self) -> None:
-        out = []
+        cache = get_latex_cache()
+        color = "#000000"
+        done = 0
+        missing = []
+
         for i, formula in enumerate(self.latex_list):
             expr = formula.split("=")
 
             left = parse_expr(expr[0], evaluate=False)
             right = parse_expr(expr[1], evaluate=False)
-            latex_pixmap = mathTex_to_QPixmap(
-                f"${latex(Eq(left, right))}$",
-                15,
-                fig=self.fig,
-            )
-
-            out.append(latex_pixmap)
-            self.signals.current.emit(i)
-
-        self.signals.output.emit(out)
-        self.signals.finished.emit()
-
-
-class FormulaWorker(BaseWorker):
-    def __init__(self, command: str, params: list, copy: int = None) -> None:
-        super().__init__(command, params, copy)
-
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def prev_formula(
-        self,
-        lines: ty.List[list],
-        value_string: ty.List[str],
-        domain: str,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        empty_var_list, var_list, values = [], [], []
-        self.exact_ans = ""
-        self.approx_ans = 0
-        self.latex_answer = ""
-
-        if not lines:
-            return {"error": ["Error: select a formula"]}
-
-        if type(value_string) == list:
-            if len(value_string) != 2:
-                return {"error": [f"Error: Unable to get equation from {value_string}"]}
-        else:
-            return {"error": [f"Error: Unable to get equation from {value_string}"]}
+            mathTex = f"${latex(Eq(left, right))}$"
+            key = cache.make_key(mathTex, self.fs, color, self.fig.dpi)
 
-        for line in lines:
-            if line[0].text() == "":
-                empty_var_list.append(line[1])
-            elif line[0].text() == "var":
-                var_list.append(line[1])
+            image = cache.get(key)
+            if image is None:
+                missing.append((i, key, mathTex))
             else:
-                values.append([line[0].text(), line[1]])
+                done += 1
+                self.signals.image.emit(i, image)
+                self.signals.current.emit(done)
 
-        if len(var_list) > 1:
-            return {
-                "error": [
-                    "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
-                ]
-            }
-
-        if len(empty_var_list) > 1:
-            if len(var_list) != 1:
-                return {
-                    "error": [
-                        "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
-                    ]
-                }
-
-        if len(var_list) == 1:
-            final_var = var_list[0]
-        else:
-            final_var = empty_var_list[0]
-
-        left_side = value_string[0]
-        right_side = value_string[1]
-
-        result = self.prev_normal_eq(
-            left_side,
-            right_side,
-            final_var,
-            domain,
-            output_type,
-            use_unicode,
-            line_wrap,
-        )
-        return result
+        for (i, key, mathTex), image in self.render(missing, color):
+            cache.put(key, image)
 
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def calc_formula(
-        self,
-        lines: ty.List[list],
-        value_string: ty.List[str],
-        solve_type: int,
-        domain: str,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-        use_scientific: ty.Union[int, None],
-        accuracy: int,
-        verify_domain: bool,
-        approximate: ty.Union[str, None] = None,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        empty_var_list, var_list, values = [], [], []
-        self.exact_ans = ""
-        self.approx_ans = 0
-        self.latex_answer = "\\text{LaTeX support not yet implemented for formula}"
-
-        if use_scientific:
-            if use_scientific > accuracy:
-                accuracy = use_scientific
-
-        if not lines:
-            return {"error": ["Error: select a formula"]}
-
-        if type(value_string) == list:
-            if len(value_string) != 2:
-                return {"error": [f"Error: Unable to get equation from {value_string}"]}
-        else:
-            return {"error": [f"Error: Unable to get equation from {value_string}"]}
+            done += 1
+            self.signals.image.emit(i, image)
+            self.signals.current.emit(done)
 
-        for line in lines:
-            if line[0].text() == "":
-                empty_var_list.append(line[1])
-            elif line[0].text() == "var":
-                var_list.append(line[1])
-            else:
-                values.append([line[0].text(), line[1]])
+        self.signals.finished.emit()
 
-        if len(var_list) > 1:
-            return {
-                "error": [
-                    "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
-                ]
-            }
-
-        if len(empty_var_list) > 1:
-            if len(var_list) != 1:
-                return {
-                    "error": [
-                        "Solve for only one variable, if multiple empty lines type 'var' to solve for the variable"
-                    ]
-                }
-
-        if len(var_list) == 1:
-            final_var = var_list[0]
-        else:
-            final_var = empty_var_list[0]
-
-        left_side = parse_expr(value_string[0])
-        right_side = parse_expr(value_string[1])
-
-        for i in values:
-            left_side = left_side.subs(parse_expr(i[1]), i[0])
-            right_side = right_side.subs(parse_expr(i[1]), i[0])
-
-        left_side = str(left_side).replace("_i", "(sqrt(-1))")
-        right_side = str(right_side).replace("_i", "(sqrt(-1))")
-
-        result = self.calc_normal_eq(
-            left_side,
-            right_side,
-            final_var,
-            solve_type,
-            domain,
-            output_type,
-            use_unicode,
-            line_wrap,
-            use_scientific,
-            accuracy,
-            verify_domain,
-            approximate,
-        )
-        return result
+    def render(
+        self, jobs: ty.List[ty.Tuple[int, str, str]], color: str
+    ) -> ty.Iterator[ty.Tuple[ty.Tuple[int, str, str], QImage]]:
+        """
+        Renders (index, key, LaTeX) in the render pool and yields the jobs with their images
+        as they finish. Jobs the pool fails to render are rendered in this thread afterwards.
+        """
+        try:
+            pool = get_render_pool()
+            futures = {pool.submit(job[2], self.fs, color, self.fig.dpi): job for job in jobs}
+        except Exception:
+            futures = {}
+
+        rendered = set()
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                image = rgba_to_QImage(*future.result())
+            except Exception:
+                continue
+            rendered.add(job[0])
+            yield job, image
+
+        for job in jobs:
+            if job[0] not in rendered:
+                yield job, mathTex_to_QImage(job[2], self.fs, self.fig, color)
+
+
+class FormulaWorker(BaseWorker, FormulaCompute):
+    def __init__(self, command: str, params: list, copy: int = None) -> None:
+        super().__init__(command, params, copy)
 
 
 class FormulaTab(QWidget):
 
-    from sympy import Symbol, S
-    from sympy.abc import _clash1
-
     display_name = "Formulas"
 
     def __init__(self, main_window: "CASpyGUI") -> None:
         super().__init__()
         self.main_window = main_window
-        loadUi(self.main_window.get_resource_path("qt_assets/tabs/formulas.ui"), self)
+        self.workers = TabWorkers()
+        load_ui(self.main_window.get_resource_path("qt_assets/tabs/formulas.ui"), self)
         self.eout = self.FormulaExact
         self.aout = self.FormulaApprox
 
@@ -283,7 +182,10 @@ class FormulaTab(QWidget):
         self.use_latex = self.main_window.use_latex
         self.imag = pyreg.compile("\b_i\b")
 
-        self.fig = mpl.figure()
+        with self.main_window.profile("create matplotlib figure"):
+            self.fig = mpl.figure()
+        if self.use_latex:
+            get_render_pool().warm_up()
         self.init_ui()
 
         if "verify_domain_formula" in list(self.main_window.settings_data.keys()):
@@ -306,6 +208,7 @@ class FormulaTab(QWidget):
         self.grid_scroll_area = QGridLayout(self.FormulaScrollArea)
         self.grid_scroll_area.setObjectName("grid_scroll_area")
         self.splitter_2.setSizes([int(self.height() * 0.7), int(self.height() * 0.3)])
+        self.FormulaTable.setVisible(False)
 
     def init_formula_menu(self) -> None:
         self.menuFormula = self.main_window.menubar.addMenu("Formulas")
@@ -331,6 +234,7 @@ class FormulaTab(QWidget):
 
         self.FormulaPreview.clicked.connect(self.prev_formula)
         self.FormulaCalculate.clicked.connect(self.calc_formula)
+        self.FormulaSweep.clicked.connect(self.calc_formula_sweep)
 
         self.FormulaDomain.currentIndexChanged.connect(self.set_interval)
         self.FormulaNsolve.stateChanged.connect(self.approximate_state)
@@ -404,17 +308,20 @@ class FormulaTab(QWidget):
                 worker.signals.current.connect(
                     lambda current: self.update_current(current, total, title, item)
                 )
-                worker.signals.output.connect(
-                    lambda output: self.set_pixmap(output, item)
+                worker.signals.image.connect(
+                    lambda index, image: self.set_pixmap(index, image, item)
                 )
                 worker.signals.finished.connect(lambda: item.setText(0, title))
 
-                self.main_window.threadpool.start(worker)
+                # Rendering has a lane of its own and doesn't wait for calculations
+                self.main_window.scheduler.start(worker, LANE_LATEX)
 
     def collapsed_sub(self, item: QTreeWidgetItem) -> None:
         """
         In order to save memory, LaTeX QPixmaps are generated when shown
-        and cleared once the user clicks on another sub-branch.
+        and cleared once the user clicks on another sub-branch. The rendered
+        images stay in the LaTeX cache, expanding the sub-branch again doesn't
+        render them again.
 
         :param item: QTreeWidgetItem
             The item the user clicked at
@@ -445,25 +352,25 @@ class FormulaTab(QWidget):
             0, f"{title} - Generating LaTeX [{curr}/{total}] {int((curr/total)*100)}%"
         )
 
-    def set_pixmap(self, qp_list: ty.List["QPixmap"], item: QTreeWidgetItem) -> None:
+    def set_pixmap(self, index: int, image: QImage, item: QTreeWidgetItem) -> None:
         """
-        Sets pixmaps to respective QLabels
+        Sets the pixmap of a QLabel as soon as its formula is rendered
 
-        :param qp_list: list
-            List of QPixmaps
+        :param index: int
+            Index of the formula in the sub-branch
+        :param image: QImage
+            The rendered formula
         :param item: QTreeWidgetItem
             QTreeWidgetItem being expanded
         """
-        for i in range(item.childCount()):
-            pixmap = qp_list[i]
+        if not item.isExpanded():
+            return
 
-            qlabel: QLabel = self.FormulaTree.itemWidget(item.child(i), 0)
-            item.child(i).setSizeHint(
-                0, QSize(self.FormulaTree.width(), pixmap.height())
-            )
-            qlabel.setPixmap(pixmap)
+        pixmap = QPixmap.fromImage(image)
+        qlabel: QLabel = self.FormulaTree.itemWidget(item.child(index), 0)
+        item.child(index).setSizeHint(0, QSize(self.FormulaTree.width(), pixmap.height()))
+        qlabel.setPixmap(pixmap)
         self.FormulaTree.updateGeometries()
-        QPixmapCache.clear()
 
     def formula_tree_selected(self) -> None:
         """
@@ -476,20 +383,7 @@ class FormulaTab(QWidget):
             qlabel: QLabel = self.FormulaTree.itemWidget(widget, 0)
 
             self.formula = qlabel.objectName()
-            formula = self.imag.sub("(sqrt(-1))", self.formula)
-            expr = formula.split("=")
-
-            self.formula_symbol_list = [
-                list(i)
-                for i in [
-                    self.S(expr[j], locals=self._clash1).atoms(self.Symbol)
-                    for j in (0, 1)
-                ]
-            ]
-            self.formula_symbol_list = [
-                str(i) for j in self.formula_symbol_list for i in j
-            ]
-            self.formula_symbol_list.sort()
+            self.formula_symbol_list = get_catalog().symbols(self.formula)
 
             self.formula_update_vars()
             self.formula_info = self.formula_get_info(qlabel.objectName(), self.data)
@@ -553,7 +447,8 @@ class FormulaTab(QWidget):
                         return data[branch][subbranch][formula]
 
     def stop_thread(self) -> None:
-        pass
+        # Cancels the calculations of the tab
+        self.workers.cancel()
 
     def update_ui(self, input_dict: ty.Dict[str, ty.List[str]]) -> None:
         self.FormulaExact.viewport().setProperty("cursor", QCursor(Qt.ArrowCursor))
@@ -563,7 +458,10 @@ class FormulaTab(QWidget):
         if first_key == "error":
             self.main_window.show_error_box(input_dict[first_key][0])
             self.main_window.latex_text = ""
+        elif first_key == "table":
+            self.update_table(input_dict)
         else:
+            self.FormulaTable.setVisible(False)
             self.main_window.latex_text = input_dict["latex"]
             self.main_window.exact_ans = str(input_dict[first_key][0])
             self.main_window.approx_ans = input_dict[first_key][1]
@@ -571,10 +469,31 @@ class FormulaTab(QWidget):
             self.FormulaExact.setText(str(self.main_window.exact_ans))
             self.FormulaApprox.setText(str(self.main_window.approx_ans))
 
+    def update_table(self, input_dict: ty.Dict[str, ty.Any]) -> None:
+        header, rows, total = input_dict["table"]
+        self.main_window.latex_text = input_dict["latex"]
+
+        self.FormulaTable.setUpdatesEnabled(False)
+        self.FormulaTable.clear()
+        self.FormulaTable.setColumnCount(len(header))
+        self.FormulaTable.setRowCount(len(rows))
+        self.FormulaTable.setHorizontalHeaderLabels(header)
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                self.FormulaTable.setItem(i, j, QTableWidgetItem(value))
+        self.FormulaTable.setUpdatesEnabled(True)
+        self.FormulaTable.setVisible(True)
+
+        if len(rows) < total:
+            self.FormulaExact.setText(f"Showing {len(rows)} of {total} rows")
+        else:
+            self.FormulaExact.setText(f"{total} rows")
+        self.FormulaApprox.setText("")
+
     def prev_formula(self) -> None:
         try:
             lines = [
-                [self.FormulaScrollArea.findChild(QLineEdit, str(i) + "line"), i]
+                [self.FormulaScrollArea.findChild(QLineEdit, str(i) + "line").text(), i]
                 for i in self.formula_symbol_list
             ]
         except:
@@ -597,9 +516,9 @@ class FormulaTab(QWidget):
                 ],
             )
             worker.signals.output.connect(self.update_ui)
-            worker.signals.finished.connect(self.stop_thread)
+            self.workers.add(worker)
 
-            self.main_window.threadpool.start(worker)
+            self.main_window.scheduler.start(worker, LANE_PREVIEW)
 
     def calc_formula(self) -> None:
         if self.FormulaSolveSolve.isChecked():
@@ -609,7 +528,7 @@ class FormulaTab(QWidget):
 
         try:
             lines = [
-                [self.FormulaScrollArea.findChild(QLineEdit, str(i) + "line"), i]
+                [self.FormulaScrollArea.findChild(QLineEdit, str(i) + "line").text(), i]
                 for i in self.formula_symbol_list
             ]
             values_string = self.formula.split("=")
@@ -642,6 +561,41 @@ class FormulaTab(QWidget):
             ],
         )
         worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        self.workers.add(worker)
+
+        self.main_window.scheduler.start(worker, LANE_CALC)
+
+    def calc_formula_sweep(self) -> None:
+        try:
+            lines = [
+                [self.FormulaScrollArea.findChild(QLineEdit, str(i) + "line").text(), i]
+                for i in self.formula_symbol_list
+            ]
+            values_string = self.formula.split("=")
+        except:
+            self.main_window.show_error_box("Error: select a formula")
+            return
+
+        values_file, _ = QFileDialog.getOpenFileName(
+            self, "Select values", "", "CSV files (*.csv);;All files (*)"
+        )
+        if not values_file:
+            return
+
+        self.FormulaExact.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
+        self.FormulaApprox.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
+
+        worker = FormulaWorker(
+            "calc_formula_sweep",
+            [
+                lines,
+                values_string,
+                values_file,
+                self.main_window.use_scientific,
+                self.main_window.accuracy,
+            ],
+        )
+        worker.signals.output.connect(self.update_ui)
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_CALC)
@@ -16,166 +16,24 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PyQt5.QtCore import pyqtSlot, Qt
-from PyQt5.QtWidgets import QAction, QShortcut, QWidget
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QAction, QActionGroup, QShortcut, QWidget
 from PyQt5.QtGui import QCursor, QKeySequence
-from PyQt5.uic import loadUi
+from ..ui import load_ui
 
 import typing as ty
 
-from sympy import *
-from sympy.parsing.sympy_parser import parse_expr
+from .worker import BaseWorker, TabWorkers
+from ..live_preview import LivePreview
+from ..scheduler import LANE_CALC, LANE_PREVIEW
+from ...compute.integral import IntegralCompute
+from ...compute.quadrature import format_quadrature
 
-import traceback
 
-from .worker import BaseWorker
-
-
-class IntegralWorker(BaseWorker):
+class IntegralWorker(BaseWorker, IntegralCompute):
     def __init__(self, command: str, params: list, copy: int = None) -> None:
         super().__init__(command, params, copy)
 
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def prev_integ(
-        self,
-        input_expression: str,
-        input_variable: str,
-        input_lower: str,
-        input_upper: str,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if not input_expression:
-            return {"error": ["Enter an expression"]}
-        if not input_variable:
-            return {"error": ["Enter a variable"]}
-        if (input_lower and not input_upper) or (not input_lower and input_upper):
-            return {"error": ["Enter both upper and lower bound"]}
-
-        if input_lower:
-            try:
-                self.exact_ans = Integral(
-                    parse_expr(input_expression),
-                    (parse_expr(input_variable), input_lower, input_upper),
-                )
-            except Exception:
-                return {"error": [f"Error: \n{traceback.format_exc()}"]}
-        else:
-            try:
-                self.exact_ans = Integral(
-                    parse_expr(input_expression), parse_expr(input_variable)
-                )
-            except Exception:
-                return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-        self.latex_answer = str(latex(self.exact_ans))
-        if output_type == 1:
-            self.exact_ans = str(pretty(self.exact_ans))
-        elif output_type == 2:
-            self.exact_ans = str(latex(self.exact_ans))
-        else:
-            self.exact_ans = str(self.exact_ans)
-
-        return {"integ": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def calc_integ(
-        self,
-        input_expression: str,
-        input_variable: str,
-        input_lower: str,
-        input_upper: str,
-        approx_integ: bool,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-        use_scientific: ty.Union[int, None],
-        accuracy: int,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if use_scientific:
-            if use_scientific > accuracy:
-                accuracy = use_scientific
-
-        if not input_expression:
-            return {"error": ["Enter an expression"]}
-        if not input_variable:
-            return {"error": ["Enter a variable"]}
-        if (input_lower and not input_upper) or (not input_lower and input_upper):
-            return {"error": ["Enter both upper and lower bound"]}
-
-        if input_lower:
-            try:
-                self.exact_ans = Integral(
-                    parse_expr(input_expression),
-                    (parse_expr(input_variable), input_lower, input_upper),
-                )
-            except Exception:
-                return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-            if approx_integ:
-                self.exact_ans = N(self.exact_ans, accuracy)
-            else:
-                try:
-                    self.exact_ans = self.exact_ans.doit()
-                except Exception:
-                    return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-            self.latex_answer = str(latex(self.exact_ans))
-
-            try:
-                if use_scientific:
-                    self.approx_ans = self.to_scientific_notation(
-                        str(N(self.exact_ans, accuracy)), use_scientific
-                    )
-                else:
-                    self.approx_ans = str(simplify(N(self.exact_ans, accuracy)))
-            except Exception:
-                self.approx_ans = 0
-                return {"error": [f"Error: \n{traceback.format_exc()}"]}
-            else:
-                if use_scientific:
-                    self.approx_ans = self.to_scientific_notation(
-                        str(N(self.exact_ans, accuracy)), use_scientific
-                    )
-                else:
-                    self.approx_ans = str(N(self.exact_ans, accuracy))
-
-        else:
-            try:
-                self.exact_ans = integrate(
-                    parse_expr(input_expression), parse_expr(input_variable)
-                )
-            except Exception:
-                return {"error": [f"Error: \n{traceback.format_exc()}"]}
-            self.latex_answer = str(latex(self.exact_ans))
-
-        unable_to_integrate = issubclass(type(self.exact_ans), Integral)
-
-        if output_type == 1:
-            self.exact_ans = str(pretty(self.exact_ans))
-        elif output_type == 2:
-            self.exact_ans = str(latex(self.exact_ans))
-        else:
-            self.exact_ans = str(self.exact_ans)
-
-        if unable_to_integrate:
-            self.exact_ans = "Unable to evaluate integral:\n" + self.exact_ans
-
-        return {"integ": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
 
 class IntegralTab(QWidget):
 
@@ -184,7 +42,8 @@ class IntegralTab(QWidget):
     def __init__(self, main_window: "CASpyGUI") -> None:
         super().__init__()
         self.main_window = main_window
-        loadUi(self.main_window.get_resource_path("qt_assets/tabs/integral.ui"), self)
+        self.workers = TabWorkers()
+        load_ui(self.main_window.get_resource_path("qt_assets/tabs/integral.ui"), self)
         self.eout = self.IntegOut
         self.aout = self.IntegApprox
 
@@ -194,6 +53,12 @@ class IntegralTab(QWidget):
             self.approx_integ = False
         self.main_window.add_to_save_settings({"approx_integ": self.approx_integ})
 
+        if "quadrature" in list(self.main_window.settings_data.keys()):
+            self.quadrature = self.main_window.settings_data["quadrature"]
+        else:
+            self.quadrature = "sympy"
+        self.main_window.add_to_save_settings({"quadrature": self.quadrature})
+
         # Shortcuts
         cshortcut = QShortcut(QKeySequence("Ctrl+Return"), self)
         cshortcut.activated.connect(self.calc_integ)
@@ -203,17 +68,50 @@ class IntegralTab(QWidget):
         self.init_integral_menu()
         self.init_bindings()
 
+        # Preview while typing, see Settings -> Live Preview
+        self.live_preview = LivePreview(
+            self.main_window,
+            self.prev_integ,
+            [self.IntegExp, self.IntegVar, self.IntegLower, self.IntegUpper],
+            [self.IntegOut, self.IntegApprox],
+        )
+
     def init_integral_menu(self) -> None:
         self.menuInteg = self.main_window.menubar.addMenu("Integral")
         self.menuInteg.setToolTipsVisible(True)
         approx_integ = QAction("Approximate integral", self, checkable=True)
         approx_integ.setToolTip(
-            "Approximates integral by N(). Note: this overrides the normal calculation"
+            "Approximates integral numerically. Note: this overrides the normal calculation"
         )
         approx_integ.setChecked(self.approx_integ)
         self.menuInteg.addAction(approx_integ)
         approx_integ.triggered.connect(self.toggle_approx_integ)
 
+        menu_quadrature = self.menuInteg.addMenu("Quadrature method")
+        menu_quadrature.setToolTipsVisible(True)
+        self.quadrature_action_group = QActionGroup(menu_quadrature)
+        for method, text, tooltip in [
+            ("sympy", "SymPy N()", "Approximates the integral by N() at arbitrary precision"),
+            (
+                "gauss-kronrod",
+                "Gauss-Kronrod",
+                "Adaptive Gauss-Kronrod quadrature with an error estimate",
+            ),
+            (
+                "tanh-sinh",
+                "Tanh-sinh",
+                "Tanh-sinh quadrature with an error estimate, suited to singular bounds",
+            ),
+        ]:
+            action = QAction(text, menu_quadrature, checkable=True)
+            action.setToolTip(tooltip)
+            action.setData(method)
+            action.setChecked(method == self.quadrature)
+            menu_quadrature.addAction(action)
+            self.quadrature_action_group.addAction(action)
+        self.quadrature_action_group.setExclusive(True)
+        self.quadrature_action_group.triggered.connect(self.set_quadrature)
+
     def toggle_approx_integ(self, state: bool) -> None:
         if state:
             self.approx_integ = True
@@ -222,6 +120,10 @@ class IntegralTab(QWidget):
 
         self.main_window.update_save_settings({"approx_integ": self.approx_integ})
 
+    def set_quadrature(self, action: QAction) -> None:
+        self.quadrature = action.data()
+        self.main_window.update_save_settings({"quadrature": self.quadrature})
+
     def init_bindings(self) -> None:
         self.IntegPrev.clicked.connect(self.prev_integ)
         self.IntegCalc.clicked.connect(self.calc_integ)
@@ -237,7 +139,8 @@ class IntegralTab(QWidget):
         textbrowser.setTextCursor(cursor)
 
     def stop_thread(self) -> None:
-        pass
+        # Cancels the calculations of the tab
+        self.workers.cancel()
 
     def update_ui(self, input_dict: ty.Dict[str, ty.List[str]]) -> None:
         self.IntegOut.viewport().setProperty("cursor", QCursor(Qt.ArrowCursor))
@@ -253,7 +156,13 @@ class IntegralTab(QWidget):
             self.main_window.approx_ans = input_dict[first_key][1]
 
             self.IntegOut.setText(self.main_window.exact_ans)
-            self.IntegApprox.setText(str(self.main_window.approx_ans))
+            if "quadrature" in input_dict:
+                self.IntegApprox.setText(
+                    f"{self.main_window.approx_ans}\n\n"
+                    + format_quadrature(input_dict["quadrature"])
+                )
+            else:
+                self.IntegApprox.setText(str(self.main_window.approx_ans))
 
     def prev_integ(self) -> None:
         self.IntegOut.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
@@ -271,15 +180,20 @@ class IntegralTab(QWidget):
                 self.main_window.line_wrap,
             ],
         )
-        worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        worker.signals.output.connect(self.live_preview.output(self.update_ui))
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_PREVIEW)
 
     def calc_integ(self) -> None:
         self.IntegOut.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
         self.IntegApprox.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
 
+        # True approximates with N()
+        approx_integ = self.approx_integ
+        if approx_integ and self.quadrature != "sympy":
+            approx_integ = self.quadrature
+
         worker = IntegralWorker(
             "calc_integ",
             [
@@ -287,7 +201,7 @@ class IntegralTab(QWidget):
                 self.IntegVar.text(),
                 self.IntegLower.text(),
                 self.IntegUpper.text(),
-                self.approx_integ,
+                approx_integ,
                 self.main_window.output_type,
                 self.main_window.use_unicode,
                 self.main_window.line_wrap,
@@ -296,6 +210,6 @@ class IntegralTab(QWidget):
             ],
         )
         worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_CALC)
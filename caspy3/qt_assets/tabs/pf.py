@@ -16,58 +16,22 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PyQt5.QtCore import pyqtSlot, QRegExp, Qt
+from PyQt5.QtCore import QRegExp, Qt
 from PyQt5.QtWidgets import QShortcut, QWidget
 from PyQt5.QtGui import QCursor, QKeySequence, QRegExpValidator
-from PyQt5.uic import loadUi
+from ..ui import load_ui
 
 import typing as ty
 
-from sympy import *
-from sympy.parsing.sympy_parser import parse_expr
+from .worker import BaseWorker, TabWorkers
+from ..scheduler import LANE_CALC
+from ...compute.pf import PfCompute
 
-import traceback
 
-from .worker import BaseWorker
-
-
-class PfWorker(BaseWorker):
+class PfWorker(BaseWorker, PfCompute):
     def __init__(self, command: str, params: list, copy: int = None) -> None:
         super().__init__(command, params, copy)
 
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def calc_pf(self, input_number: int) -> ty.Dict[str, ty.List[str]]:
-        self.approx_ans = ""
-        self.latex_answer = ""
-
-        try:
-            input_number = int(input_number)
-        except:
-            return {"error": [f"Error: {input_number} is not an integer."]}
-
-        if input_number < 2:
-            return {
-                "error": [
-                    f"Error: {input_number} is lower than 2, only number 2 and above is accepted."
-                ]
-            }
-
-        try:
-            self.exact_ans = factorint(input_number)
-        except Exception:
-            return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-        for base in self.exact_ans:
-            self.latex_answer += f"({base}**{self.exact_ans[base]})*"
-            self.approx_ans += f"({base}**{self.exact_ans[base]})*"
-
-        self.latex_answer = latex(parse_expr(self.latex_answer[0:-1], evaluate=False))
-        return {
-            "pf": [self.exact_ans, self.approx_ans[0:-1]],
-            "latex": self.latex_answer,
-        }
-
 
 class PfTab(QWidget):
     display_name = "Prime Factors"
@@ -75,7 +39,8 @@ class PfTab(QWidget):
     def __init__(self, main_window: "CASpyGUI") -> None:
         super().__init__()
         self.main_window = main_window
-        loadUi(self.main_window.get_resource_path("qt_assets/tabs/pf.ui"), self)
+        self.workers = TabWorkers()
+        load_ui(self.main_window.get_resource_path("qt_assets/tabs/pf.ui"), self)
         self.eout = self.PfOut
         self.aout = self.PfApprox
 
@@ -106,7 +71,8 @@ class PfTab(QWidget):
         textbrowser.setTextCursor(cursor)
 
     def stop_thread(self) -> None:
-        pass
+        # Cancels the calculations of the tab
+        self.workers.cancel()
 
     def update_ui(self, input_dict: ty.Dict[str, ty.List[str]]) -> None:
         self.PfOut.viewport().setProperty("cursor", QCursor(Qt.ArrowCursor))
@@ -131,6 +97,6 @@ class PfTab(QWidget):
         number = int(self.PfInput.text())
         worker = PfWorker("calc_pf", [number])
         worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_CALC)
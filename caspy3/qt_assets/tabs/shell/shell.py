@@ -11,6 +11,7 @@ from .syntax_pars import PythonHighlighter
 from .start_code_dialog import StartCodeDialog
 
 from ..worker import BaseWorker
+from ...scheduler import LANE_SHELL
 
 # -------------- TESTING --------------
 from qtconsole.rich_jupyter_widget import RichJupyterWidget
@@ -42,6 +43,13 @@ class ShellWorker(BaseWorker):
     ) -> None:
         super().__init__(input_command, input_params, copy)
 
+    # Every line is executed, even if the same line is still running or waiting
+    def job_key(self) -> None:
+        return None
+
+    def job_source(self) -> None:
+        return None
+
     @BaseWorker.catch_error
     @pyqtSlot()
     def execute_code(
@@ -165,7 +173,7 @@ class Console(TextEdit):
             worker.signals.output.connect(self.update_ui)
             worker.signals.finished.connect(self.stop_thread)
 
-            self.main_window.threadpool.start(worker)
+            self.main_window.scheduler.start(worker, LANE_SHELL)
 
     def update_namespace(self, namespace: dict) -> None:
         self.namespace.update(namespace)
@@ -300,7 +308,8 @@ class ShellTab(QWidget):
         # self.shell_layout.addWidget(self.consoleIn)
         # self.shell_layout.addWidget(self.ShellRun)
         # self.setLayout(self.shell_layout)
-        self.jupyter_widget = make_jupyter_widget_with_kernel()
+        with self.main_window.profile("start jupyter kernel"):
+            self.jupyter_widget = make_jupyter_widget_with_kernel()
         self.shell_layout = QVBoxLayout()
         self.shell_layout.addWidget(self.jupyter_widget)
         self.setLayout(self.shell_layout)
@@ -439,4 +448,4 @@ class ShellTab(QWidget):
             worker.signals.output.connect(self.update_ui)
             worker.signals.finished.connect(self.stop_thread)
 
-            self.main_window.threadpool.start(worker)
+            self.main_window.scheduler.start(worker, LANE_SHELL)
@@ -16,83 +16,22 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PyQt5.QtCore import pyqtSlot, Qt
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QShortcut, QWidget
 from PyQt5.QtGui import QCursor, QKeySequence
-from PyQt5.uic import loadUi
+from ..ui import load_ui
 
 import typing as ty
 
-from sympy import *
-from sympy.parsing.sympy_parser import parse_expr
+from .worker import BaseWorker, TabWorkers
+from ..scheduler import LANE_CALC, LANE_PREVIEW
+from ...compute.simplify import SimpCompute
 
-import traceback
 
-from .worker import BaseWorker
-
-
-class SimpWorker(BaseWorker):
+class SimpWorker(BaseWorker, SimpCompute):
     def __init__(self, command: str, params: list, copy: int = None) -> None:
         super().__init__(command, params, copy)
 
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def prev_simp_exp(
-        self, expression: str, output_type: int, use_unicode: bool, line_wrap: bool
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if not expression:
-            return {"error": ["Enter an expression"]}
-
-        if output_type == 1:
-            try:
-                self.exact_ans = str(pretty(parse_expr(expression, evaluate=False)))
-            except Exception:
-                return {"error": [f"Error: \n{traceback.format_exc()}"]}
-        elif output_type == 2:
-            try:
-                self.exact_ans = str(latex(parse_expr(expression, evaluate=False)))
-            except Exception:
-                return {"error": [f"Error: \n{traceback.format_exc()}"]}
-            self.latex_answer = str(latex(self.exact_ans))
-        else:
-            self.exact_ans = str(expression)
-        self.latex_answer = str(latex(parse_expr(expression, evaluate=False)))
-
-        return {"simp": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def simp_exp(
-        self, expression: str, output_type: int, use_unicode: bool, line_wrap: bool
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if not expression:
-            return {"error": ["Enter an expression"]}
-
-        try:
-            self.exact_ans = simplify(expression)
-        except Exception:
-            return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-        self.latex_answer = str(latex(self.exact_ans))
-        if output_type == 1:
-            self.exact_ans = str(pretty(self.exact_ans))
-        elif output_type == 2:
-            self.exact_ans = str(latex(self.exact_ans))
-        else:
-            self.exact_ans = str(self.exact_ans)
-
-        return {"simp": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
 
 class SimplifyTab(QWidget):
 
@@ -101,7 +40,8 @@ class SimplifyTab(QWidget):
     def __init__(self, main_window: "CASpyGUI") -> None:
         super().__init__()
         self.main_window = main_window
-        loadUi(self.main_window.get_resource_path("qt_assets/tabs/simplify.ui"), self)
+        self.workers = TabWorkers()
+        load_ui(self.main_window.get_resource_path("qt_assets/tabs/simplify.ui"), self)
         self.eout = self.SimpOut
         self.aout = None
 
@@ -126,7 +66,8 @@ class SimplifyTab(QWidget):
         textbrowser.setTextCursor(cursor)
 
     def stop_thread(self) -> None:
-        pass
+        # Cancels the calculations of the tab
+        self.workers.cancel()
 
     def update_ui(self, input_dict: ty.Dict[str, ty.List[str]]) -> None:
         self.SimpOut.viewport().setProperty("cursor", QCursor(Qt.ArrowCursor))
@@ -155,9 +96,9 @@ class SimplifyTab(QWidget):
             ],
         )
         worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_PREVIEW)
 
     def simp_exp(self) -> None:
         self.SimpOut.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
@@ -172,6 +113,6 @@ class SimplifyTab(QWidget):
             ],
         )
         worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_CALC)
@@ -16,126 +16,23 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from PyQt5.QtCore import pyqtSlot, Qt
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QShortcut, QWidget
 from PyQt5.QtGui import QCursor, QKeySequence
-from PyQt5.uic import loadUi
+from ..ui import load_ui
 
 import typing as ty
 
-from sympy import *
-from sympy.parsing.sympy_parser import parse_expr
+from .worker import BaseWorker, TabWorkers
+from ..live_preview import LivePreview
+from ..scheduler import LANE_CALC, LANE_PREVIEW
+from ...compute.summation import SummationCompute
 
-import traceback
 
-from .worker import BaseWorker
-
-
-class SummationWorker(BaseWorker):
+class SummationWorker(BaseWorker, SummationCompute):
     def __init__(self, command: str, params: list, copy: int = None) -> None:
         super().__init__(command, params, copy)
 
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def prev_sum(
-        self,
-        input_expression: str,
-        input_variable: str,
-        sum_start: str,
-        sum_end: str,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if not input_expression:
-            return {"error": ["Enter an expression"]}
-        if not input_variable:
-            return {"error": ["Enter a variable"]}
-        if (sum_start and not sum_end) or (not sum_start and sum_end):
-            return {"error": ["Enter both start and end"]}
-
-        try:
-            self.exact_ans = Sum(
-                parse_expr(input_expression),
-                (parse_expr(input_variable), sum_start, sum_end),
-            )
-        except Exception:
-            return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-        self.latex_answer = str(latex(self.exact_ans))
-        if output_type == 1:
-            self.exact_ans = str(pretty(self.exact_ans))
-        elif output_type == 2:
-            self.exact_ans = str(latex(self.exact_ans))
-        else:
-            self.exact_ans = str(self.exact_ans)
-
-        return {"sum": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
-    @BaseWorker.catch_error
-    @pyqtSlot()
-    def calc_sum(
-        self,
-        input_expression: str,
-        input_variable: str,
-        sum_start: str,
-        sum_end: str,
-        output_type: int,
-        use_unicode: bool,
-        line_wrap: bool,
-        use_scientific: ty.Union[int, None],
-        accuracy: int,
-    ) -> ty.Dict[str, ty.List[str]]:
-        init_printing(use_unicode=use_unicode, wrap_line=line_wrap)
-        self.approx_ans = 0
-        self.exact_ans = ""
-        self.latex_answer = ""
-
-        if use_scientific:
-            if use_scientific > accuracy:
-                accuracy = use_scientific
-
-        if not input_expression:
-            return {"error": ["Enter an expression"]}
-        if not input_variable:
-            return {"error": ["Enter a variable"]}
-        if (sum_start and not sum_end) or (not sum_start and sum_end):
-            return {"error": ["Enter both start and end"]}
-
-        try:
-            self.exact_ans = Sum(
-                parse_expr(input_expression),
-                (parse_expr(input_variable), sum_start, sum_end),
-            ).doit()
-        except Exception:
-            return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-        try:
-            if use_scientific:
-                self.approx_ans = self.to_scientific_notation(
-                    str(N(self.exact_ans, accuracy)), use_scientific
-                )
-            else:
-                self.approx_ans = str(simplify(N(self.exact_ans, accuracy)))
-        except Exception:
-            self.approx_ans = 0
-            return {"error": [f"Error: \n{traceback.format_exc()}"]}
-
-        self.latex_answer = str(latex(self.exact_ans))
-        if output_type == 1:
-            self.exact_ans = str(pretty(self.exact_ans))
-        elif output_type == 2:
-            self.exact_ans = str(latex(self.exact_ans))
-        else:
-            self.exact_ans = str(self.exact_ans)
-
-        return {"sum": [self.exact_ans, self.approx_ans], "latex": self.latex_answer}
-
 
 class SummationTab(QWidget):
     display_name = "Summation"
@@ -143,7 +40,8 @@ class SummationTab(QWidget):
     def __init__(self, main_window: "CASpyGUI") -> None:
         super().__init__()
         self.main_window = main_window
-        loadUi(self.main_window.get_resource_path("qt_assets/tabs/summation.ui"), self)
+        self.workers = TabWorkers()
+        load_ui(self.main_window.get_resource_path("qt_assets/tabs/summation.ui"), self)
         self.eout = self.SumOut
         self.aout = self.SumApprox
 
@@ -155,6 +53,14 @@ class SummationTab(QWidget):
 
         self.init_bindings()
 
+        # Preview while typing, see Settings -> Live Preview
+        self.live_preview = LivePreview(
+            self.main_window,
+            self.prev_sum,
+            [self.SumExp, self.SumVar, self.SumStart, self.SumEnd],
+            [self.SumOut, self.SumApprox],
+        )
+
     def init_bindings(self) -> None:
         self.SumPrev.clicked.connect(self.prev_sum)
         self.SumCalc.clicked.connect(self.calc_sum)
@@ -170,7 +76,8 @@ class SummationTab(QWidget):
         textbrowser.setTextCursor(cursor)
 
     def stop_thread(self) -> None:
-        pass
+        # Cancels the calculations of the tab
+        self.workers.cancel()
 
     def update_ui(self, input_dict: ty.Dict[str, ty.List[str]]) -> None:
         self.SumOut.viewport().setProperty("cursor", QCursor(Qt.ArrowCursor))
@@ -204,10 +111,10 @@ class SummationTab(QWidget):
                 self.main_window.line_wrap,
             ],
         )
-        worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        worker.signals.output.connect(self.live_preview.output(self.update_ui))
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_PREVIEW)
 
     def calc_sum(self) -> None:
         self.SumOut.viewport().setProperty("cursor", QCursor(Qt.WaitCursor))
@@ -228,6 +135,6 @@ class SummationTab(QWidget):
             ],
         )
         worker.signals.output.connect(self.update_ui)
-        worker.signals.finished.connect(self.stop_thread)
+        self.workers.add(worker)
 
-        self.main_window.threadpool.start(worker)
+        self.main_window.scheduler.start(worker, LANE_CALC)
@@ -18,7 +18,7 @@
 
 from PyQt5.QtCore import QUrl
 from PyQt5.QtWidgets import QAction, QActionGroup, QDialog, QWidget
-from PyQt5.uic import loadUi
+from ..ui import load_ui
 
 from PyQt5.QtWebEngineWidgets import QWebEnginePage
 
@@ -44,7 +44,7 @@ class WebTab(QWidget):
     def __init__(self, main_window: "CASpyGUI") -> None:
         super().__init__()
         self.main_window = main_window
-        loadUi(self.main_window.get_resource_path("qt_assets/tabs/web.ui"), self)
+        load_ui(self.main_window.get_resource_path("qt_assets/tabs/web.ui"), self)
         self.eout = None
         self.aout = None
 
@@ -0,0 +1,186 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Builds the .ui files of qt_assets.
+
+'caspy compile-ui' generates a Python module with the Ui class of every .ui file in qt_assets/compiled.
+load_ui() uses the compiled class when it exists and is newer than the .ui file, otherwise it falls back
+to parsing the XML with PyQt5.uic.loadUi. Setting the environment variable CASPY_LOAD_UI always uses loadUi.
+"""
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.uic import compileUi, loadUi
+
+import importlib
+import os
+import time
+import typing as ty
+import xml.etree.ElementTree as ElementTree
+
+from ..startup import get_startup_timer
+
+QT_ASSETS_DIR = os.path.dirname(os.path.abspath(__file__))
+COMPILED_DIR = os.path.join(QT_ASSETS_DIR, "compiled")
+
+
+def compiled_module_name(uifile: str) -> str:
+    """
+    Name of the module generated from a .ui file, for example 'ui_tabs_derivative' for tabs/derivative.ui
+
+    :param uifile: str
+        Path to the .ui file
+    :return: str
+        Name of the module in caspy3.qt_assets.compiled
+    """
+    relative_path = os.path.relpath(os.path.abspath(uifile), QT_ASSETS_DIR)
+    return "ui_" + os.path.splitext(relative_path)[0].replace(os.sep, "_").replace("/", "_")
+
+
+def find_ui_files() -> ty.List[str]:
+    """Returns the path of every .ui file in qt_assets"""
+    ui_files = []
+    for root, _, files in os.walk(QT_ASSETS_DIR):
+        for file in files:
+            if file.endswith(".ui"):
+                ui_files.append(os.path.join(root, file))
+    return sorted(ui_files)
+
+
+def compiled_ui_class(uifile: str) -> ty.Union[type, None]:
+    """
+    Returns the compiled Ui class of a .ui file or None if it hasn't been compiled or is out of date
+
+    :param uifile: str
+        Path to the .ui file
+    """
+    if os.environ.get("CASPY_LOAD_UI"):
+        return None
+
+    module_name = compiled_module_name(uifile)
+    module_path = os.path.join(COMPILED_DIR, module_name + ".py")
+    try:
+        if os.path.getmtime(module_path) < os.path.getmtime(uifile):
+            return None
+    except OSError:
+        return None
+
+    module = importlib.import_module(f"{__package__}.compiled.{module_name}")
+    for name, value in vars(module).items():
+        if name.startswith("Ui_") and isinstance(value, type):
+            return value
+    return None
+
+
+def load_ui(uifile: str, widget: QWidget) -> None:
+    """
+    Builds the ui of a .ui file on widget, the same way as PyQt5.uic.loadUi(uifile, widget).
+    Every named object of the ui becomes an attribute of widget.
+
+    :param uifile: str
+        Path to the .ui file
+    :param widget: QWidget
+        Widget to build the ui on
+    """
+    startup_timer = get_startup_timer()
+    if startup_timer and not startup_timer.finished:
+        with startup_timer.measure(f"load {os.path.basename(uifile)}"):
+            _load_ui(uifile, widget)
+    else:
+        _load_ui(uifile, widget)
+
+
+def _load_ui(uifile: str, widget: QWidget) -> None:
+    ui_class = compiled_ui_class(uifile)
+    if ui_class is None:
+        loadUi(uifile, widget)
+        return
+
+    ui = ui_class()
+    ui.setupUi(widget)
+    for name, value in vars(ui).items():
+        setattr(widget, name, value)
+
+
+def compile_all(output_dir: str = COMPILED_DIR) -> ty.List[str]:
+    """
+    Compiles every .ui file in qt_assets
+
+    :param output_dir: str
+        Directory of the generated modules
+    :return: list
+        Paths of the generated modules
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    init_file = os.path.join(output_dir, "__init__.py")
+    if not os.path.exists(init_file):
+        open(init_file, "w").close()
+
+    generated = []
+    for uifile in find_ui_files():
+        module_path = os.path.join(output_dir, compiled_module_name(uifile) + ".py")
+        with open(module_path, "w", encoding="utf8") as py_f:
+            compileUi(uifile, py_f)
+        generated.append(module_path)
+    return generated
+
+
+def benchmark(repeat: int = 10) -> ty.List[ty.Dict[str, ty.Any]]:
+    """
+    Builds every .ui file with loadUi and with its compiled class and measures both.
+    A QApplication has to exist. .ui files that can't be built, for example because
+    PyQtWebEngine is missing, are reported with an error.
+
+    :param repeat: int
+        Number of times each .ui file is built with each method
+    :return: list
+        One dict per .ui file with the first and the mean build time of each method in ms
+    """
+    from PyQt5 import QtWidgets
+
+    results = []
+    for uifile in find_ui_files():
+        top_class = ElementTree.parse(uifile).getroot().find("widget").get("class")
+        base_class = getattr(QtWidgets, top_class, QWidget)
+        result = {"file": os.path.relpath(uifile, QT_ASSETS_DIR)}
+
+        def build(method: ty.Callable[[str, QWidget], None]) -> ty.Tuple[float, float]:
+            times = []
+            for _ in range(repeat):
+                widget = base_class()
+                start = time.perf_counter()
+                method(uifile, widget)
+                times.append((time.perf_counter() - start) * 1000)
+                widget.deleteLater()
+            return times[0], sum(times) / len(times)
+
+        def build_compiled(path: str, widget: QWidget) -> None:
+            # The first call includes importing the generated module
+            ui = compiled_ui_class(path)()
+            ui.setupUi(widget)
+
+        try:
+            compiled = os.path.exists(
+                os.path.join(COMPILED_DIR, compiled_module_name(uifile) + ".py")
+            )
+            result["loadUi"] = build(loadUi)
+            result["compiled"] = build(build_compiled) if compiled else None
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        results.append(result)
+    return results
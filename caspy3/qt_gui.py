@@ -16,12 +16,28 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from .qt_assets.main import launch_app
+def main(timing: bool = False) -> None:
+    """
+    Starts the GUI
 
-
-def main() -> None:
+    :param timing: bool
+        Print how long each phase of the startup took
+    """
     import sys
 
+    from .startup import get_startup_timer, start_profiling
+
+    startup_timer = get_startup_timer()
+    if timing and not startup_timer:
+        startup_timer = start_profiling()
+
+    if startup_timer:
+        # The imports of heavy dependencies are nested under this phase by the import hook
+        with startup_timer.measure("import caspy3.qt_assets.main"):
+            from .qt_assets.main import launch_app
+    else:
+        from .qt_assets.main import launch_app
+
     sys._excepthook = sys.excepthook
 
     def exception_hook(exctype, value, traceback):
@@ -30,7 +46,7 @@ def main() -> None:
         sys.exit(1)
 
     sys.excepthook = exception_hook
-    launch_app()
+    launch_app(startup_timer)
 
 
 if __name__ == "__main__":
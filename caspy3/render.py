@@ -0,0 +1,161 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Renders LaTeX in a pool of worker processes, used by the Formulas tab of the GUI.
+
+matplotlib holds the GIL while rendering and a figure can't be shared between threads, so the
+formulas of a branch are distributed over several processes. Every worker process has a figure
+and an Agg canvas of its own and returns the raw RGBA buffer, the GUI turns it into a QImage.
+Neither PyQt5 nor SymPy is imported here, a worker only imports matplotlib.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import multiprocessing
+import os
+import threading
+import typing as ty
+
+# Upper bound of the number of worker processes
+MAX_RENDER_WORKERS = 4
+
+# Figure of the worker process, created by the first job
+_figure = None
+
+
+def render_figure(
+    fig: "matplotlib.figure.Figure", mathTex: str, fs: int, color: str
+) -> ty.Tuple[bytes, int, int]:
+    """
+    Renders LaTeX into a figure that is resized to fit the text
+
+    :param fig: Figure
+        Figure to render into, its DPI is kept
+    :param mathTex: str
+        LaTeX surrounded by $
+    :param fs: int
+        Font size
+    :param color: str
+        Color of the text
+    :return: tuple
+        RGBA buffer, width and height
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig.clf()
+    fig.patch.set_facecolor("none")
+    fig.set_canvas(FigureCanvasAgg(fig))
+    renderer = fig.canvas.get_renderer()
+
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.axis("off")
+    ax.patch.set_facecolor("none")
+    t = ax.text(0, 0, mathTex, ha="left", va="bottom", fontsize=fs, color=color)
+
+    fwidth, fheight = fig.get_size_inches()
+    fig_bbox = fig.get_window_extent(renderer)
+
+    text_bbox = t.get_window_extent(renderer)
+
+    tight_fwidth = text_bbox.width * fwidth / fig_bbox.width
+    tight_fheight = text_bbox.height * fheight / fig_bbox.height
+
+    fig.set_size_inches(tight_fwidth, tight_fheight)
+
+    buf, size = fig.canvas.print_to_buffer()
+    return bytes(buf), size[0], size[1]
+
+
+def render_rgba(mathTex: str, fs: int, color: str, dpi: float) -> ty.Tuple[bytes, int, int]:
+    """
+    Renders LaTeX with the figure of the worker process, see render_figure()
+
+    :param dpi: float
+        DPI of the figure
+    """
+    global _figure
+    if _figure is None:
+        import matplotlib
+        from matplotlib.figure import Figure
+
+        matplotlib.rcParams["mathtext.fontset"] = "cm"
+        _figure = Figure()
+
+    _figure.set_dpi(dpi)
+    return render_figure(_figure, mathTex, fs, color)
+
+
+class RenderPool:
+    """
+    Pool of worker processes rendering LaTeX. The processes are started by the first jobs and
+    kept until shutdown().
+
+    :param max_workers: int
+        Number of worker processes, defaults to the number of CPUs up to MAX_RENDER_WORKERS
+    """
+
+    def __init__(self, max_workers: int = None) -> None:
+        self.max_workers = max_workers or min(os.cpu_count() or 1, MAX_RENDER_WORKERS)
+        self._executor = ProcessPoolExecutor(
+            self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def submit(self, mathTex: str, fs: int, color: str, dpi: float) -> Future:
+        """
+        Schedules LaTeX to be rendered
+
+        :return: Future
+            Future that resolves to the return value of render_rgba()
+        """
+        return self._executor.submit(render_rgba, mathTex, fs, color, dpi)
+
+    def warm_up(self) -> None:
+        """
+        Starts every worker process in the background, a process imports matplotlib and
+        renders its first formula before it's used
+        """
+        for _ in range(self.max_workers):
+            self._executor.submit(render_rgba, "$x$", 10, "#000000", 100)
+
+    def shutdown(self) -> None:
+        """Stops the worker processes, jobs that haven't started are cancelled"""
+        try:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        except TypeError:  # Python 3.8
+            self._executor.shutdown(wait=False)
+
+
+_pool: ty.Union[RenderPool, None] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    """Returns the shared pool, it's created by the first call"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool()
+        return _pool
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
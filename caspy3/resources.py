@@ -0,0 +1,90 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Access to the files shipped with the package, for example data/settings.json or qt_assets/main.ui.
+
+Based on importlib.resources instead of pkg_resources, importing pkg_resources scans every installed
+distribution which alone takes a few hundred milliseconds. Paths are memoized and every JSON file is
+read at most once per process, save_json() updates the stored copy when a file is written.
+"""
+
+import copy
+import functools
+import json
+import os
+import threading
+import typing as ty
+
+try:
+    from importlib.resources import files as _files
+except ImportError:  # Python 3.8
+    _files = None
+
+_json_data: ty.Dict[str, ty.Any] = {}
+_json_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def resource_path(relative_path: str) -> str:
+    """
+    Path of a file shipped with caspy3
+
+    :param relative_path: str
+        Path relative to the caspy3 package, for example 'data/settings.json'
+    :return: str
+        Absolute path to the file
+    """
+    if _files is not None:
+        return os.path.join(str(_files(__package__)), *relative_path.split("/"))
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), *relative_path.split("/"))
+
+
+def load_json(relative_path: str) -> ty.Any:
+    """
+    Returns the content of a JSON file shipped with caspy3. The file is only read the first time,
+    every call returns a new copy that can be modified by the caller.
+
+    :param relative_path: str
+        Path relative to the caspy3 package, for example 'data/settings.json'
+    :return: Any
+        The decoded JSON data
+    """
+    with _json_lock:
+        if relative_path not in _json_data:
+            with open(resource_path(relative_path), "r", encoding="utf8") as json_f:
+                _json_data[relative_path] = json.loads(json_f.read())
+        return copy.deepcopy(_json_data[relative_path])
+
+
+def save_json(relative_path: str, data: ty.Any, **kwargs: ty.Any) -> None:
+    """
+    Writes a JSON file shipped with caspy3 and replaces the copy returned by load_json()
+
+    :param relative_path: str
+        Path relative to the caspy3 package, for example 'data/settings.json'
+    :param data: Any
+        Data to write
+    :param kwargs: Any
+        Keyword arguments of json.dump(), the default is ensure_ascii=False and indent=4
+    """
+    kwargs.setdefault("ensure_ascii", False)
+    kwargs.setdefault("indent", 4)
+    with _json_lock:
+        with open(resource_path(relative_path), "w", encoding="utf-8") as json_f:
+            json.dump(data, json_f, **kwargs)
+        _json_data[relative_path] = copy.deepcopy(data)
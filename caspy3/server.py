@@ -0,0 +1,389 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+HTTP/JSON compute service used by 'caspy serve'.
+
+Requests are accepted concurrently by an asyncio front end and evaluated by a ProcessExecutor.
+Only the standard library is used. Every command is available as 'POST /<command>' with a JSON
+object as body, either {"params": [...]} with the parameters in order or the parameters by name:
+
+    POST /calc_deriv
+    {"input_expression": "x**x", "input_variable": "x", "input_order": 1, "input_point": "",
+     "output_type": 3, "use_unicode": false, "line_wrap": false, "use_scientific": null,
+     "accuracy": 10}
+
+The answer is the dict returned by the command. "timeout" in the body overrides the timeout of
+the server for one request and "representations", for example ["exact", "approx"], limits the
+representations of the answer that are rendered. Once every worker is busy and max_queue
+requests are waiting, new requests are rejected with 503 until the queue drains.
+
+    GET /health     Status of the server
+    GET /metrics    Request counters, queue depth and latencies
+    GET /commands   Every command and the names of its parameters
+"""
+
+from http import HTTPStatus
+
+import asyncio
+import inspect
+import json
+import os
+import signal
+import time
+import typing as ty
+
+from . import __version__
+
+# Commands exposed by the server
+SERVE_COMMANDS = [
+    "calc_deriv",
+    "calc_deriv_points",
+    "calc_integ",
+    "calc_limit",
+    "calc_sum",
+    "calc_normal_eq",
+    "calc_system_eq",
+    "calc_diff_eq",
+    "eval_exp",
+    "simp_exp",
+    "expand_exp",
+    "calc_pf",
+]
+
+# Upper bound of the size of a request body in bytes
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = None) -> None:
+        super().__init__(message or status.phrase)
+        self.status = status
+        self.message = message or status.phrase
+
+
+def command_parameters(command: str) -> ty.List[str]:
+    """
+    Names of the parameters of a command
+
+    :param command: str
+        Name of the command, for example 'calc_deriv'
+    :return: list
+        Names of the parameters in order
+    """
+    from .compute import COMMAND_CLASSES
+
+    signature = inspect.signature(getattr(COMMAND_CLASSES[command], command))
+    return [name for name in signature.parameters if name != "self"]
+
+
+class ComputeServer:
+    """
+    Local HTTP server evaluating commands in a pool of worker processes.
+
+    :param host: str
+        Address to listen on
+    :param port: int
+        Port to listen on, 0 picks a free port
+    :param workers: int
+        Number of worker processes, defaults to the number of CPUs
+    :param max_queue: int
+        Number of requests that may wait for a worker before new requests are rejected,
+        defaults to four times the number of workers
+    :param timeout: float
+        Default number of seconds a request may run, None for no limit
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: int = None,
+        max_queue: int = None,
+        timeout: float = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers * 4 if max_queue is None else max_queue
+        self.timeout = timeout
+        self.executor = None
+        self.parameters: ty.Dict[str, ty.List[str]] = {}
+        self.started = None
+
+        self.in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.commands: ty.Dict[str, ty.Dict[str, float]] = {
+            command: {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            for command in SERVE_COMMANDS
+        }
+        self._stopped = None
+
+    async def serve(self, ready: ty.Callable[["ComputeServer"], None] = None) -> None:
+        """
+        Runs the server until stop() is called or the process is terminated
+
+        :param ready: callable
+            Called once the server accepts connections
+        """
+        from .compute.pool import ProcessExecutor
+
+        self.parameters = {command: command_parameters(command) for command in SERVE_COMMANDS}
+        self.executor = ProcessExecutor(self.workers, self.timeout)
+        self._stopped = asyncio.Event()
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self.started = time.time()
+        if ready:
+            ready(self)
+
+        try:
+            async with server:
+                await self._stopped.wait()
+        finally:
+            self.executor.shutdown(wait=False)
+
+    def stop(self) -> None:
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answers requests of a connection until it's closed, HTTP/1.1 keep-alive is supported"""
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HTTPError as e:
+                    await self.write_response(writer, e.status, {"error": [e.message]}, False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                extra_headers = {}
+                try:
+                    status, answer = await self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, answer = e.status, {"error": [e.message]}
+                    if e.status == HTTPStatus.SERVICE_UNAVAILABLE:
+                        extra_headers["Retry-After"] = "1"
+
+                await self.write_response(writer, status, answer, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(
+        self, reader: asyncio.StreamReader
+    ) -> ty.Union[ty.Tuple[str, str, ty.Dict[str, str], bytes], None]:
+        """
+        Reads a request
+
+        :return: tuple or None
+            (method, path, headers, body), None if the connection was closed
+        """
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], headers, body
+
+    async def write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        answer: ty.Any,
+        keep_alive: bool,
+        extra_headers: ty.Dict[str, str] = None,
+    ) -> None:
+        body = json.dumps(answer, default=str).encode("utf8")
+        headers = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **(extra_headers or {}),
+        }
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> ty.Tuple[HTTPStatus, ty.Any]:
+        """
+        Routes a request
+
+        :return: tuple
+            HTTP status and the JSON answer
+        """
+        self.requests += 1
+        name = path.strip("/")
+
+        if name in ("health", "metrics", "commands"):
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            if name == "health":
+                return HTTPStatus.OK, self.health()
+            if name == "metrics":
+                return HTTPStatus.OK, self.metrics()
+            return HTTPStatus.OK, self.parameters
+
+        if name not in self.parameters:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown command '{name}'")
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "The body must be a JSON object")
+
+        return HTTPStatus.OK, await self.compute(name, data)
+
+    async def compute(self, command: str, data: ty.Dict[str, ty.Any]) -> ty.Dict[str, ty.Any]:
+        """
+        Evaluates a command in the pool
+
+        :param command: str
+            Name of the command
+        :param data: dict
+            Body of the request
+        :return: dict
+            Dict returned by the command
+        """
+        names = self.parameters[command]
+        if "params" in data:
+            params = data["params"]
+            if not isinstance(params, list) or len(params) != len(names):
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"'params' must be a list of {len(names)} parameters: {', '.join(names)}",
+                )
+        else:
+            missing = [name for name in names if name not in data]
+            if missing:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST, f"Missing parameters: {', '.join(missing)}"
+                )
+            params = [data[name] for name in names]
+
+        timeout = data.get("timeout")
+        if timeout is not None and (
+            isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+        ):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'timeout' must be a positive number")
+
+        representations = data.get("representations")
+        if representations is not None:
+            from .compute.result import REPRESENTATIONS
+
+            if not isinstance(representations, list) or not all(
+                name in REPRESENTATIONS for name in representations
+            ):
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"'representations' must be a list out of {', '.join(REPRESENTATIONS)}",
+                )
+
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many pending requests")
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        future = self.executor.submit(command, params, timeout, representations)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The request was cancelled, stop its job as well
+            self.executor.cancel(future)
+            raise
+        finally:
+            self.in_flight -= 1
+
+        elapsed = (time.perf_counter() - start) * 1000
+        stats = self.commands[command]
+        stats["count"] += 1
+        stats["total_ms"] += elapsed
+        stats["max_ms"] = max(stats["max_ms"], elapsed)
+        if "error" in result:
+            stats["errors"] += 1
+            self.errors += 1
+        return result
+
+    def health(self) -> ty.Dict[str, ty.Any]:
+        return {
+            "status": "ok",
+            "version": __version__,
+            "uptime": time.time() - self.started,
+        }
+
+    def metrics(self) -> ty.Dict[str, ty.Any]:
+        return {
+            "uptime": time.time() - self.started,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "commands": {
+                command: {
+                    **stats,
+                    "mean_ms": stats["total_ms"] / stats["count"] if stats["count"] else 0.0,
+                }
+                for command, stats in self.commands.items()
+            },
+        }
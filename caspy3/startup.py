@@ -0,0 +1,238 @@
+#
+#    CASPy - A program that provides both a GUI and a CLI to SymPy.
+#    Copyright (C) 2020 Folke Ishii
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Startup profiler used by 'caspy start --timing' and 'caspy --profile-startup'.
+Doesn't depend on Qt so that it can be used by the CLI entry point as well.
+
+While profiling, the first import of each heavy dependency is measured where it actually
+happens by an import hook, nested under the phase that triggered it.
+"""
+
+import builtins
+import contextlib
+import json
+import sys
+import threading
+import time
+import typing as ty
+
+# Top-level packages whose imports show up as phases of their own
+PROFILED_IMPORTS = ("PyQt5", "sympy", "matplotlib", "numpy", "mpmath")
+
+
+def peak_rss() -> ty.Union[float, None]:
+    """
+    Peak resident set size of the process in MiB, None if it can't be read on this platform
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+class StartupTimer:
+    """
+    Records a timestamped breakdown of the startup. Every phase stores when it started and ended
+    relative to the start of the timer, its duration and the peak RSS once it ended.
+
+    :param start: float
+        time.perf_counter() when the startup began, defaults to now
+    :param output: str
+        Path of a JSON file the report is written to by finish(), None prints the report instead
+    """
+
+    def __init__(self, start: float = None, output: str = None) -> None:
+        self.start = start if start is not None else time.perf_counter()
+        self.start_time = time.time() - (time.perf_counter() - self.start)
+        self.last = self.start
+        self.output = output
+        self.phases: ty.List[ty.Dict[str, ty.Any]] = []
+        self.finished = False
+        self._depth = 0
+        self._import = None
+        self._importing: ty.Set[str] = set()
+
+    def _add(self, phase: str, start: float, end: float) -> None:
+        self.phases.append(
+            {
+                "phase": phase,
+                "start_ms": (start - self.start) * 1000,
+                "end_ms": (end - self.start) * 1000,
+                "duration_ms": (end - start) * 1000,
+                "peak_rss_mb": peak_rss(),
+                "depth": self._depth,
+            }
+        )
+
+    def mark(self, phase: str) -> None:
+        """
+        Ends a phase that began when the previous phase ended
+
+        :param phase: str
+            Name of the phase
+        """
+        now = time.perf_counter()
+        self._add(phase, self.last, now)
+        self.last = now
+
+    @contextlib.contextmanager
+    def measure(self, phase: str) -> ty.Iterator[None]:
+        """Measures the body of the with statement as a phase of its own, phases can be nested"""
+        index = len(self.phases)
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            end = time.perf_counter()
+            self._add(phase, start, end)
+            # Nested phases are listed after the phase containing them
+            self.phases.insert(index, self.phases.pop())
+            self.last = end
+
+    def trace_imports(self, packages: ty.Iterable[str] = PROFILED_IMPORTS) -> None:
+        """
+        Measures imports of the packages made by the current thread until finish() is called.
+        Only the first import of a module is measured, the modules a package imports while it
+        is being imported are part of its phase.
+
+        :param packages: iterable
+            Names of top-level packages, for example 'sympy'
+        """
+        if self._import is not None:
+            return
+        packages = set(packages)
+        thread = threading.get_ident()
+        original_import = builtins.__import__
+
+        def profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+            package = name.partition(".")[0]
+            if (
+                level != 0
+                or package not in packages
+                or package in self._importing
+                or name in sys.modules
+                or threading.get_ident() != thread
+            ):
+                return original_import(name, globals, locals, fromlist, level)
+
+            self._importing.add(package)
+            try:
+                with self.measure(f"import {name}"):
+                    return original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._importing.discard(package)
+
+        self._import = original_import
+        builtins.__import__ = profiled_import
+
+    def stop_tracing_imports(self) -> None:
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def to_dict(self) -> ty.Dict[str, ty.Any]:
+        return {
+            "start_time": self.start_time,
+            "total_ms": self.elapsed() * 1000,
+            "peak_rss_mb": peak_rss(),
+            "phases": self.phases,
+        }
+
+    def report(self, title: str = "Startup") -> str:
+        """
+        Formats every phase and the total time
+
+        :param title: str
+            Title of the report
+        :return: str
+            The report
+        """
+        names = ["  " * phase["depth"] + phase["phase"] for phase in self.phases]
+        width = max([len(name) for name in names] + [len("total")])
+        lines = [f"{title}:", f"  {'phase':<{width}}  {'at':>9}  {'took':>9}  {'peak rss':>9}"]
+        for name, phase in zip(names, self.phases):
+            rss = phase["peak_rss_mb"]
+            rss = f"{rss:6.1f} MB" if rss is not None else f"{'-':>9}"
+            lines.append(
+                f"  {name:<{width}}  {phase['start_ms']:6.1f} ms  {phase['duration_ms']:6.1f} ms  {rss}"
+            )
+        lines.append(f"  {'total':<{width}}  {'':>9}  {self.elapsed() * 1000:6.1f} ms")
+        return "\n".join(lines)
+
+    def print_report(self, title: str = "Startup") -> None:
+        print(self.report(title), file=sys.stderr)
+
+    def finish(self, phase: str = None) -> None:
+        """
+        Prints the report or writes it as JSON. Only the first call has an effect
+
+        :param phase: str
+            Name of the last phase, ended by this call
+        """
+        if self.finished:
+            return
+        self.finished = True
+        self.stop_tracing_imports()
+        if phase:
+            self.mark(phase)
+
+        if self.output:
+            with open(self.output, "w", encoding="utf8") as json_f:
+                json.dump(self.to_dict(), json_f, indent=4)
+        else:
+            self.print_report()
+
+
+_timer: ty.Union[StartupTimer, None] = None
+
+
+def get_startup_timer() -> ty.Union[StartupTimer, None]:
+    """Returns the timer of the running startup profile, None if the startup isn't profiled"""
+    return _timer
+
+
+def start_profiling(start: float = None, output: str = None) -> StartupTimer:
+    """
+    Starts profiling the startup and measuring the imports of PROFILED_IMPORTS, the report is
+    printed or written when the process exits unless StartupTimer.finish() was called earlier
+
+    :param start: float
+        time.perf_counter() when the startup began, defaults to now
+    :param output: str
+        Path of a JSON file to write the report to
+    :return: StartupTimer
+        The timer
+    """
+    import atexit
+
+    global _timer
+    _timer = StartupTimer(start, output)
+    _timer.trace_imports()
+    atexit.register(_timer.finish, "exit")
+    return _timer
@@ -17,8 +17,10 @@
 #
 
 from setuptools import setup
+from setuptools.command.build_py import build_py
 
 from caspy3 import __version__
+import os
 
 
 def readme():
@@ -33,6 +35,28 @@ def requires():
     return _requires
 
 
+class BuildPyCompileUi(build_py):
+    """
+    Generates the Python classes of the .ui files, skipped if PyQt5 isn't installed, and the
+    catalog of the solved formulas, skipped if SymPy isn't installed
+    """
+
+    def run(self) -> None:
+        super().run()
+        try:
+            from caspy3.compute.catalog import compile_catalog
+        except ImportError:
+            pass
+        else:
+            compile_catalog(os.path.join(self.build_lib, "caspy3", "data", "formulas.catalog"))
+
+        try:
+            from caspy3.qt_assets.ui import compile_all
+        except ImportError:
+            return
+        compile_all(os.path.join(self.build_lib, "caspy3", "qt_assets", "compiled"))
+
+
 setup(
     name="CASPy3",
     version=__version__,
@@ -54,7 +78,8 @@ setup(
     install_requires=requires(),
     packages=["caspy3"],
     include_package_data=True,
-    package_data={"caspy3": ["data/*.json"]},
+    package_data={"caspy3": ["data/*.json", "data/*.catalog"]},
+    cmdclass={"build_py": BuildPyCompileUi},
     entry_points={
         "console_scripts": [
             "caspy = caspy3.cli:main",
@@ -2,8 +2,14 @@ from PyQt5.QtWidgets import QApplication, QWidget
 from PyQt5.QtCore import QThreadPool
 
 from colored import fg, attr
+import os
+import tempfile
 import time
 
+# The tests start from an empty result cache, worker processes inherit the directory
+CACHE_DIR = tempfile.TemporaryDirectory()
+os.environ["CASPY_CACHE_DIR"] = CACHE_DIR.name
+
 
 class BaseTester(QWidget):
     def __init__(self) -> None:
@@ -22,6 +22,10 @@ class CalcDerivTester(BaseTester):
         self.test_calc_deriv_unicode()
         self.test_calc_deriv_accuracy()
         self.test_calc_deriv_scientific_notation()
+        self.test_calc_deriv_points()
+        self.test_calc_deriv_points_constant()
+        self.test_calc_deriv_points_not_finite()
+        self.test_calc_deriv_points_scientific_notation()
 
     @BaseTester.call_worker(DerivativeWorker)
     def test_calc_deriv_no_expression(self):
@@ -153,6 +157,41 @@ class CalcDerivTester(BaseTester):
         }
         return command, params, solution
 
+    @BaseTester.call_worker(DerivativeWorker)
+    def test_calc_deriv_points(self):
+        command = "calc_deriv_points"
+        params = ["x**2", "x", 1, "0, 1.5, atan2(1, 2)", None, 10]
+        solution = {
+            "deriv": ["2*x", ["0", "3.000000000", "0.9272952180"]],
+            "latex": "2 x",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(DerivativeWorker)
+    def test_calc_deriv_points_constant(self):
+        # The compiled derivative returns a single number, it's the value at every point
+        command = "calc_deriv_points"
+        params = ["3*x", "x", 1, "1, 2, 3", None, 10]
+        solution = {"deriv": ["3", ["3.000000000", "3.000000000", "3.000000000"]], "latex": "3"}
+        return command, params, solution
+
+    @BaseTester.call_worker(DerivativeWorker)
+    def test_calc_deriv_points_not_finite(self):
+        command = "calc_deriv_points"
+        params = ["exp(x)", "x", 1, "-oo, nan, I", None, 10]
+        solution = {
+            "deriv": ["exp(x)", ["0", "nan", "0.5403023059 + 0.8414709848*I"]],
+            "latex": "e^{x}",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(DerivativeWorker)
+    def test_calc_deriv_points_scientific_notation(self):
+        command = "calc_deriv_points"
+        params = ["log(x)", "x", 1, "0, 4", 3, 10]
+        solution = {"deriv": ["1/x", ["nan", "2.50*10**(-1)"]], "latex": "\\frac{1}{x}"}
+        return command, params, solution
+
 
 if __name__ == "__main__":
     import sys
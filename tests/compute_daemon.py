@@ -0,0 +1,123 @@
+from PyQt5.QtWidgets import QApplication
+
+import os
+import tempfile
+import threading
+import time
+
+from .base_tester import BaseTester
+from caspy3 import __version__
+from caspy3.compute.pf import PfCompute
+from caspy3.daemon import DaemonServer, request
+from caspy3.qt_assets.tabs.worker import BaseWorker
+
+
+class DaemonWorker(BaseWorker, PfCompute):
+    """
+    Sends the command to a daemon with one worker process listening in a temporary directory,
+    the daemon is shared by the tests
+    """
+
+    server = None
+    socket_dir = None
+    version = __version__
+
+    def get_daemon(self):
+        if DaemonWorker.server is None:
+            DaemonWorker.socket_dir = tempfile.TemporaryDirectory()
+            server = DaemonServer(os.path.join(DaemonWorker.socket_dir.name, "daemon.sock"))
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            while request({"op": "status"}, server.socket_path) is None:
+                if not thread.is_alive():
+                    raise RuntimeError("The daemon didn't start")
+                time.sleep(0.05)
+            DaemonWorker.server = server
+        return DaemonWorker.server
+
+    def execute(self, command, params):
+        message = {
+            "op": "run",
+            "version": self.version,
+            "command": command,
+            "params": params,
+            "timeout": None,
+            "representations": None,
+        }
+        return request(message, self.get_daemon().socket_path)
+
+
+class OtherVersionWorker(DaemonWorker):
+    """A client of another version, the daemon leaves the command to the client"""
+
+    version = "0.0.0"
+
+    def execute(self, command, params):
+        return {"daemon": [super(OtherVersionWorker, self).execute(command, params)]}
+
+
+class RequestWorker(DaemonWorker):
+    """Sends the request command to the daemon, the output is the answer with params as keys"""
+
+    def execute(self, command, params):
+        answer = request({"op": command}, self.get_daemon().socket_path)
+        return {key: [answer[key]] for key in params} if params else answer
+
+
+class ComputeDaemonTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_daemon_compute(self):
+        self.test_compute_daemon()
+        self.test_compute_daemon_status()
+        self.test_compute_daemon_other_version()
+        self.test_compute_daemon_unknown_command()
+        self.test_compute_daemon_unknown_request()
+
+    @BaseTester.call_worker(DaemonWorker)
+    def test_compute_daemon(self):
+        command = "calc_pf"
+        params = [94136]
+        solution = {
+            "pf": [{2: 3, 7: 1, 41: 2}, "(2**3)*(7**1)*(41**2)"],
+            "latex": "2^{3} \\cdot 41^{2} \\cdot 7^{1}",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(RequestWorker)
+    def test_compute_daemon_status(self):
+        command = "status"
+        params = ["version", "workers", "jobs"]
+        solution = {"version": [__version__], "workers": [1], "jobs": [1]}
+        return command, params, solution
+
+    @BaseTester.call_worker(OtherVersionWorker)
+    def test_compute_daemon_other_version(self):
+        command = "calc_pf"
+        params = [12]
+        solution = {"daemon": [None]}
+        return command, params, solution
+
+    @BaseTester.call_worker(DaemonWorker)
+    def test_compute_daemon_unknown_command(self):
+        command = "calc_nothing"
+        params = []
+        solution = {"error": ["Error: unknown command 'calc_nothing'"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(RequestWorker)
+    def test_compute_daemon_unknown_request(self):
+        command = "restart"
+        params = []
+        solution = {"error": ["Error: unknown request 'restart'"]}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = ComputeDaemonTester()
+    tester.test_daemon_compute()
+    sys.exit(app.exec_())
@@ -0,0 +1,201 @@
+from PyQt5.QtWidgets import QApplication
+
+import asyncio
+import json
+import threading
+import urllib.error
+import urllib.request
+
+from .base_tester import BaseTester
+from caspy3 import __version__
+from caspy3.compute.pf import PfCompute
+from caspy3.compute.pool import ProcessExecutor
+from caspy3.qt_assets.tabs.worker import BaseWorker
+from caspy3.server import SERVE_COMMANDS, ComputeServer, command_parameters
+
+
+class ServerWorker(BaseWorker, PfCompute):
+    """
+    Requests /command from a server with one worker process listening on a free port, the
+    server is shared by the tests. params is the JSON body, a string is sent as is. The output
+    is the HTTP status and the JSON answer without the uptime.
+    """
+
+    server = None
+    method = "POST"
+
+    def get_server(self):
+        if ServerWorker.server is None:
+            server = ComputeServer(port=0, workers=1)
+            started = threading.Event()
+            thread = threading.Thread(
+                target=lambda: asyncio.run(server.serve(lambda server: started.set())),
+                daemon=True,
+            )
+            thread.start()
+            if not started.wait(60):
+                raise RuntimeError("The server didn't start")
+            ServerWorker.server = server
+        return ServerWorker.server
+
+    def execute(self, command, params):
+        if params is not None and not isinstance(params, str):
+            params = json.dumps(params)
+        data = None if params is None else params.encode("utf8")
+        req = urllib.request.Request(
+            f"http://127.0.0.1:{self.get_server().port}/{command}", data, method=self.method
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                status, answer = response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            status, answer = e.code, json.loads(e.read())
+        answer.pop("uptime", None)
+        return {"http": [status, answer]}
+
+
+class GetWorker(ServerWorker):
+    method = "GET"
+
+
+class CancelWorker(BaseWorker, PfCompute):
+    """
+    Cancels the request of the command after a second and then requests the command for '2'.
+    The output is whether the request was cancelled, the number of requests still in flight and
+    the answer of the second request.
+    """
+
+    async def cancel(self, server, command, params):
+        task = asyncio.ensure_future(server.compute(command, {"params": params}))
+        await asyncio.sleep(1)
+        task.cancel()
+        try:
+            await task
+            cancelled = False
+        except asyncio.CancelledError:
+            cancelled = True
+        two = {"params": ["2", "", 1, False, False, None, 10]}
+        return [cancelled, server.in_flight, await server.compute(command, two)]
+
+    def execute(self, command, params):
+        server = ComputeServer(workers=1)
+        server.parameters = {name: command_parameters(name) for name in SERVE_COMMANDS}
+        server.executor = ProcessExecutor(1)
+        try:
+            return {"server": asyncio.run(self.cancel(server, command, params))}
+        finally:
+            server.executor.shutdown(wait=False)
+
+
+class ComputeServerTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_server_compute(self):
+        self.test_compute_server()
+        self.test_compute_server_names()
+        self.test_compute_server_representations()
+        self.test_compute_server_health()
+        self.test_compute_server_unknown_command()
+        self.test_compute_server_method()
+        self.test_compute_server_invalid_json()
+        self.test_compute_server_timeout()
+        self.test_compute_server_cancel()
+
+    @BaseTester.call_worker(ServerWorker)
+    def test_compute_server(self):
+        command = "calc_pf"
+        params = {"params": [94136]}
+        solution = {
+            "http": [
+                200,
+                {
+                    "pf": [{"2": 3, "7": 1, "41": 2}, "(2**3)*(7**1)*(41**2)"],
+                    "latex": "2^{3} \\cdot 41^{2} \\cdot 7^{1}",
+                },
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(ServerWorker)
+    def test_compute_server_names(self):
+        command = "calc_pf"
+        params = {"input_number": 12}
+        solution = {
+            "http": [
+                200,
+                {"pf": [{"2": 2, "3": 1}, "(2**2)*(3**1)"], "latex": "2^{2} \\cdot 3^{1}"},
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(ServerWorker)
+    def test_compute_server_representations(self):
+        command = "eval_exp"
+        params = {
+            "params": ["sqrt(12)*sqrt(3)", "", 1, False, False, None, 10],
+            "representations": ["exact", "approx"],
+        }
+        solution = {"http": [200, {"eval": ["6", "6.000000000"]}]}
+        return command, params, solution
+
+    @BaseTester.call_worker(GetWorker)
+    def test_compute_server_health(self):
+        command = "health"
+        params = None
+        solution = {"http": [200, {"status": "ok", "version": __version__}]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ServerWorker)
+    def test_compute_server_unknown_command(self):
+        command = "calc_nothing"
+        params = {}
+        solution = {"http": [404, {"error": ["Unknown command 'calc_nothing'"]}]}
+        return command, params, solution
+
+    @BaseTester.call_worker(GetWorker)
+    def test_compute_server_method(self):
+        command = "calc_pf"
+        params = None
+        solution = {"http": [405, {"error": ["Method Not Allowed"]}]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ServerWorker)
+    def test_compute_server_invalid_json(self):
+        command = "calc_pf"
+        params = "{"
+        solution = {
+            "http": [
+                400,
+                {
+                    "error": [
+                        "Invalid JSON: Expecting property name enclosed in double quotes: "
+                        "line 1 column 2 (char 1)"
+                    ]
+                },
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(ServerWorker)
+    def test_compute_server_timeout(self):
+        command = "calc_pf"
+        params = {"params": [12], "timeout": -1}
+        solution = {"http": [400, {"error": ["'timeout' must be a positive number"]}]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CancelWorker)
+    def test_compute_server_cancel(self):
+        command = "eval_exp"
+        params = ["pi", "", 1, False, False, None, 1000000]
+        solution = {"server": [True, 0, {"eval": ["2", "2.000000000"], "latex": "2"}]}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = ComputeServerTester()
+    tester.test_server_compute()
+    sys.exit(app.exec_())
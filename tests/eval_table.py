@@ -0,0 +1,134 @@
+from PyQt5.QtWidgets import QApplication
+
+import numpy
+import os
+import tempfile
+
+from .base_tester import BaseTester
+from caspy3.qt_assets.tabs.evaluate import EvaluateWorker
+
+
+class OutputWorker(EvaluateWorker):
+    """
+    Calls the command with the output file of the params in a temporary directory, the output
+    is the content of the file and the answer. The content of a .npy file is a list of its rows.
+    """
+
+    def execute(self, command, params):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, params[3])
+            result = getattr(self, command)(*params[:3], path, *params[4:])
+            if path.endswith(".npy"):
+                return {"file": [numpy.load(path).tolist(), result]}
+            with open(path, encoding="utf8") as output_f:
+                return {"file": [output_f.read(), result]}
+
+
+class EvalTableTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_table_eval(self):
+        self.test_eval_table_no_grid()
+        self.test_eval_table_grid()
+        self.test_eval_table_variable()
+        self.test_eval_table_outside_domain()
+        self.test_eval_table_infinite_bound()
+        self.test_eval_table_number_of_values()
+        self.test_eval_table_missing_variable()
+        self.test_eval_table_write_csv()
+        self.test_eval_table_write_npy()
+
+    @BaseTester.call_worker(EvaluateWorker)
+    def test_eval_table_no_grid(self):
+        command = "eval_table"
+        params = ["x", "", "", None, 10]
+        solution = {"error": ["Enter a grid, for example x=0:10:11"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(EvaluateWorker)
+    def test_eval_table_grid(self):
+        command = "eval_table"
+        params = ["x*y", "x=1:2:3 y=-1:1:2", "", None, 10]
+        solution = {
+            "table": [
+                ["x", "y", "x*y"],
+                [
+                    ["1", "-1", "-1"],
+                    ["1", "1", "1"],
+                    ["1.5", "-1", "-1.5"],
+                    ["1.5", "1", "1.5"],
+                    ["2", "-1", "-2"],
+                    ["2", "1", "2"],
+                ],
+                6,
+            ],
+            "latex": "x y",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(EvaluateWorker)
+    def test_eval_table_variable(self):
+        command = "eval_table"
+        params = ["x", "x=0:2:3", "", None, 10]
+        solution = {"table": [["x"], [["0"], ["1"], ["2"]], 3], "latex": "x"}
+        return command, params, solution
+
+    @BaseTester.call_worker(EvaluateWorker)
+    def test_eval_table_outside_domain(self):
+        command = "eval_table"
+        params = ["sqrt(x)", "x=-1:1:3", "", None, 10]
+        solution = {
+            "table": [["x", "sqrt(x)"], [["-1", "nan"], ["0", "0"], ["1", "1"]], 3],
+            "latex": "\\sqrt{x}",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(EvaluateWorker)
+    def test_eval_table_infinite_bound(self):
+        command = "eval_table"
+        params = ["x", "x=-oo:1:3", "", None, 10]
+        solution = {"error": ["Error: The bounds of 'x' must be finite"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(EvaluateWorker)
+    def test_eval_table_number_of_values(self):
+        command = "eval_table"
+        params = ["x", "x=0:1:0.5", "", None, 10]
+        solution = {"error": ["Error: The number of values of 'x' must be a positive integer"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(EvaluateWorker)
+    def test_eval_table_missing_variable(self):
+        command = "eval_table"
+        params = ["x*y", "x=0:1:3", "", None, 10]
+        solution = {"error": ["Error: Variable(s) y must be given values"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(OutputWorker)
+    def test_eval_table_write_csv(self):
+        command = "write_table"
+        params = ["2*x", "x=0:1:2", "", "table.csv", None, 10]
+        solution = {"file": ["x,2*x\n0,0\n1,2\n", {"table": [["x", "2*x"], [], 2]}]}
+        return command, params, solution
+
+    @BaseTester.call_worker(OutputWorker)
+    def test_eval_table_write_npy(self):
+        command = "write_table"
+        params = ["2*x", "x=0:1:3", "", "table.npy", None, 10]
+        solution = {
+            "file": [
+                [[0.0, 0.0], [0.5, 1.0], [1.0, 2.0]],
+                {"table": [["x", "2*x"], [], 3]},
+            ]
+        }
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = EvalTableTester()
+    tester.test_table_eval()
+    sys.exit(app.exec_())
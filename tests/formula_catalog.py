@@ -0,0 +1,134 @@
+from PyQt5.QtWidgets import QApplication
+
+from sympy import Symbol, default_sort_key, solve
+
+from .base_tester import BaseTester
+from caspy3.compute.catalog import parse_formula, solve_with_values
+from caspy3.compute.parsing import parse_expr
+from caspy3.qt_assets.tabs.formulas import FormulaWorker
+
+HERON = "A_triangel = sqrt(((a+b+c)/2)*(((a+b+c)/2)-a)*(((a+b+c)/2)-b)*(((a+b+c)/2)-c))"
+
+
+class CatalogWorker(FormulaWorker):
+    def catalog_solutions(self, formula, variable, values):
+        """The solutions of the catalog, None if the formula has to be solved again"""
+        return {"solutions": [str(solve_with_values(formula, variable, values))]}
+
+    def compare_solutions(self, formula, variable, values):
+        """The solutions of the catalog and of solve() after substituting the values"""
+        entry = parse_formula(formula)
+        symbols = {str(symbol): symbol for symbol in entry.equation.free_symbols}
+        equation = entry.equation.subs(
+            {symbols[name]: parse_expr(value) for value, name in values}
+        )
+        solutions = solve(equation, symbols.get(variable, Symbol(variable)), rational=True)
+        return {
+            "solutions": [
+                str(solve_with_values(formula, variable, values)),
+                str(sorted(solutions, key=default_sort_key)),
+            ]
+        }
+
+
+class FormulaCatalogTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_catalog_formula(self):
+        self.test_formula_catalog()
+        self.test_formula_catalog_quadratic()
+        self.test_formula_catalog_rational()
+        self.test_formula_catalog_pi()
+        self.test_formula_catalog_heron()
+        self.test_formula_catalog_heron_area()
+        self.test_formula_catalog_no_solution()
+        self.test_formula_catalog_cubic()
+        self.test_formula_catalog_not_in_catalog()
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog(self):
+        command = "compare_solutions"
+        params = ["v = s/t", "t", [["10", "v"], ["2", "s"]]]
+        solution = {"solutions": ["[1/5]", "[1/5]"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_quadratic(self):
+        command = "compare_solutions"
+        params = ["s = v0*t+(a*t**2)/2", "t", [["10", "s"], ["1", "v0"], ["2", "a"]]]
+        solution = {
+            "solutions": [
+                "[-1/2 + sqrt(41)/2, -sqrt(41)/2 - 1/2]",
+                "[-1/2 + sqrt(41)/2, -sqrt(41)/2 - 1/2]",
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_rational(self):
+        command = "compare_solutions"
+        params = ["v**2-v0**2=2*a*s", "v", [["3", "v0"], ["0.5", "a"], ["4", "s"]]]
+        solution = {"solutions": ["[-sqrt(13), sqrt(13)]", "[-sqrt(13), sqrt(13)]"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_pi(self):
+        command = "compare_solutions"
+        params = ["A_cirkel = pi*r**2", "r", [["2", "A_cirkel"]]]
+        solution = {
+            "solutions": [
+                "[-sqrt(2)/sqrt(pi), sqrt(2)/sqrt(pi)]",
+                "[-sqrt(2)/sqrt(pi), sqrt(2)/sqrt(pi)]",
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_heron(self):
+        command = "compare_solutions"
+        params = [HERON, "a", [["6", "A_triangel"], ["4", "b"], ["5", "c"]]]
+        solution = {
+            "solutions": ["[-3, 3, -sqrt(73), sqrt(73)]", "[-3, 3, -sqrt(73), sqrt(73)]"]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_heron_area(self):
+        command = "compare_solutions"
+        params = [HERON, "A_triangel", [["3", "a"], ["4", "b"], ["5", "c"]]]
+        solution = {"solutions": ["[6]", "[6]"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_no_solution(self):
+        # The area can't be negative, the general solutions for a don't solve the formula
+        command = "compare_solutions"
+        params = [HERON, "a", [["-1", "A_triangel"], ["3", "b"], ["4", "c"]]]
+        solution = {"solutions": ["[]", "[]"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_cubic(self):
+        # The roots of a cubic are solved again for the values
+        command = "catalog_solutions"
+        formula = "V_klotsegment = (1/3)*pi*h**2*(3*r-h)"
+        params = [formula, "h", [["1", "V_klotsegment"], ["2", "r"]]]
+        solution = {"solutions": ["None"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CatalogWorker)
+    def test_formula_catalog_not_in_catalog(self):
+        command = "catalog_solutions"
+        params = ["x = y**2", "y", [["4", "x"]]]
+        solution = {"solutions": ["None"]}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = FormulaCatalogTester()
+    tester.test_catalog_formula()
+    sys.exit(app.exec_())
@@ -0,0 +1,121 @@
+from PyQt5.QtWidgets import QApplication
+
+import os
+import tempfile
+
+from .base_tester import BaseTester
+from caspy3.qt_assets.tabs.formulas import FormulaWorker
+
+
+class SweepWorker(FormulaWorker):
+    """
+    Writes the rows given instead of the values file to a CSV file in a temporary directory.
+    write_formula_sweep writes to another file in the directory, its output is the content of
+    the file and the answer.
+    """
+
+    def execute(self, command, params):
+        lines, formula, rows, *options = params
+        with tempfile.TemporaryDirectory() as directory:
+            values_file = os.path.join(directory, "values.csv")
+            with open(values_file, "w", encoding="utf8") as values_f:
+                values_f.write(rows)
+            if command != "write_formula_sweep":
+                return getattr(self, command)(lines, formula, values_file, *options)
+
+            output = os.path.join(directory, "sweep.csv")
+            result = self.write_formula_sweep(lines, formula, values_file, output, *options)
+            with open(output, encoding="utf8") as output_f:
+                return {"file": [output_f.read(), result]}
+
+
+class FormulaSweepTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+        self.sweep_lines = [["var", "t"], ["", "s"], ["", "v0"], ["", "a"]]
+        self.sweep_formula = ["s", "v0*t+a*t**2/2"]
+        self.sweep_rows = "s,v0,a\n1,0,-2\n-0,0,2\n10,1,2\n"
+
+    def test_sweep_formula(self):
+        self.test_formula_sweep_no_selected()
+        self.test_formula_sweep_no_var()
+        self.test_formula_sweep()
+        self.test_formula_sweep_not_real()
+        self.test_formula_sweep_not_satisfied()
+        self.test_formula_sweep_write()
+
+    @BaseTester.call_worker(SweepWorker)
+    def test_formula_sweep_no_selected(self):
+        command = "calc_formula_sweep"
+        params = [[], self.sweep_formula, self.sweep_rows, None, 10]
+        solution = {"error": ["Error: select a formula"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(SweepWorker)
+    def test_formula_sweep_no_var(self):
+        command = "calc_formula_sweep"
+        params = [[["", "t"], ["", "s"]], ["s", "t"], "s\n1\n", None, 10]
+        solution = {"error": ["Error: \nTraceback"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(SweepWorker)
+    def test_formula_sweep(self):
+        command = "calc_formula_sweep"
+        params = [self.sweep_lines, self.sweep_formula, self.sweep_rows, None, 10]
+        solution = {
+            "table": [
+                ["s", "v0", "a", "t_1", "t_2"],
+                [
+                    ["1", "0", "-2", "nan", "nan"],
+                    ["0", "0", "2", "0", "0"],
+                    ["10", "1", "2", "-3.701562119", "2.701562119"],
+                ],
+                3,
+            ],
+            "latex": "t = \\frac{- v_{0} - \\sqrt{2 a s + v_{0}^{2}}}{a}, \\quad "
+            "t = \\frac{- v_{0} + \\sqrt{2 a s + v_{0}^{2}}}{a}",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(SweepWorker)
+    def test_formula_sweep_not_real(self):
+        command = "calc_formula_sweep"
+        params = [[["var", "x"], ["", "y"]], ["x", "sqrt(y)"], "y\n4\n-1\n0\n", None, 10]
+        solution = {
+            "table": [["y", "x"], [["4", "2"], ["-1", "nan"], ["0", "0"]], 3],
+            "latex": "x = \\sqrt{y}",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(SweepWorker)
+    def test_formula_sweep_not_satisfied(self):
+        # x = y**2 solves sqrt(x) = y only if y isn't negative
+        command = "calc_formula_sweep"
+        params = [[["var", "x"], ["", "y"]], ["sqrt(x)", "y"], "y\n2\n-1\n", None, 10]
+        solution = {
+            "table": [["y", "x"], [["2", "4"], ["-1", "nan"]], 2],
+            "latex": "x = y^{2}",
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(SweepWorker)
+    def test_formula_sweep_write(self):
+        command = "write_formula_sweep"
+        params = [self.sweep_lines, self.sweep_formula, self.sweep_rows, None, 10]
+        solution = {
+            "file": [
+                "s,v0,a,t_1,t_2\n1,0,-2,nan,nan\n0,0,2,0,0\n10,1,2,-3.701562119,2.701562119\n",
+                {"table": [["s", "v0", "a", "t_1", "t_2"], [], 3], "unsolved": 1},
+            ]
+        }
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = FormulaSweepTester()
+    tester.test_sweep_formula()
+    sys.exit(app.exec_())
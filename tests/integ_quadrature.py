@@ -0,0 +1,102 @@
+from PyQt5.QtWidgets import QApplication
+
+from sympy import N, pi, sqrt
+
+from .base_tester import BaseTester
+from caspy3.qt_assets.tabs.integral import IntegralWorker
+
+
+class QuadratureWorker(IntegralWorker):
+    """
+    The output is the approximation, the method, whether it converged and whether the error
+    estimate is below 10**-accuracy, the number of evaluations isn't compared
+    """
+
+    def execute(self, command, params):
+        result = super(QuadratureWorker, self).execute(command, params)
+        if "error" in result:
+            return result
+        quadrature = result["quadrature"]
+        return {
+            "quadrature": [
+                result["integ"][1],
+                quadrature["method"],
+                quadrature["converged"],
+                quadrature["error"] < 10 ** -params[-1],
+            ]
+        }
+
+
+class IntegQuadratureTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_quadrature_integ(self):
+        self.test_integ_quadrature_other_symbol()
+        self.test_integ_quadrature_gauss_kronrod()
+        self.test_integ_quadrature_tanh_sinh()
+        self.test_integ_quadrature_infinite()
+        self.test_integ_quadrature_infinite_gauss_kronrod()
+        self.test_integ_quadrature_upper_infinite()
+        self.test_integ_quadrature_reversed()
+
+    @BaseTester.call_worker(QuadratureWorker)
+    def test_integ_quadrature_other_symbol(self):
+        command = "calc_integ"
+        params = ["x*y", "x", "0", "1", "tanh-sinh", 1, False, False, None, 30]
+        solution = {"error": ["Error: \nTraceback"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(QuadratureWorker)
+    def test_integ_quadrature_gauss_kronrod(self):
+        command = "calc_integ"
+        params = ["1/(1+x**2)", "x", "0", "1", "gauss-kronrod", 1, False, False, None, 30]
+        solution = {"quadrature": [str(N(pi / 4, 30)), "gauss-kronrod", True, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(QuadratureWorker)
+    def test_integ_quadrature_tanh_sinh(self):
+        # The integrand has a singularity at the lower bound
+        command = "calc_integ"
+        params = ["log(x)", "x", "0", "1", "tanh-sinh", 1, False, False, None, 30]
+        solution = {"quadrature": ["-1.00000000000000000000000000000", "tanh-sinh", True, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(QuadratureWorker)
+    def test_integ_quadrature_infinite(self):
+        command = "calc_integ"
+        params = ["exp(-x**2)", "x", "-oo", "oo", "tanh-sinh", 1, False, False, None, 30]
+        solution = {"quadrature": [str(N(sqrt(pi), 30)), "tanh-sinh", True, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(QuadratureWorker)
+    def test_integ_quadrature_infinite_gauss_kronrod(self):
+        command = "calc_integ"
+        params = ["exp(-x**2)", "x", "-oo", "oo", "gauss-kronrod", 1, False, False, None, 30]
+        solution = {"quadrature": [str(N(sqrt(pi), 30)), "gauss-kronrod", True, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(QuadratureWorker)
+    def test_integ_quadrature_upper_infinite(self):
+        command = "calc_integ"
+        params = ["1/x**2", "x", "1", "oo", "gauss-kronrod", 1, False, False, None, 30]
+        solution = {
+            "quadrature": ["1.00000000000000000000000000000", "gauss-kronrod", True, True]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(QuadratureWorker)
+    def test_integ_quadrature_reversed(self):
+        command = "calc_integ"
+        params = ["1/(1+x**2)", "x", "1", "0", "gauss-kronrod", 1, False, False, None, 30]
+        solution = {"quadrature": [str(N(-pi / 4, 30)), "gauss-kronrod", True, True]}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = IntegQuadratureTester()
+    tester.test_quadrature_integ()
+    sys.exit(app.exec_())
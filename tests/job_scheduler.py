@@ -0,0 +1,185 @@
+from PyQt5.QtCore import QRunnable
+from PyQt5.QtWidgets import QApplication
+
+import threading
+
+from .base_tester import BaseTester
+from caspy3.qt_assets.scheduler import LANE_CALC, LANE_PREVIEW, Scheduler
+from caspy3.qt_assets.tabs.worker import BaseWorker
+
+
+class JobWorker(QRunnable):
+    """
+    A worker with the methods the scheduler uses to coalesce and supersede jobs, it waits for
+    blocker before returning its key
+
+    :param key: str
+        Key and answer of the job
+    :param source: str
+        Source of the job
+    :param runs: list
+        The keys of the workers that have run are appended to it
+    :param blocker: threading.Event
+        Set to let the worker finish, None doesn't block
+    :param memoize: bool
+        If the scheduler keeps the answer
+    """
+
+    def __init__(self, key, source, runs, blocker=None, memoize=False):
+        super().__init__()
+        self.key = key
+        self.source = source
+        self.runs = runs
+        self.blocker = blocker
+        self.memoize = memoize
+        self.started = threading.Event()
+        self.results = []
+        self.answer = None
+
+    def run(self):
+        self.started.set()
+        if self.blocker is not None:
+            self.blocker.wait(10)
+        self.runs.append(self.key)
+        self.answer = {"answer": [self.key]}
+        self.emit_result(self.answer)
+
+    def emit_result(self, result):
+        self.results.append(result)
+
+    def job_key(self):
+        return self.key
+
+    def job_source(self):
+        return self.source
+
+    def job_memoize(self):
+        return self.memoize
+
+
+class SchedulerWorker(BaseWorker):
+    """
+    Starts JobWorkers given as [key, source, lane] in a scheduler with one thread per lane. The
+    output is the keys of the workers that have run, the answers each job was given, the number
+    of coalesced, superseded and memoized jobs and the depth of the lane of the first job after
+    all jobs were started.
+    """
+
+    def execute(self, command, params):
+        return getattr(self, command)(*params)
+
+    def start_jobs(self, jobs):
+        """The first job blocks its thread until every job has been started"""
+        scheduler = Scheduler({LANE_CALC: 1, LANE_PREVIEW: 1})
+        runs, blocker = [], threading.Event()
+        workers = [JobWorker(key, source, runs) for key, source, lane in jobs]
+        workers[0].blocker = blocker
+        scheduler.start(workers[0], jobs[0][2])
+        workers[0].started.wait(10)
+        for worker, (key, source, lane) in zip(workers[1:], jobs[1:]):
+            scheduler.start(worker, lane)
+        depth = scheduler.depth()[jobs[0][2]]
+
+        # The jobs of other lanes don't wait for the first job
+        for lane, pool in scheduler.pools.items():
+            if lane != jobs[0][2]:
+                pool.waitForDone()
+        blocker.set()
+        for pool in scheduler.pools.values():
+            pool.waitForDone()
+        return self.scheduler_output(scheduler, runs, workers, depth)
+
+    def start_jobs_in_turn(self, jobs):
+        """Every job is memoized and started after the previous one has finished"""
+        scheduler = Scheduler({LANE_CALC: 1, LANE_PREVIEW: 1})
+        runs = []
+        workers = [JobWorker(key, source, runs, memoize=True) for key, source, lane in jobs]
+        for worker, (key, source, lane) in zip(workers, jobs):
+            scheduler.start(worker, lane)
+            scheduler.pools[lane].waitForDone()
+        return self.scheduler_output(scheduler, runs, workers, scheduler.depth()[jobs[0][2]])
+
+    @staticmethod
+    def scheduler_output(scheduler, runs, workers, depth):
+        return {
+            "scheduler": [
+                runs,
+                [[result["answer"][0] for result in worker.results] for worker in workers],
+                [scheduler.coalesced, scheduler.superseded, scheduler.memo_hits],
+                depth,
+            ]
+        }
+
+
+class JobSchedulerTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_scheduler_job(self):
+        self.test_job_scheduler_queued()
+        self.test_job_scheduler_lanes()
+        self.test_job_scheduler_coalesce()
+        self.test_job_scheduler_supersede()
+        self.test_job_scheduler_memoize()
+
+    @BaseTester.call_worker(SchedulerWorker)
+    def test_job_scheduler_queued(self):
+        command = "start_jobs"
+        params = [[["first", "calc_deriv", LANE_CALC], ["second", "calc_integ", LANE_CALC]]]
+        solution = {
+            "scheduler": [["first", "second"], [["first"], ["second"]], [0, 0, 0], (1, 1)]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(SchedulerWorker)
+    def test_job_scheduler_lanes(self):
+        command = "start_jobs"
+        params = [[["calc", "calc_deriv", LANE_CALC], ["preview", "prev_deriv", LANE_PREVIEW]]]
+        solution = {"scheduler": [["preview", "calc"], [["calc"], ["preview"]], [0, 0, 0], (1, 0)]}
+        return command, params, solution
+
+    @BaseTester.call_worker(SchedulerWorker)
+    def test_job_scheduler_coalesce(self):
+        command = "start_jobs"
+        params = [[["x", "calc_deriv", LANE_CALC], ["x", "prev_deriv", LANE_CALC]]]
+        solution = {"scheduler": [["x"], [["x"], ["x"]], [1, 0, 0], (1, 0)]}
+        return command, params, solution
+
+    @BaseTester.call_worker(SchedulerWorker)
+    def test_job_scheduler_supersede(self):
+        # The follower of a superseded job is superseded with it, a running job isn't
+        command = "start_jobs"
+        params = [
+            [
+                ["running", "calc_integ", LANE_CALC],
+                ["first", "calc_deriv", LANE_CALC],
+                ["first", "calc_limit", LANE_CALC],
+                ["running", "calc_sum", LANE_CALC],
+                ["latest", "calc_deriv", LANE_CALC],
+            ]
+        ]
+        solution = {
+            "scheduler": [
+                ["running", "latest"],
+                [["running"], [], [], ["running"], ["latest"]],
+                [2, 2, 0],
+                (1, 1),
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(SchedulerWorker)
+    def test_job_scheduler_memoize(self):
+        command = "start_jobs_in_turn"
+        params = [[["x", "prev_deriv", LANE_PREVIEW], ["x", "prev_deriv", LANE_PREVIEW]]]
+        solution = {"scheduler": [["x"], [["x"], ["x"]], [0, 0, 1], (0, 0)]}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = JobSchedulerTester()
+    tester.test_scheduler_job()
+    sys.exit(app.exec_())
@@ -0,0 +1,103 @@
+from PyQt5.QtWidgets import QApplication
+
+from sympy import Max, Symbol, srepr
+from sympy.parsing.sympy_parser import parse_expr as sympy_parse_expr
+
+from .base_tester import BaseTester
+from caspy3.compute.evaluate import EvaluateCompute
+from caspy3.compute.parsing import parse_cache_info, parse_expr
+from caspy3.qt_assets.tabs.worker import BaseWorker
+
+
+class ParseWorker(BaseWorker, EvaluateCompute):
+    def parse(self, expression, evaluate=True, local_dict=None):
+        """The srepr of the parsed expression"""
+        return {"parse": [srepr(parse_expr(expression, local_dict=local_dict, evaluate=evaluate))]}
+
+    def parse_twice(self, expression):
+        """Whether the second parse returned the same object and the number of cache hits"""
+        first = parse_expr(expression)
+        hits = parse_cache_info().hits
+        second = parse_expr(expression)
+        return {"parse": [second is first, parse_cache_info().hits - hits]}
+
+
+class ParseExpressionTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_expression_parse(self):
+        self.test_parse_expression()
+        self.test_parse_expression_unevaluated()
+        self.test_parse_expression_exp()
+        self.test_parse_expression_integral()
+        self.test_parse_expression_namespace()
+        self.test_parse_expression_local_dict()
+        self.test_parse_expression_no_local_dict()
+        self.test_parse_expression_cache()
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression(self):
+        command = "parse"
+        params = ["x**2 + 2*x + 1"]
+        solution = {"parse": [srepr(sympy_parse_expr("x**2 + 2*x + 1"))]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression_unevaluated(self):
+        command = "parse"
+        params = ["sin(x)/x", False]
+        solution = {"parse": [srepr(sympy_parse_expr("sin(x)/x", evaluate=False))]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression_exp(self):
+        command = "parse"
+        params = ["E**(I*pi)", False]
+        solution = {"parse": [srepr(sympy_parse_expr("E**(I*pi)", evaluate=False))]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression_integral(self):
+        command = "parse"
+        params = ["Integral(exp(-x**2), (x, -oo, oo))"]
+        solution = {"parse": [srepr(sympy_parse_expr("Integral(exp(-x**2), (x, -oo, oo))"))]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression_namespace(self):
+        command = "parse"
+        params = ["max(x, 2)"]
+        solution = {"parse": [srepr(Max(Symbol("x"), 2))]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression_local_dict(self):
+        command = "parse"
+        params = ["x + 1", True, {"x": Symbol("y")}]
+        solution = {"parse": [srepr(Symbol("y") + 1)]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression_no_local_dict(self):
+        # The local variable of the previous test isn't cached
+        command = "parse"
+        params = ["x + 1"]
+        solution = {"parse": [srepr(Symbol("x") + 1)]}
+        return command, params, solution
+
+    @BaseTester.call_worker(ParseWorker)
+    def test_parse_expression_cache(self):
+        command = "parse_twice"
+        params = ["cos(y)**2 + sin(y)**2"]
+        solution = {"parse": [True, 1]}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = ParseExpressionTester()
+    tester.test_expression_parse()
+    sys.exit(app.exec_())
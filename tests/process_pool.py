@@ -0,0 +1,195 @@
+from PyQt5.QtWidgets import QApplication
+
+import threading
+import time
+
+from .base_tester import BaseTester
+from caspy3.compute.evaluate import EvaluateCompute
+from caspy3.compute.pool import ProcessExecutor, set_executor
+from caspy3.qt_assets.tabs.worker import BaseWorker, TabWorkers
+
+# Takes about a second, long enough to queue other jobs behind it
+SLOW_PARAMS = ["pi", "", 1, False, False, False, 100000]
+# Takes more than a minute, it's always cancelled or timed out
+ENDLESS_PARAMS = ["pi", "", 1, False, False, False, 1000000]
+
+
+class PoolWorker(BaseWorker, EvaluateCompute):
+    """Sends the command to a pool of one worker process, the pool is shared by the tests"""
+
+    executor = None
+    timeout = None
+
+    def get_pool(self):
+        if PoolWorker.executor is None:
+            PoolWorker.executor = ProcessExecutor(1)
+        return PoolWorker.executor
+
+    def execute(self, command, params):
+        return self.get_pool().run(command, params, self.timeout)
+
+
+class TimeoutWorker(PoolWorker):
+    timeout = 1
+
+
+class CancelPendingWorker(PoolWorker):
+    """
+    Cancels the command while it waits for a slow job. The output is whether it was cancelled,
+    whether the slow job finished and the answer of the command submitted again.
+    """
+
+    def execute(self, command, params):
+        executor = self.get_pool()
+        slow = executor.submit(command, SLOW_PARAMS)
+        future = executor.submit(command, params)
+        cancelled = executor.cancel(future) and future.cancelled()
+        return {"pool": [cancelled, "eval" in slow.result(), executor.run(command, params)]}
+
+
+class CancelRunningWorker(PoolWorker):
+    """
+    Cancels the command once it runs in the worker process. The output is whether it was
+    cancelled, its answer and the answer of the command queued behind it.
+    """
+
+    def execute(self, command, params):
+        executor = self.get_pool()
+        future = executor.submit(command, params)
+        while not future.running():
+            time.sleep(0.01)
+        pending = executor.submit(command, ["2", "", 1, False, False, False, 10])
+        return {"pool": [executor.cancel(future), future.result(), pending.result()]}
+
+
+class CancelAllWorker(PoolWorker):
+    """
+    Cancels every job once the command runs with another job queued behind it. The output is
+    the number of cancelled jobs, the answer of the command and whether the other job was
+    cancelled.
+    """
+
+    def execute(self, command, params):
+        executor = self.get_pool()
+        future = executor.submit(command, params)
+        while not future.running():
+            time.sleep(0.01)
+        pending = executor.submit(command, ["2", "", 1, False, False, False, 10])
+        return {"pool": [executor.cancel_all(), future.result(), pending.cancelled()]}
+
+
+class EvaluateWorker(BaseWorker, EvaluateCompute):
+    pass
+
+
+class CancelTabWorker(PoolWorker):
+    """
+    Starts the command in a worker of a tab with the pool as the executor of the GUI and cancels
+    the workers of the tab once it runs in the worker process. The output is the number of
+    cancelled workers, the answer of the command and the answer of a worker of the tab that
+    hadn't started.
+    """
+
+    def execute(self, command, params):
+        set_executor(self.get_pool())
+        try:
+            workers = TabWorkers()
+            running = EvaluateWorker(command, params)
+            queued = EvaluateWorker(command, ["2", "", 1, False, False, False, 10])
+            workers.add(running)
+            workers.add(queued)
+
+            thread = threading.Thread(target=running.run)
+            thread.start()
+            while running.future is None or not running.future.running():
+                time.sleep(0.01)
+            cancelled = workers.cancel()
+            thread.join()
+            queued.run()
+        finally:
+            set_executor(None)
+        return {"pool": [cancelled, running.answer, queued.answer]}
+
+
+class ProcessPoolTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_pool_process(self):
+        self.test_process_pool()
+        self.test_process_pool_cancel_pending()
+        self.test_process_pool_cancel_running()
+        self.test_process_pool_cancel_all()
+        self.test_process_pool_cancel_tab()
+        self.test_process_pool_timeout()
+        self.test_process_pool_after_timeout()
+
+    @BaseTester.call_worker(PoolWorker)
+    def test_process_pool(self):
+        command = "eval_exp"
+        params = ["sqrt(12)*sqrt(3)", "", 1, False, False, False, 10]
+        solution = {"eval": ["6", "6.000000000"], "latex": "6"}
+        return command, params, solution
+
+    @BaseTester.call_worker(CancelPendingWorker)
+    def test_process_pool_cancel_pending(self):
+        command = "eval_exp"
+        params = ["3", "", 1, False, False, False, 10]
+        solution = {"pool": [True, True, {"eval": ["3", "3.000000000"], "latex": "3"}]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CancelRunningWorker)
+    def test_process_pool_cancel_running(self):
+        command = "eval_exp"
+        params = ENDLESS_PARAMS
+        solution = {
+            "pool": [
+                True,
+                {"error": ["Error: the calculation was cancelled"]},
+                {"eval": ["2", "2.000000000"], "latex": "2"},
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(CancelAllWorker)
+    def test_process_pool_cancel_all(self):
+        command = "eval_exp"
+        params = ENDLESS_PARAMS
+        solution = {"pool": [2, {"error": ["Error: the calculation was cancelled"]}, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CancelTabWorker)
+    def test_process_pool_cancel_tab(self):
+        command = "eval_exp"
+        params = ENDLESS_PARAMS
+        solution = {
+            "pool": [
+                2,
+                {"error": ["Error: the calculation was cancelled"]},
+                {"error": ["Error: the calculation was cancelled"]},
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(TimeoutWorker)
+    def test_process_pool_timeout(self):
+        command = "eval_exp"
+        params = ENDLESS_PARAMS
+        solution = {"error": ["Error: the calculation timed out after 1 seconds"]}
+        return command, params, solution
+
+    @BaseTester.call_worker(PoolWorker)
+    def test_process_pool_after_timeout(self):
+        command = "eval_exp"
+        params = ["2", "", 1, False, False, False, 10]
+        solution = {"eval": ["2", "2.000000000"], "latex": "2"}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = ProcessPoolTester()
+    tester.test_pool_process()
+    sys.exit(app.exec_())
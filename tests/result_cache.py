@@ -0,0 +1,91 @@
+from PyQt5.QtWidgets import QApplication
+
+from .base_tester import BaseTester
+from caspy3.compute import cache
+from caspy3.compute.cache import ResultCache, set_cache
+from caspy3.compute.derivative import DerivativeCompute
+from caspy3.compute.pf import PfCompute
+from caspy3.qt_assets.tabs.worker import BaseWorker
+
+
+class CacheWorker(BaseWorker, DerivativeCompute, PfCompute):
+    """
+    Runs the command once for every list of params with an empty in-memory cache. The output
+    is the number of misses, hits and stored answers and whether every answer was the same.
+    """
+
+    def execute(self, command, params):
+        previous = cache._cache, cache._enabled
+        result_cache = ResultCache(":memory:")
+        set_cache(result_cache)
+        try:
+            answers = [super(CacheWorker, self).execute(command, job) for job in params]
+            stats = result_cache.stats()
+        finally:
+            result_cache.close()
+            cache._cache, cache._enabled = previous
+
+        return {
+            "cache": [
+                stats["session_misses"],
+                stats["session_hits"],
+                stats["entries"],
+                all(answer == answers[0] for answer in answers),
+            ]
+        }
+
+
+class ResultCacheTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+    def test_cache_result(self):
+        self.test_result_cache_hit()
+        self.test_result_cache_error()
+        self.test_result_cache_same_expression()
+        self.test_result_cache_print_settings()
+
+    @BaseTester.call_worker(CacheWorker)
+    def test_result_cache_hit(self):
+        command = "calc_pf"
+        params = [[94136], [94136]]
+        solution = {"cache": [1, 1, 1, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CacheWorker)
+    def test_result_cache_error(self):
+        command = "calc_pf"
+        params = [["Hello"], ["Hello"]]
+        solution = {"cache": [2, 0, 0, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CacheWorker)
+    def test_result_cache_same_expression(self):
+        command = "calc_deriv"
+        params = [
+            ["x**2+1", "x", 1, "", 1, False, False, None, 10],
+            ["x**2 + 1", "x", 1, "", 1, False, False, None, 10],
+        ]
+        solution = {"cache": [1, 1, 1, True]}
+        return command, params, solution
+
+    @BaseTester.call_worker(CacheWorker)
+    def test_result_cache_print_settings(self):
+        command = "calc_deriv"
+        params = [
+            ["x**2", "x", 1, "", 1, False, False, None, 10],
+            ["x**2", "x", 1, "", 1, True, False, None, 10],
+            ["x**2", "x", 1, "", 1, False, True, None, 10],
+            ["x**2", "x", 1, "", 2, False, False, None, 10],
+        ]
+        solution = {"cache": [4, 0, 4, False]}
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QApplication(sys.argv)
+    tester = ResultCacheTester()
+    tester.test_cache_result()
+    sys.exit(app.exec_())
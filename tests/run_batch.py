@@ -0,0 +1,197 @@
+from PyQt5.QtWidgets import QApplication
+
+import json
+import os
+import subprocess
+import sys
+
+from .base_tester import BaseTester
+from caspy3.qt_assets.tabs.worker import BaseWorker
+
+# Takes about a second to factor, long enough for the jobs after it to finish first
+SLOW_NUMBER = "100000000000034700000000001147"
+
+
+class BatchWorker(BaseWorker):
+    """
+    Runs the caspy command line given by command with the lines of params as input without
+    the result cache. The output is the JSON objects written by it.
+    """
+
+    def execute(self, command, params):
+        process = subprocess.run(
+            [sys.executable, "-m", "caspy3.cli", *command.split()],
+            input="\n".join(params) + "\n",
+            capture_output=True,
+            text=True,
+            timeout=120,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=dict(os.environ, CASPY_NO_CACHE="1"),
+        )
+        return {"batch": [self.record(json.loads(line)) for line in process.stdout.splitlines()]}
+
+    def record(self, record):
+        return record
+
+
+class OrderWorker(BatchWorker):
+    """The output is the index of every result in the order they were written"""
+
+    def record(self, record):
+        return record["index"]
+
+
+class RunBatchTester(BaseTester):
+    def __init__(self):
+        super().__init__()
+
+        self.batch_jobs = [
+            json.dumps({"command": "pf", "params": [SLOW_NUMBER], "id": "slow"}),
+            json.dumps({"command": "deriv", "params": ["x**2", "x"], "id": "fast"}),
+        ]
+
+    def test_batch_run(self):
+        self.test_run_batch()
+        self.test_run_batch_ordered()
+        self.test_run_batch_unordered()
+        self.test_run_batch_errors()
+        self.test_run_batch_csv()
+        self.test_run_batch_timeout()
+
+    @BaseTester.call_worker(BatchWorker)
+    def test_run_batch(self):
+        command = "batch"
+        params = [
+            json.dumps({"command": "pf", "params": [12], "id": "a"}),
+            json.dumps(
+                {"command": "deriv", "params": ["x**x", "x"], "options": {"output_type": 3}}
+            ),
+        ]
+        solution = {
+            "batch": [
+                {
+                    "index": 0,
+                    "id": "a",
+                    "command": "pf",
+                    "result": {
+                        "pf": [{"2": 2, "3": 1}, "(2**2)*(3**1)"],
+                        "latex": "2^{2} \\cdot 3^{1}",
+                    },
+                },
+                {
+                    "index": 1,
+                    "command": "deriv",
+                    "result": {
+                        "deriv": ["x**x*(log(x) + 1)", 0],
+                        "latex": "x^{x} \\left(\\log{\\left(x \\right)} + 1\\right)",
+                    },
+                },
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(OrderWorker)
+    def test_run_batch_ordered(self):
+        command = "batch -j 2"
+        params = self.batch_jobs
+        solution = {"batch": [0, 1]}
+        return command, params, solution
+
+    @BaseTester.call_worker(OrderWorker)
+    def test_run_batch_unordered(self):
+        command = "batch -j 2 --unordered"
+        params = self.batch_jobs
+        solution = {"batch": [1, 0]}
+        return command, params, solution
+
+    @BaseTester.call_worker(BatchWorker)
+    def test_run_batch_errors(self):
+        command = "batch"
+        params = [
+            "{",
+            json.dumps({"command": "nothing"}),
+            json.dumps({"command": "deriv", "params": ["x**2"], "options": {"nothing": 1}}),
+        ]
+        solution = {
+            "batch": [
+                {
+                    "index": 0,
+                    "result": {
+                        "error": [
+                            "Error: invalid job: Expecting property name enclosed in double "
+                            "quotes: line 2 column 1 (char 2)"
+                        ]
+                    },
+                },
+                {
+                    "index": 1,
+                    "command": "nothing",
+                    "result": {
+                        "error": [
+                            "Error: unknown command 'nothing', choose from deriv, integ, sum, "
+                            "limit, eq, diff-eq, eval, simp, exp, pf"
+                        ]
+                    },
+                },
+                {
+                    "index": 2,
+                    "command": "deriv",
+                    "result": {"error": ["No such option '--nothing'."]},
+                },
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(BatchWorker)
+    def test_run_batch_csv(self):
+        command = "batch -f csv"
+        params = ["id,command,param1,param2,output-type,use-unicode", "b,deriv,x**3,x,3,false"]
+        solution = {
+            "batch": [
+                {
+                    "index": 0,
+                    "id": "b",
+                    "command": "deriv",
+                    "result": {"deriv": ["3*x**2", 0], "latex": "3 x^{2}"},
+                }
+            ]
+        }
+        return command, params, solution
+
+    @BaseTester.call_worker(BatchWorker)
+    def test_run_batch_timeout(self):
+        # The timeout of a job overrides '--timeout'
+        command = "--timeout 1 batch"
+        params = [
+            json.dumps({"command": "eval", "params": ["pi"], "options": {"accuracy": 1000000}}),
+            json.dumps(
+                {
+                    "command": "eval",
+                    "params": ["pi"],
+                    "options": {"accuracy": 1000000},
+                    "timeout": 2,
+                }
+            ),
+        ]
+        solution = {
+            "batch": [
+                {
+                    "index": 0,
+                    "command": "eval",
+                    "result": {"error": ["Error: the calculation timed out after 1.0 seconds"]},
+                },
+                {
+                    "index": 1,
+                    "command": "eval",
+                    "result": {"error": ["Error: the calculation timed out after 2 seconds"]},
+                },
+            ]
+        }
+        return command, params, solution
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    tester = RunBatchTester()
+    tester.test_batch_run()
+    sys.exit(app.exec_())
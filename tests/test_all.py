@@ -9,10 +9,18 @@ from .calc_normal_eq import CalcNormalEqTester
 from .calc_pf import CalcPfTester
 from .calc_sum import CalcSumTester
 from .calc_system_eq import CalcSystemEqTester
+from .compute_daemon import ComputeDaemonTester
+from .compute_server import ComputeServerTester
 from .eval_exp import EvalExpTester
+from .eval_table import EvalTableTester
 from .execute_code import ExecuteCodeTester
 from .expand_exp import ExpandExpTester
+from .formula_catalog import FormulaCatalogTester
+from .formula_sweep import FormulaSweepTester
+from .integ_quadrature import IntegQuadratureTester
+from .job_scheduler import JobSchedulerTester
 from .parse_diff_text import ParseDiffTextTester
+from .parse_expression import ParseExpressionTester
 from .parse_var_sub import ParseVarSubTester
 from .prev_deriv import PrevDerivTester
 from .prev_diff_eq import PrevDiffEqTester
@@ -25,6 +33,9 @@ from .prev_normal_eq import PrevNormalEqTester
 from .prev_simp_exp import PrevSimpExpTester
 from .prev_sum import PrevSumTester
 from .prev_system_eq import PrevSystemEqTester
+from .process_pool import ProcessPoolTester
+from .result_cache import ResultCacheTester
+from .run_batch import RunBatchTester
 from .scientific_notation import ScientificNotationTester
 from .simp_exp import SimpExpTester
 from .base_tester import BaseTester
@@ -40,10 +51,18 @@ class TestAll(
     CalcPfTester,
     CalcSumTester,
     CalcSystemEqTester,
+    ComputeDaemonTester,
+    ComputeServerTester,
     EvalExpTester,
+    EvalTableTester,
     ExecuteCodeTester,
     ExpandExpTester,
+    FormulaCatalogTester,
+    FormulaSweepTester,
+    IntegQuadratureTester,
+    JobSchedulerTester,
     ParseDiffTextTester,
+    ParseExpressionTester,
     ParseVarSubTester,
     PrevDerivTester,
     PrevDiffEqTester,
@@ -56,6 +75,9 @@ class TestAll(
     PrevSimpExpTester,
     PrevSumTester,
     PrevSystemEqTester,
+    ProcessPoolTester,
+    ResultCacheTester,
+    RunBatchTester,
     ScientificNotationTester,
     SimpExpTester,
 ):
@@ -72,10 +94,18 @@ class TestAll(
         CalcPfTester.test_pf_calc(self)
         CalcSumTester.test_sum_calc(self)
         # CalcSystemEqTester.test_system_eq_calc(self)
+        ComputeDaemonTester.test_daemon_compute(self)
+        ComputeServerTester.test_server_compute(self)
         EvalExpTester.test_exp_eval(self)
+        EvalTableTester.test_table_eval(self)
         ExecuteCodeTester.test_code_execute(self)
         ExpandExpTester.test_exp_expand(self)
+        FormulaCatalogTester.test_catalog_formula(self)
+        FormulaSweepTester.test_sweep_formula(self)
+        IntegQuadratureTester.test_quadrature_integ(self)
+        JobSchedulerTester.test_scheduler_job(self)
         ParseDiffTextTester.test_text_diff_parse(self)
+        ParseExpressionTester.test_expression_parse(self)
         ParseVarSubTester.test_var_sub_parse(self)
         PrevDerivTester.test_deriv_prev(self)
         PrevDiffEqTester.test_diff_eq_prev(self)
@@ -88,6 +118,9 @@ class TestAll(
         PrevSimpExpTester.test_exp_simp_prev(self)
         PrevSumTester.test_sum_prev(self)
         PrevSystemEqTester.test_system_eq_prev(self)
+        ProcessPoolTester.test_pool_process(self)
+        ResultCacheTester.test_cache_result(self)
+        RunBatchTester.test_batch_run(self)
         ScientificNotationTester.test_scientific_notation(self)
         SimpExpTester.test_exp_simp(self)
 